@@ -6,6 +6,7 @@ oscilloscope-reader pip version
 from .delete import *
 from .fileopener import *
 from .operations import *
+from .pipeline import *
 from .plot import *
 from .reader import *
 from .simulations import *
@@ -14,4 +15,4 @@ from .waveforms import *
 __version__ = "1.0.0"
 __author__ = 'Steven Linfield'
 
-__all__ = ['delete','fileopener','operations','plot','reader','simulations','waveforms']
+__all__ = ['delete','fileopener','operations','pipeline','plot','reader','simulations','waveforms']
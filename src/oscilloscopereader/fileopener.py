@@ -26,20 +26,52 @@ Description:
 
 This file contains the code used by the oscilloscope-reader package to open single oscilloscope 
 files with .csv formats and to append the content of these files into numpy arrays which can then
-be analysed and/or plotted. 
+be analysed and/or plotted. Large files can instead be streamed in blocks of a fixed size, either to 
+be processed one block at a time or to be copied into a preallocated or memory-mapped array. Raw 
+binary exports of int8 or int16 ADC codes can be opened with the Binary class instead, which 
+memory-maps the codes and converts them into current only when they are used. Likewise, .csv files 
+opened with compact = True keep their current as int8 or int16 ADC codes (4-8 times smaller than a 
+float array) whenever the values lie on the evenly spaced levels of an ADC. Compressed .csv files 
+(.csv.gz, .csv.xz, or .csv.bz2) are decompressed as they are parsed, never as a copy on disk, and 
+the decompression can be moved into a separate thread with thread = True. Whole directories of files
+can be opened at once with the Batch class, which parses the files in a process pool and passes each
+current array back as a memory-mapped .npy file, which is deleted once the batch is closed.
 
 ===================================================================================================
 
 How to use this file:
     
-This file has no standalone operational capabilities.
+This file has no standalone operational capabilities for analysis. However, running it from main 
+will benchmark the available parsers:
+    1. Scroll down the the bottom of the file, to the 'BENCHMARKING PARSERS FROM MAIN' section.
+    2. In the second point of this section, choose the number of rows in the synthetic files
+    3. Run the python file
+
+The synthetic .csv and binary files will be saved in the /data folder of the current working 
+directory and the time taken by each parser will be printed. The current given by each parser is
+checked against the original whole dataframe parse in the tests/ folder.
 
 ===================================================================================================
 '''
 
 
 import sys
+import os
+import io
+import time
+import hashlib
+import gzip
+import lzma
+import bz2
+import queue
+import threading
+import glob
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
+from errno import EEXIST
+from importlib.util import find_spec
 
 
 class Oscilloscope:
@@ -48,31 +80,732 @@ class Oscilloscope:
 
     Requires:\n
     file - directory location of the oscilloscope data selected for analysis\n
-    cf - user-defined voltage-to-current conversion factor of the potentiostat
+    cf - user-defined voltage-to-current conversion factor of the potentiostat\n
+    stream - a True or False option for whether the file is read in blocks (using Blocks or Fill) instead of being loaded straight away\n
+    block - the number of rows in each block when the file is streamed\n
+    cache - an instance of the Cache class used to keep and reopen parsed files (or None to always parse the .csv file)\n
+    dtype - the datatype of the current array (np.float64 or np.float32)\n
+    engine - the parser used to read the current column ('pyarrow', 'pandas', 'numpy', or 'auto' to use pyarrow when it is installed and numpy otherwise)\n
+    compact - a True or False option for whether the current is kept as integer ADC codes (see Scaled), which falls back on a float array if the file does not hold ADC levels\n
+    thread - a True or False option for whether compressed files (.gz, .xz, or .bz2) are decompressed in a separate thread whilst they are parsed
     '''
 
-    def __init__(self, file, cf):
+    compressions = {'.gz': gzip.open, '.xz': lzma.open, '.bz2': bz2.open}      # functions which open each type of compressed file as a stream
+
+    def __init__(self, file, cf, stream = False, block = 1048576, cache = None, dtype = np.float64, engine = 'auto', compact = False, thread = False):
 
         '''PARAMETER INITIALISATION'''
         self.label = 'imported'      # label for use in operations.py
 
         self.file = file        # location of the oscilloscope file which has been selected for analysis
         self.cf = cf        # conversion factor of voltage-to-current defined by the user for the potentiostat/settings used
+        self.stream = stream        # boolean value which decides if the file is read in blocks or loaded straight away
+        self.block = block      # number of rows in each block when the file is streamed
+        self.cache = cache      # cache of parsed oscilloscope files
+        self.dtype = dtype      # datatype of the current array
+        self.engine = engine        # parser used to read the current column
+        self.compact = compact      # boolean value which decides if the current is kept as integer ADC codes or not
+        self.thread = thread        # boolean value which decides if compressed files are decompressed in a separate thread or not
 
         '''DATATYPE ERRORS'''
         if isinstance(self.cf, (float)) is False:       # checks that the conversion factor is a float value
             print('\n' + 'An invalid datatype was used for the conversion factor. Enter a float value.' + '\n')
             sys.exit()
+        if isinstance(self.stream, (bool)) is False:        # checks that the given stream option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the stream option. Enter a Boolean value.' + '\n')
+            sys.exit()
+        if isinstance(self.block, (int)) is False:      # checks that the given block size is an integer value
+            print('\n' + 'An invalid datatype was used for the block size. Enter an integer value.' + '\n')
+            sys.exit()
+        if isinstance(self.cache, (Cache, type(None))) is False:        # checks that the given cache is an instance of the Cache class or None
+            print('\n' + 'An invalid datatype was used for the cache. Enter an instance of the Cache class or None.' + '\n')
+            sys.exit()
+        if self.dtype not in (np.float64, np.float32, float):     # checks that the given datatype is a float datatype
+            print('\n' + 'An invalid datatype was used for the current array. Enter np.float64 or np.float32.' + '\n')
+            sys.exit()
+        if self.engine not in ('auto', 'pyarrow', 'pandas', 'numpy'):       # checks that the given parser is one of the available parsers
+            print('\n' + 'An invalid parser was chosen. Enter auto, pyarrow, pandas, or numpy.' + '\n')
+            sys.exit()
+        if isinstance(self.compact, (bool)) is False:       # checks that the given compact option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the compact option. Enter a Boolean value.' + '\n')
+            sys.exit()
+        if isinstance(self.thread, (bool)) is False:        # checks that the given thread option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the thread option. Enter a Boolean value.' + '\n')
+            sys.exit()
         
         '''DATA VALUE ERRORS'''
         if self.cf <= 0:        # checks that the conversion factor is a positive non-zero value
             print('\n' + 'Conversion factor must be a postive non-zero value.' + '\n')
             sys.exit()
+        if self.block <= 0:     # checks that the block size is a positive non-zero value
+            print('\n' + 'Block size must be a positive non-zero value.' + '\n')
+            sys.exit()
+        if self.engine == 'pyarrow' and find_spec('pyarrow') is None:       # checks that pyarrow is installed if it has been chosen
+            print('\n' + 'The pyarrow parser was chosen but pyarrow is not installed. Install pyarrow or choose another parser.' + '\n')
+            sys.exit()
+
+        '''PARAMETER DEFINITIONS'''
+        self.dtype = np.dtype(self.dtype)       # converts the datatype into a numpy datatype
+        if self.engine == 'auto':       # activates in cases where the parser is chosen automatically
+            self.engine = 'pyarrow' if find_spec('pyarrow') is not None else 'numpy'        # uses the faster pyarrow parser when it is installed, falling back on the numpy parser
 
         '''OSCILLOSCOPE FILE IMPORT'''
+        if self.stream == False:        # activates in cases where the whole file is loaded straight away
+            self.i = self.cache.Load(self.file, self.cf, self.dtype) if self.cache is not None else None      # reopens the parsed file from the cache if it is there
+            if self.i is None:      # activates in cases where the .csv file needs to be parsed
+                self.i = self.Parse()       # parses the current column of the .csv oscilloscope file
+                if self.cache is not None:      # activates in cases where parsed files are cached
+                    self.cache.Store(self.file, self.cf, self.dtype, self.i)        # keeps the parsed file in the cache for next time
+            if self.compact == True:        # activates in cases where the current is kept as integer ADC codes
+                compacted = Scaled.Compact(self.i)      # finds the ADC codes which reproduce the current
+                self.i = compacted if compacted is not None else self.i     # keeps the float array if the file does not hold ADC levels
+
+
+    def Open(self):
+        '''Returns the oscilloscope file as a stream of decompressed bytes if it is compressed (.gz, .xz, or .bz2), or as its location otherwise, \n
+        ready to be used in a with statement so that the stream is always closed'''
+
+        opener = self.compressions.get(os.path.splitext(self.file)[1].lower())     # function which opens this type of compressed file
+        if opener is None:      # activates in cases where the file is not compressed
+            return nullcontext(self.file)
+        stream = opener(self.file, 'rb')        # opens the compressed file as a stream, so that it is never decompressed to disk
+        return io.BufferedReader(Decompressor(stream), 1048576) if self.thread == True else stream       # moves the decompression into a separate thread if requested
+
+
+    def Parse(self):
+        '''Parses only the current column of the oscilloscope file (skipping the two header rows) straight into the chosen datatype, \n
+        then modifies it using the conversion factor'''
+
         try:
-            df = pd.read_csv(self.file, header = 1, low_memory = False)     # opens the .csv oscilloscope file into a pandas dataframe without the header and with full detail
-            self.i = df.to_numpy().astype(float)[:,1]       # converts the pandas dataframe to a numpy filled with float values
-            self.i *= -self.cf      # modifies the array using the conversion factor
+            with self.Open() as source:     # opens the file, decompressing it as it is read if necessary
+                if self.engine == 'pyarrow':        # activates in cases where the pyarrow parser is used
+                    import pyarrow
+                    import pyarrow.csv
+                    table = pyarrow.csv.read_csv(source, read_options = pyarrow.csv.ReadOptions(skip_rows = 2, autogenerate_column_names = True), convert_options = pyarrow.csv.ConvertOptions(include_columns = ['f1'], column_types = {'f1': pyarrow.from_numpy_dtype(self.dtype)}))       # parses only the second column, which holds the current
+                    i = table.column(0).to_numpy()      # converts the parsed column to a numpy array
+                if self.engine == 'pandas':     # activates in cases where the pandas parser is used
+                    i = pd.read_csv(source, header = 1, usecols = [1], dtype = self.dtype).iloc[:, 0].to_numpy(dtype = self.dtype)     # parses only the second column, which holds the current
+                if self.engine == 'numpy':      # activates in cases where the numpy parser is used
+                    i = np.loadtxt(source, dtype = self.dtype, delimiter = ',', skiprows = 2, usecols = 1, ndmin = 1)       # parses only the second column, which holds the current
         except:
-            raise       # raises an error if the .csv file was not readable for any reason
\ No newline at end of file
+            raise       # raises an error if the .csv file was not readable for any reason
+        
+        return np.multiply(i, -self.cf, out = i if i.flags.writeable else None)        # modifies the array using the conversion factor
+
+
+    def Blocks(self):
+        '''Reads the oscilloscope file one block at a time, yielding the current column of each block as a numpy array of float values \n
+        which has already been modified using the conversion factor, so that only one block is ever held in memory'''
+
+        with self.Open() as source, pd.read_csv(source, header = 1, usecols = [1], dtype = self.dtype, chunksize = self.block) as reader:      # opens the .csv oscilloscope file (decompressing it as it is read if necessary) without the header, ready to be read in blocks
+            for df in reader:       # loops through the blocks of the file
+                yield df.iloc[:, 0].to_numpy(dtype = self.dtype) * -self.cf      # converts the current column of the block to a numpy array filled with float values and modifies it using the conversion factor
+
+
+    def Fill(self, out = None, path = None):
+        '''Reads the oscilloscope file in a single pass, copying each block into either a preallocated array (out) or a binary file which \n
+        is then memory-mapped (path), and keeps the result as the current array\n
+
+        Requires either:\n
+        out - a preallocated array (or memory-mapped array) which is large enough to hold the current column\n
+        path - the location of a binary file which is created to hold the current column'''
+
+        if (out is None) == (path is None):     # checks that exactly one destination has been given
+            print('\n' + 'Either a preallocated array or a file path must be given to fill, but not both.' + '\n')
+            sys.exit()
+        
+        position = 0        # number of rows which have been copied so far
+        if out is not None:     # activates in cases where the blocks are copied into a preallocated array
+            for block in self.Blocks():     # loops through the blocks of the file
+                if position + block.size > out.size:        # checks that the preallocated array is large enough to hold the next block
+                    raise ValueError(f'The preallocated array holds {out.size} values, but {self.file} holds more rows than this')
+                out[position : position + block.size] = block       # copies the block into the preallocated array
+                position += block.size
+            self.i = out[:position]     # keeps the filled part of the preallocated array as the current array
+        else:       # activates in cases where the blocks are written to a binary file
+            with open(path, 'wb') as binary:        # creates the binary file
+                for block in self.Blocks():     # loops through the blocks of the file
+                    binary.write(block.tobytes())       # and writes each block to the end of the binary file
+                    position += block.size
+            self.i = np.memmap(path, dtype = self.dtype, mode = 'r+', shape = (position,)) if position > 0 else np.zeros(0, dtype = self.dtype)     # memory-maps the binary file as the current array
+        
+        return self.i
+
+
+
+class Decompressor(io.RawIOBase):
+
+    '''Reads a compressed stream in a separate thread, so that decompression overlaps with parsing. Decompressed chunks are passed to \n
+    the parser through a bounded queue, which holds the thread back whenever the parser falls behind\n
+
+    Requires:\n
+    stream - a stream of decompressed bytes (e.g. from gzip.open, lzma.open, or bz2.open)\n
+    chunk - the number of bytes decompressed at a time\n
+    depth - the number of decompressed chunks which can wait in the queue'''
+
+    def __init__(self, stream, chunk = 1048576, depth = 8):
+
+        '''PARAMETER INITIALISATION'''
+        super().__init__()
+        self.stream = stream        # stream of decompressed bytes
+        self.chunk = chunk      # number of bytes decompressed at a time
+        self.queue = queue.Queue(maxsize = depth)       # bounded queue of decompressed chunks
+        self.buffer = memoryview(b'')       # remainder of the chunk which is being read
+        self.finished = False       # boolean value which marks the end of the stream
+        self.error = None       # error from the thread, which is raised again on every read once it has been taken from the queue
+        self.stopped = threading.Event()        # event which tells the thread to stop early when the stream is closed
+
+        '''DECOMPRESSION THREAD'''
+        self.worker = threading.Thread(target = self.Run, daemon = True)        # thread which decompresses the stream
+        self.worker.start()
+
+
+    def Run(self):
+        '''Decompresses the stream one chunk at a time, passing each chunk (then an empty chunk, or any error) to the queue'''
+
+        try:
+            while True:
+                data = self.stream.read(self.chunk)     # decompresses the next chunk
+                if self.Put(data) is False or not data:       # stops when the stream has been closed or at the end of the stream
+                    return
+        except Exception as exc:        # passes any error on to the parser
+            self.Put(exc)
+
+
+    def Put(self, item):
+        '''Waits for room in the queue and adds the item to it, returning False if the stream is closed whilst waiting'''
+
+        while self.stopped.is_set() is False:       # keeps waiting unless the stream has been closed
+            try:
+                self.queue.put(item, timeout = 0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+    def readable(self):
+        return True
+
+
+    def readinto(self, buffer):
+        '''Copies decompressed bytes into the given buffer, waiting for the thread if the queue is empty'''
+
+        while len(self.buffer) == 0:        # activates in cases where the previous chunk has been read completely
+            if self.error is not None:      # raises the error from the thread again, since the thread has stopped and nothing more will reach the queue
+                raise self.error
+            if self.finished == True:       # returns nothing at the end of the stream
+                return 0
+            data = self.queue.get()     # takes the next decompressed chunk from the queue
+            if isinstance(data, Exception):     # raises any error from the thread
+                self.error = data
+                raise data
+            if not data:        # marks the end of the stream
+                self.finished = True
+            self.buffer = memoryview(data)
+        size = min(len(buffer), len(self.buffer))       # number of bytes which are copied
+        buffer[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+    def close(self):
+        '''Stops the thread and closes the compressed stream'''
+
+        if self.closed == False:
+            self.stopped.set()      # tells the thread to stop
+            self.worker.join()
+            self.stream.close()
+        super().close()
+
+
+
+class Scaled(np.lib.mixins.NDArrayOperatorsMixin):
+
+    '''Stands in for a current array by holding the raw integer ADC codes of an oscilloscope, converting only the elements which are asked for \n
+    into current (i.e. codes * gain + shift). Supports slicing (which returns another Scaled array without converting anything), integer and \n
+    Boolean indexing, iteration, arithmetic, and conversion into a full numpy array \n
+
+    Requires: \n
+    codes - an integer array (or memory-mapped array) of ADC codes \n
+    gain - the current (in A) of a single ADC code \n
+    shift - the current (in A) of an ADC code of zero \n
+    dtype - the datatype of the converted current values'''
+
+    def __init__(self, codes, gain, shift, dtype = np.float64):
+
+        '''PARAMETER INITIALISATION'''
+        self.codes = codes      # integer ADC codes
+        self.gain = float(gain)     # current of a single ADC code (in A)
+        self.shift = float(shift)       # current of an ADC code of zero (in A)
+        self.dtype = np.dtype(dtype)        # datatype of the converted current values
+        self.size = self.codes.size     # number of points in the current array
+        self.shape = self.codes.shape       # shape of the equivalent numpy array
+        self.ndim = self.codes.ndim     # number of dimensions of the equivalent numpy array (2 for the transients of every step, see Transients in operations.py)
+
+
+    def __len__(self):
+        return self.shape[0]
+
+
+    def Convert(self, codes):
+        '''Converts an array of ADC codes into current'''
+
+        values = np.multiply(codes, self.gain, dtype = self.dtype)       # converts the codes straight into the datatype of the current
+        values += self.dtype.type(self.shift)
+        return values
+
+
+    def __getitem__(self, key):
+        '''Converts the requested elements, or returns another Scaled array for slices'''
+
+        if isinstance(key, slice) or (isinstance(key, tuple) and all(isinstance(ix, slice) for ix in key)):      # slices remain unconverted, in the same way that they are views of a numpy array
+            return Scaled(self.codes[key], self.gain, self.shift, self.dtype)
+        values = self.Convert(self.codes[key])      # converts the codes at the requested positions
+        return values[()] if values.ndim == 0 else values       # returns a single value for a single integer index
+
+
+    def __iter__(self):
+        for ix in range(0, self.size, 65536):       # converts the codes in blocks so that iterating never holds the whole current array
+            yield from self.Convert(self.codes[ix : ix + 65536])
+
+
+    def __array__(self, dtype = None, copy = None):
+        values = self.Convert(self.codes)       # converts every code
+        return values if dtype is None else values.astype(dtype)
+
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = tuple(np.asarray(ix) if isinstance(ix, Scaled) else ix for ix in inputs)       # converts any Scaled arrays used in arithmetic
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+
+    @classmethod
+    def Compact(cls, values, tolerance = 0.05):
+        '''Returns a Scaled array which holds the given current values as the smallest integer codes (int8 or int16) that reproduce them, \n
+        or None if the values do not lie on the evenly spaced levels of an ADC (e.g. simulated data or data which has been filtered) or \n
+        hold nan or infinite values (which no integer code can represent). The spacing between levels is estimated from the first MiB \n
+        of values only, but every value is then checked against the levels, so a poor estimate can only refuse to compact the values \n
+        (the levels found in part of the data are a subset of the levels of the ADC, so they can only be spaced further apart)\n
+
+        Requires:\n
+        values - an array of current values read from an oscilloscope file\n
+        tolerance - the largest difference between a value and its level (as a fraction of the spacing between levels) which is accepted, \n
+        allowing for the rounding of values written to a .csv file'''
+
+        values = np.asarray(values)     # converts the current values into an array
+        if values.size == 0:        # activates in cases where there are no values to compact
+            return None
+        low, high = np.amin(values), np.amax(values)        # lowest and highest current values
+        if np.isfinite(low) == False or np.isfinite(high) == False:       # activates in cases where any value is nan or infinite (which both carry through to the lowest or highest value)
+            return None
+        levels = np.unique(values[:1048576])        # finds the levels used in the first MiB of values, which is enough to find the spacing between levels
+        if levels.size < 2:     # activates in cases where the spacing between levels cannot be found
+            return None
+        step = (high - low) / np.rint((high - low) / np.amin(np.diff(levels)))     # spacing between levels, measured across the whole range of values so that it is as accurate as possible
+        zero = np.rint(low / step)      # code of the lowest level in cases where the code of zero current is 0
+        span = np.rint((high - low) / step)     # number of levels between the lowest and highest values
+
+        for code in (np.int8, np.int16):        # tries the smallest datatype first
+            info = np.iinfo(code)       # range of codes which the datatype can hold
+            if span > int(info.max) - int(info.min):        # skips datatypes which are too small to hold every level
+                continue
+            if abs(low / step - zero) <= tolerance and info.min <= zero and zero + span <= info.max:      # keeps the code of zero current at 0 whenever possible
+                shift = 0.0
+            else:       # otherwise the lowest level is given the lowest code
+                shift = low - float(info.min) * step
+            codes = np.empty(values.size, dtype = code)     # creates an array to hold the codes
+            for ix in range(0, values.size, 1048576):       # converts the values one MiB at a time to avoid large temporary arrays
+                block = (values[ix : ix + 1048576] - shift) / step      # position of each value between the levels
+                codes[ix : ix + 1048576] = np.rint(block)
+                if np.amax(np.abs(block - codes[ix : ix + 1048576])) > tolerance:      # checks that every value lies on a level
+                    return None
+            return cls(codes, step, shift, values.dtype)
+        return None
+
+
+
+class Binary:
+
+    '''Opens a single raw binary oscilloscope export of int8 or int16 ADC codes, memory-mapping the codes and converting them into current \n
+    only when they are used\n
+
+    The binary file is laid out as a little-endian header followed by the block of ADC codes:\n
+    magic - the four bytes b'OSCB'\n
+    version - the version of the layout (uint16, currently 1)\n
+    width - the number of bytes in each ADC code (uint16, 1 for int8 or 2 for int16)\n
+    length - the number of bytes in the header, i.e. the position of the first ADC code (uint32)\n
+    samples - the number of ADC codes (uint64)\n
+    scale - the voltage of a single ADC code (float64, in V)\n
+    offset - the voltage of an ADC code of zero (float64, in V)\n
+    interval - the time between two ADC codes (float64, in s)\n
+
+    Requires:\n
+    file - directory location of the binary oscilloscope file selected for analysis\n
+    cf - user-defined voltage-to-current conversion factor of the potentiostat
+    '''
+
+    header = np.dtype([('magic', 'S4'), ('version', '<u2'), ('width', '<u2'), ('length', '<u4'), ('samples', '<u8'), ('scale', '<f8'), ('offset', '<f8'), ('interval', '<f8')])        # layout of the header
+    widths = {1: np.dtype('<i1'), 2: np.dtype('<i2')}       # datatypes of the ADC codes for each code width
+
+    def __init__(self, file, cf):
+
+        '''PARAMETER INITIALISATION'''
+        self.label = 'imported'      # label for use in operations.py
+
+        self.file = file        # location of the binary oscilloscope file which has been selected for analysis
+        self.cf = cf        # conversion factor of voltage-to-current defined by the user for the potentiostat/settings used
+
+        '''DATATYPE ERRORS'''
+        if isinstance(self.cf, (float)) is False:       # checks that the conversion factor is a float value
+            print('\n' + 'An invalid datatype was used for the conversion factor. Enter a float value.' + '\n')
+            sys.exit()
+
+        '''DATA VALUE ERRORS'''
+        if self.cf <= 0:        # checks that the conversion factor is a positive non-zero value
+            print('\n' + 'Conversion factor must be a postive non-zero value.' + '\n')
+            sys.exit()
+
+        '''OSCILLOSCOPE FILE IMPORT'''
+        header = np.fromfile(self.file, dtype = self.header, count = 1)        # reads the header of the binary file
+        if header.size == 0 or header['magic'][0] != b'OSCB':        # checks that the file is a binary oscilloscope file
+            raise ValueError(f'{self.file} is not a binary oscilloscope file')
+        if int(header['width'][0]) not in self.widths:       # checks that the ADC codes are int8 or int16 values
+            raise ValueError(f'{self.file} holds ADC codes of {int(header["width"][0])} bytes, but only 1 or 2 bytes are supported')
+
+        self.version = int(header['version'][0])        # version of the layout
+        self.width = int(header['width'][0])        # number of bytes in each ADC code
+        self.samples = int(header['samples'][0])        # number of ADC codes
+        self.scale = float(header['scale'][0])      # voltage of a single ADC code (in V)
+        self.offset = float(header['offset'][0])        # voltage of an ADC code of zero (in V)
+        self.interval = float(header['interval'][0])        # time between two ADC codes (in s)
+
+        if int(header['length'][0]) + self.samples * self.width > os.path.getsize(self.file):     # checks that the file holds every ADC code given in the header
+            raise ValueError(f'{self.file} is shorter than the {self.samples} ADC codes given in its header')
+
+        '''PARAMETER DEFINITIONS'''
+        self.codes = np.memmap(self.file, dtype = self.widths[self.width], mode = 'r', offset = int(header['length'][0]), shape = (self.samples,)) if self.samples > 0 else np.zeros(0, dtype = self.widths[self.width])      # memory-maps the block of ADC codes without reading it
+        self.i = Scaled(self.codes, -self.scale * self.cf, -self.offset * self.cf)       # current array, converted from the ADC codes (and modified using the conversion factor) only when it is used
+
+
+    @classmethod
+    def Write(cls, file, codes, scale, offset, interval):
+        '''Writes an array of int8 or int16 ADC codes to a binary oscilloscope file, along with the scale and offset (in V) and sample interval (in s)'''
+
+        codes = np.asarray(codes)       # converts the ADC codes into an array
+        width = [ix for ix in cls.widths if cls.widths[ix] == codes.dtype.newbyteorder('<')]     # code width which matches the datatype of the ADC codes
+        if len(width) == 0:     # checks that the ADC codes are int8 or int16 values
+            raise ValueError(f'ADC codes must be int8 or int16 values, but {codes.dtype} values were given')
+
+        header = np.zeros(1, dtype = cls.header)        # header of the binary file
+        header['magic'], header['version'], header['width'], header['length'] = b'OSCB', 1, width[0], cls.header.itemsize
+        header['samples'], header['scale'], header['offset'], header['interval'] = codes.size, scale, offset, interval
+        with open(file, 'wb') as binary:        # creates the binary file
+            binary.write(header.tobytes())      # writes the header
+            binary.write(codes.astype(cls.widths[width[0]], copy = False).tobytes())        # followed by the block of ADC codes
+
+
+
+class Cache:
+
+    '''Keeps the current column of parsed oscilloscope files as binary .npy files, so that they can be reopened without parsing the .csv file again\n
+
+    Requires:\n
+    directory - location of the folder which holds the cached files (None uses a /cache folder in the current working directory)\n
+    limit - the maximum total size of the cached files (in bytes), beyond which the least recently used files are deleted
+    '''
+
+    def __init__(self, directory = None, limit = 4294967296):
+
+        '''PARAMETER INITIALISATION'''
+        self.directory = directory if directory is not None else os.getcwd() + '/cache'      # location of the folder which holds the cached files
+        self.limit = limit      # maximum total size of the cached files (in bytes)
+
+        '''DATATYPE ERRORS'''
+        if isinstance(self.directory, (str)) is False:      # checks that the given directory is a string
+            print('\n' + 'An invalid datatype was used for the cache directory. Enter a string or None.' + '\n')
+            sys.exit()
+        if isinstance(self.limit, (int)) is False:      # checks that the given size limit is an integer value
+            print('\n' + 'An invalid datatype was used for the cache size limit. Enter an integer value corresponding to a number of bytes.' + '\n')
+            sys.exit()
+
+        '''DATA VALUE ERRORS'''
+        if self.limit <= 0:     # checks that the size limit is a positive non-zero value
+            print('\n' + 'Cache size limit must be a positive non-zero value.' + '\n')
+            sys.exit()
+
+        '''CACHE FOLDER'''
+        try:
+            os.makedirs(self.directory)
+        except OSError as exc:
+            if exc.errno == EEXIST and os.path.isdir(self.directory):
+                pass
+            else: 
+                raise
+
+
+    def Key(self, file, cf, dtype):
+        '''Returns the name of the cached file for an oscilloscope file, built from its path, size, modification time, and a hash of its contents \n
+        (the first and last MiB, which is enough to tell captures apart without reading the whole file), along with the conversion factor and datatype'''
+
+        status = os.stat(file)      # size and modification time of the oscilloscope file
+        digest = hashlib.blake2b(digest_size = 16)      # hash which identifies the oscilloscope file
+        digest.update(f'{os.path.abspath(file)}|{status.st_size}|{status.st_mtime_ns}|{cf!r}|{np.dtype(dtype).str}'.encode())      # adds the path, size, modification time, conversion factor, and datatype to the hash
+        with open(file, 'rb') as raw:       # opens the oscilloscope file to add its contents to the hash
+            digest.update(raw.read(1048576))        # adds the first MiB of the file
+            if status.st_size > 2097152:        # activates in cases where the end of the file has not already been read
+                raw.seek(-1048576, os.SEEK_END)
+            digest.update(raw.read(1048576))        # adds the last MiB of the file
+        return os.path.join(self.directory, digest.hexdigest() + '.npy')
+
+
+    def Load(self, file, cf, dtype):
+        '''Returns the cached current column of an oscilloscope file as a read-only memory-mapped array, or None if it is not in the cache'''
+
+        path = self.Key(file, cf, dtype)       # location of the cached file
+        try:
+            i = np.load(path, mmap_mode = 'r')      # memory-maps the cached file without copying it
+        except (OSError, ValueError):       # activates in cases where the file is not in the cache or could not be read
+            return None
+        os.utime(path)      # marks the cached file as the most recently used
+        return i
+
+
+    def Store(self, file, cf, dtype, i):
+        '''Writes the current column of an oscilloscope file to the cache, then deletes the least recently used files if the cache is too large'''
+
+        path = self.Key(file, cf, dtype)       # location of the cached file
+        np.save(path + '.tmp.npy', i)       # writes the current column to a temporary file
+        os.replace(path + '.tmp.npy', path)     # and moves it into place, so that a partly written file is never opened
+        self.Evict(path)
+
+
+    def Evict(self, keep = None):
+        '''Deletes the least recently used cached files until the cache fits within its size limit (never deleting the file which is kept)'''
+
+        files = [os.path.join(self.directory, ix) for ix in os.listdir(self.directory) if ix.endswith('.npy') and not ix.endswith('.tmp.npy')]       # finds every cached file
+        files.sort(key = lambda ix: os.stat(ix).st_mtime_ns)       # orders the cached files from the least to the most recently used
+        total = sum(os.stat(ix).st_size for ix in files)        # total size of the cached files (in bytes)
+        for ix in files:        # loops through the cached files, starting from the least recently used
+            if total <= self.limit:     # stops once the cache fits within its size limit
+                break
+            if ix == keep:      # never deletes the file which has just been used
+                continue
+            total -= os.stat(ix).st_size
+            os.remove(ix)
+
+
+
+class Batch:
+
+    '''Opens every oscilloscope file in a directory (or matching a glob pattern) using the Oscilloscope class, parsing the files in a process \n
+    pool and passing each current array back as a memory-mapped .npy file instead of copying it between processes. Files which cannot be \n
+    opened are reported without stopping the rest of the batch. The .npy files are deleted by Close (or at the end of a with statement), \n
+    after which the current arrays can no longer be used\n
+
+    Requires:\n
+    source - a directory holding the oscilloscope files (.csv, .csv.gz, .csv.xz, or .csv.bz2), or a glob pattern which matches them\n
+    cf - user-defined voltage-to-current conversion factor of the potentiostat\n
+    workers - the number of processes used to parse files in parallel (or None to parse every file in this process)\n
+    directory - location of the folder which holds the parsed current arrays (None uses a /batch folder in the current working directory)\n
+    dtype - the datatype of the current arrays (np.float64 or np.float32)\n
+    engine - the parser used to read the current column of each file (see Oscilloscope)\n
+    thread - a True or False option for whether compressed files are decompressed in a separate thread whilst they are parsed
+    '''
+
+    extensions = ('.csv', '.csv.gz', '.csv.xz', '.csv.bz2')     # types of file which are opened from a directory
+
+    def __init__(self, source, cf, workers = None, directory = None, dtype = np.float64, engine = 'auto', thread = False):
+
+        '''PARAMETER INITIALISATION'''
+        self.source = source        # directory or glob pattern of the oscilloscope files which have been selected for analysis
+        self.cf = cf        # conversion factor of voltage-to-current defined by the user for the potentiostat/settings used
+        self.workers = workers      # number of processes used to parse files in parallel
+        self.directory = directory if directory is not None else os.getcwd() + '/batch'      # location of the folder which holds the parsed current arrays
+        self.dtype = dtype      # datatype of the current arrays
+        self.engine = engine        # parser used to read the current column of each file
+        self.thread = thread        # boolean value which decides if compressed files are decompressed in a separate thread or not
+
+        '''DATATYPE ERRORS'''
+        if isinstance(self.source, (str)) is False:     # checks that the given source is a string
+            print('\n' + 'An invalid datatype was used for the source. Enter a string corresponding to a directory or a glob pattern.' + '\n')
+            sys.exit()
+        if isinstance(self.cf, (float)) is False:       # checks that the conversion factor is a float value
+            print('\n' + 'An invalid datatype was used for the conversion factor. Enter a float value.' + '\n')
+            sys.exit()
+        if isinstance(self.workers, (int, type(None))) is False:        # checks that the given number of workers is an integer value or None
+            print('\n' + 'An invalid datatype was used for the number of workers. Enter an integer value or None.' + '\n')
+            sys.exit()
+        if isinstance(self.directory, (str)) is False:      # checks that the given directory is a string
+            print('\n' + 'An invalid datatype was used for the batch directory. Enter a string or None.' + '\n')
+            sys.exit()
+
+        '''DATA VALUE ERRORS'''
+        if self.cf <= 0:        # checks that the conversion factor is a positive non-zero value
+            print('\n' + 'Conversion factor must be a postive non-zero value.' + '\n')
+            sys.exit()
+        if self.workers != None and self.workers <= 0:       # checks that the given number of workers is greater than 0
+            print('\n' + 'Number of workers must be a positive non-zero value or None' + '\n')
+            sys.exit()
+
+        '''BATCH FOLDER'''
+        self.created = os.path.isdir(self.directory) is False       # boolean value which decides if the batch folder is deleted by Close
+        try:
+            os.makedirs(self.directory)
+        except OSError as exc:
+            if exc.errno == EEXIST and os.path.isdir(self.directory):
+                pass
+            else: 
+                raise
+
+        '''PARAMETER DEFINITIONS'''
+        self.files = Batch.Find(self.source)        # finds every oscilloscope file in the directory or matching the pattern
+        jobs = [(ix, os.path.join(self.directory, f'{iy:05d} {os.path.basename(ix)}.npy')) for iy, ix in enumerate(self.files)]       # pairs every oscilloscope file with the .npy file which holds its current array
+        self.paths = [path for file, path in jobs]      # .npy files written by the batch, which are deleted by Close
+
+        self.i = {}     # memory-mapped current array of each file which was opened
+        self.rows = {}      # number of rows in each file which was opened
+        self.seconds = {}       # time taken to parse each file which was opened (in s)
+        self.rates = {}     # throughput of each file which was opened (in MB/s of the file on disk)
+        self.failures = {}      # error message of each file which could not be opened
+
+        '''BATCH IMPORT'''
+        start = time.time()
+        if self.workers == None:        # activates in cases where every file is parsed in this process
+            for file, path in jobs:
+                self.Collect(file, Batch.Load(file, path, self.cf, self.dtype, self.engine, self.thread))
+        else:       # activates in cases where the files are parsed in a process pool
+            with ProcessPoolExecutor(max_workers = self.workers) as pool:
+                futures = {pool.submit(Batch.Load, file, path, self.cf, self.dtype, self.engine, self.thread): file for file, path in jobs}     # submits every file to the process pool
+                for future in as_completed(futures):        # collects each file as soon as it has been parsed
+                    try:
+                        result = future.result()
+                    except Exception as exc:        # activates in cases where the process itself failed (e.g. it ran out of memory)
+                        result = {'error': f'{type(exc).__name__}: {exc}'}
+                    self.Collect(futures[future], result)
+        self.time = time.time() - start     # time taken to open the whole batch (in s)
+        print(f'{len(self.i)} of {len(self.files)} files were opened in {self.time} seconds')
+
+
+    @staticmethod
+    def Find(source):
+        '''Returns every oscilloscope file in a directory, or every file which matches a glob pattern, in alphabetical order'''
+
+        if os.path.isdir(source):       # activates in cases where a directory was given
+            return sorted(os.path.join(source, ix) for ix in os.listdir(source) if ix.lower().endswith(Batch.extensions))
+        return sorted(glob.glob(source))        # otherwise the source is a glob pattern
+
+
+    @staticmethod
+    def Load(file, path, cf, dtype, engine, thread):
+        '''Parses a single oscilloscope file and writes its current array to a .npy file, returning the number of rows and the time taken, \n
+        or the error if the file could not be opened'''
+
+        start = time.time()
+        try:
+            i = Oscilloscope(file, cf, dtype = dtype, engine = engine, thread = thread).i       # parses the current column of the file
+            np.save(path, i)        # writes the current array to a .npy file which is memory-mapped by the main process
+        except (Exception, SystemExit) as exc:      # catches unreadable files as well as invalid parameters
+            return {'error': f'{type(exc).__name__}: {exc}'}
+        return {'path': path, 'rows': int(i.size), 'seconds': time.time() - start, 'bytes': os.path.getsize(file)}
+
+
+    def Collect(self, file, result):
+        '''Memory-maps the current array of a parsed file and reports its throughput, or reports why the file could not be opened'''
+
+        if 'error' in result:       # activates in cases where the file could not be opened
+            self.failures[file] = result['error']
+            print(f'{os.path.basename(file)} could not be opened ({result["error"]})')
+            return
+        self.i[file] = np.load(result['path'], mmap_mode = 'r') if result['rows'] > 0 else np.load(result['path'])     # memory-maps the current array without copying it (empty arrays cannot be memory-mapped)
+        self.rows[file] = result['rows']
+        self.seconds[file] = result['seconds']
+        self.rates[file] = result['bytes'] / 1e6 / max(result['seconds'], 1e-9)
+        print(f'{os.path.basename(file)}: {self.rows[file]} rows in {self.seconds[file]:.3f} seconds ({self.rates[file]:.1f} MB/s)')
+
+
+    def Close(self):
+        '''Deletes the .npy files written by the batch (and the batch folder, if it was created by the batch and is now empty), \n
+        releasing the memory-mapped current arrays first'''
+
+        self.i = {}     # releases the memory-mapped current arrays, which cannot be used once their files are deleted
+        for path in self.paths:     # loops through the .npy files written by the batch, including any left by files which could not be opened
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        if self.created == True:        # activates in cases where the batch folder did not exist before the batch
+            try:
+                os.rmdir(self.directory)
+            except OSError:     # keeps the batch folder if anything else has been saved in it
+                pass
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.Close()
+
+
+    def output(self):
+        '''Returns the throughput of every file which was opened for checking purposes'''
+
+        zipped = zip(self.i.keys(), self.rows.values(), self.seconds.values(), self.rates.values())     # zipped array containing the file, rows, time taken, and throughput of each file
+        return zipped
+
+
+
+"""
+===================================================================================================
+BENCHMARKING PARSERS FROM MAIN
+===================================================================================================
+"""
+
+if __name__ == '__main__':
+
+    '''1. MAKE A /DATA FOLDER''' 
+    cwd = os.getcwd()
+
+    try:
+        os.makedirs(cwd + '/data')
+    except OSError as exc:
+        if exc.errno == EEXIST and os.path.isdir(cwd + '/data'):
+            pass
+        else: 
+            raise
+
+    '''2. DESCRIBE THE SYNTHETIC FILE'''
+    rows = 10000000
+    filepath = f'{cwd}/data/benchmark {rows} rows.csv'
+    binarypath = f'{cwd}/data/benchmark {rows} rows.bin'
+
+    '''3. WRITE THE SYNTHETIC FILE'''
+    if os.path.isfile(filepath) is False:
+        with open(filepath, 'w') as file:
+            file.write('Model,Benchmark,\nSecond,Volt,\n')
+            for ix in range(0, rows, 1000000):
+                t = np.arange(ix, min(ix + 1000000, rows)) * 5e-7
+                np.savetxt(file, np.column_stack((t, 0.01 * np.sin(t * 1000))), fmt = '%.6e', delimiter = ',')
+    if os.path.isfile(binarypath) is False:
+        Binary.Write(binarypath, np.round(0.01 * np.sin(np.arange(rows) * 5e-4) / 1e-6).astype(np.int16), scale = 1e-6, offset = 0.0, interval = 5e-7)
+
+    '''4. TIME EACH PARSER'''
+    start = time.time()
+    pd.read_csv(filepath, header = 1, low_memory = False).to_numpy().astype(float)[:,1]
+    print(f'Whole dataframe (float64): {time.time() - start} seconds')
+
+    for engine in ('pyarrow', 'pandas', 'numpy'):
+        if engine == 'pyarrow' and find_spec('pyarrow') is None:
+            print('pyarrow is not installed')
+            continue
+        for dtype in (np.float64, np.float32):
+            start = time.time()
+            Oscilloscope(filepath, cf = 1.0, dtype = dtype, engine = engine)
+            print(f'{engine} ({np.dtype(dtype).name}): {time.time() - start} seconds')
+
+    start = time.time()
+    binary = Binary(binarypath, cf = 1.0)
+    np.asarray(binary.i)
+    print(f'Binary (int16 codes): {time.time() - start} seconds')
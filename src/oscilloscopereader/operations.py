@@ -25,23 +25,52 @@ Filename:           operations.py
 Description:
 
 This file contains the code used by the oscilloscope-reader package to analyse oscilloscope data,
-both simulated and imported. On its own, it will work out the position of the vertex potentials
-from the oscilloscope data and update the potential waveform accordingly. Returned data can be in
-its raw format, the result of a moving average operation, or the result of a current sampling
-routine.
+both simulated and imported. On its own, it will work out the position of the vertex potentials from
+the oscilloscope data and update the potential waveform accordingly. Returned data can be in its raw
+format, the result of a moving average operation, the result of a current sampling routine, or the
+result of a low-pass filter (Butterworth or windowed-sinc) with decimation. The transient of every
+step can also be viewed as one row of a matrix (Transients) and fitted with the RC model of
+simulations.py to give Cd and Ru for every step (Fit), and captures with several scans can be
+analysed one scan at a time in parallel, giving one row per scan (Scans). The Session class finds
+the peaks and vertex potentials once and reuses them for any number of these analyses. The Stream
+class gives the same results from data which is read one block at a time (e.g. an Oscilloscope
+opened with stream = True), yielding them as soon as they are known whilst holding only the points
+which are still needed.
 
 ===================================================================================================
 
 How to use this file:
     
-This file has no standalone operational capabilities.
+This file has no standalone operational capabilities for analysis. However, running it from main 
+will benchmark the analysis on several threads:
+    1. Scroll down the the bottom of the file, to the 'BENCHMARKING PARALLEL ANALYSIS FROM MAIN' section.
+    2. In the second point of this section, choose the waveform used to simulate a long capture
+    3. Run the python file
+
+The time taken by each analysis method with an increasing number of threads will be printed, along 
+with the speedup over analysing the data in one piece and a check that the results are the same.
+
+===================================================================================================
+
+Notes:
+
+Analysis on several threads splits the data into chunks of roughly chunk points, which are analysed 
+at the same time and joined back together in order. NumPy releases the GIL in the reductions used 
+here, so threads are used rather than processes, which would need to copy the data. The chunks only 
+depend on the chunk size, so the results do not change with the number of threads. Peak finding and 
+current sampling give exactly the same results as analysing the data in one piece, whilst the 
+running totals used by moving average analysis start again at each chunk, which can only change the 
+results by rounding errors (and not at all for integer ADC codes).
 
 ===================================================================================================
 '''
 
 
 import sys
+import copy
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 
 class Operations:
@@ -50,15 +79,25 @@ class Operations:
 
     Requires: \n
     shape - an instance of one of the potential waveform classes from the waveforms.py file\n
-    data - an instance of either the Capacitance class from the simulations.py file or the Oscilloscope class from the fileopener.py file\n
+    data - an instance of either the Capacitance class from the simulations.py file or the Oscilloscope or Binary classes from the fileopener.py file\n
     MA - a True or False option for whether moving average analysis is performed \n
     window - the window used for moving average anaysis \n
     step - the steps taken in moving average analysis \n 
     CS - a True or False option for whether current sampling analysis is performed \n
-    center - the fraction of the step interval where the center of the sampling region is located during current sampling analysis \n
-    range - the fraction of the step interval which is averaged during current sampling analysis'''
+    center - the fraction of the step interval where the center of the sampling region is located during current sampling analysis (or a list of fractions to sample several regions at once) \n
+    range - the fraction of the step interval which is averaged during current sampling analysis (or a list of fractions to sample several regions at once) \n
+    kahan - a True or False option for whether moving average analysis uses a Kahan compensated sum (slower, but more accurate for long captures) \n
+    workers - the number of threads used to analyse chunks of the data in parallel (or None to analyse the data in one piece) \n
+    chunk - the approximate number of points in each chunk analysed in parallel (the chunks do not depend on the number of threads, so that the results do not either) \n
+    alignment - an earlier instance of the Operations class for the same shape and data, whose peak positions and aligned potential waveform are reused instead of being found again (or None to find them) \n
+    vertex - the method used to align imported data with the potential waveform ('threshold' to find the first vertex from a large change between peaks, or 'correlation' to match the direction of every step, see Correlate) \n
+    LP - a True or False option for whether low-pass filter analysis is performed \n
+    filter - the low-pass filter which is used ('iir' for a Butterworth filter applied as a recursion, or 'fft' for a windowed-sinc filter applied by FFT convolution) \n
+    cutoff - the cutoff frequency of the low-pass filter as a fraction of the Nyquist frequency (i.e. half of the sampling rate) \n
+    order - the order of the Butterworth filter \n
+    decimate - the number of filtered points between each kept point in low-pass filter analysis'''
     
-    def __init__(self, shape, data, MA = False, window = 1000, step = 100, CS = False, center = 0.5, range = 0.95):
+    def __init__(self, shape, data, MA = False, window = 1000, step = 100, CS = False, center = 0.5, range = 0.95, kahan = False, workers = None, chunk = 4194304, alignment = None, vertex = 'threshold', LP = False, filter = 'iir', cutoff = 0.01, order = 4, decimate = 100):
         
         '''PARAMETER INITIALISATION'''
         self.shape = shape      # potential waveform object generated by waveforms.py
@@ -69,6 +108,16 @@ class Operations:
         self.CS = CS        # boolean value which decides if current sampling analysis is performed or not
         self.center = center      # fraction of interval where the centre of the sampling region is located in current sampling analysis
         self.range = range      # fraction of interval which is averaged in current sampling analysis
+        self.kahan = kahan      # boolean value which decides if moving average analysis uses a Kahan compensated sum or not
+        self.workers = workers      # number of threads used to analyse chunks of the data in parallel
+        self.chunk = chunk      # approximate number of points in each chunk analysed in parallel
+        self.alignment = alignment      # earlier analysis of the same data whose peak positions and potential waveform are reused
+        self.vertex = vertex        # method used to align imported data with the potential waveform
+        self.LP = LP        # boolean value which decides if low-pass filter analysis is performed or not
+        self.filter = filter        # low-pass filter used in low-pass filter analysis
+        self.cutoff = cutoff        # cutoff frequency of the low-pass filter as a fraction of the Nyquist frequency
+        self.order = order      # order of the Butterworth filter
+        self.decimate = decimate        # number of filtered points between each kept point in low-pass filter analysis
 
         '''DATA TYPE ERRORS'''
         if isinstance(self.MA, (bool)) is False:        # checks that the given moving average option is a Boolean value
@@ -83,11 +132,41 @@ class Operations:
         if isinstance(self.CS, (bool)) is False:        # checks that the given current sampling option is a Boolean value
             print('\n' + 'An invalid datatype was used for the current sampling option. Enter a Boolean value.' + '\n')
             sys.exit()
-        if isinstance(self.center, (float)) is False:       # checks that the given current sampling center is a float value
-            print('\n' + 'An invalid datatype was used for the current sampling center. Enter a float value.' + '\n')
+        if isinstance(self.center, (float, list, tuple, np.ndarray)) is False or all(isinstance(ix, float) for ix in np.ravel(self.center)) is False:       # checks that the given current sampling center is a float value or a list of float values
+            print('\n' + 'An invalid datatype was used for the current sampling center. Enter a float value or a list of float values.' + '\n')
             sys.exit()
-        if isinstance(self.range, (float)) is False:        # checks that the given current sampling range is a float value
-            print('\n' + 'An invalid datatype was used for the current sampling fraction. Enter a float value.' + '\n')
+        if isinstance(self.range, (float, list, tuple, np.ndarray)) is False or all(isinstance(ix, float) for ix in np.ravel(self.range)) is False:        # checks that the given current sampling range is a float value or a list of float values
+            print('\n' + 'An invalid datatype was used for the current sampling fraction. Enter a float value or a list of float values.' + '\n')
+            sys.exit()
+        if isinstance(self.kahan, (bool)) is False:     # checks that the given Kahan summation option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the Kahan summation option. Enter a Boolean value.' + '\n')
+            sys.exit()
+        if isinstance(self.workers, (int, type(None))) is False:        # checks that the given number of workers is an integer value or None
+            print('\n' + 'An invalid datatype was used for the number of workers. Enter an integer value or None.' + '\n')
+            sys.exit()
+        if isinstance(self.chunk, (int)) is False:      # checks that the given chunk size is an integer value
+            print('\n' + 'An invalid datatype was used for the chunk size. Enter an integer value.' + '\n')
+            sys.exit()
+        if isinstance(self.alignment, (Operations, type(None))) is False:      # checks that the given alignment is an earlier analysis or None
+            print('\n' + 'An invalid datatype was used for the alignment. Enter an instance of the Operations class or None.' + '\n')
+            sys.exit()
+        if isinstance(self.vertex, (str)) is False:     # checks that the given vertex method is a string
+            print('\n' + 'An invalid datatype was used for the vertex method. Enter a string.' + '\n')
+            sys.exit()
+        if isinstance(self.LP, (bool)) is False:        # checks that the given low-pass filter option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the low-pass filter option. Enter a Boolean value.' + '\n')
+            sys.exit()
+        if isinstance(self.filter, (str)) is False:     # checks that the given low-pass filter is a string
+            print('\n' + 'An invalid datatype was used for the low-pass filter. Enter a string.' + '\n')
+            sys.exit()
+        if isinstance(self.cutoff, (float)) is False:       # checks that the given cutoff frequency is a float value
+            print('\n' + 'An invalid datatype was used for the cutoff frequency. Enter a float value.' + '\n')
+            sys.exit()
+        if isinstance(self.order, (int)) is False:      # checks that the given filter order is an integer value
+            print('\n' + 'An invalid datatype was used for the filter order. Enter an integer value.' + '\n')
+            sys.exit()
+        if isinstance(self.decimate, (int)) is False:       # checks that the given decimation is an integer value
+            print('\n' + 'An invalid datatype was used for the decimation. Enter an integer value.' + '\n')
             sys.exit()
 
         '''DATA VALUE ERRORS'''
@@ -97,28 +176,88 @@ class Operations:
         if self.step <= 0:       # checks that the given moving average step is greater than 0
             print('\n' + 'Moving average step must be greater than 0.' + '\n')
             sys.exit() 
-        if round(self.center - (self.range / 2), 3) < 0.01:       # checks that the sampling window avoids the very beginning of an interval
+        if np.size(self.center) == 0 or np.size(self.range) == 0 or (np.size(self.center) > 1 and np.size(self.range) > 1 and np.size(self.center) != np.size(self.range)):      # checks that the given lists of centers and ranges can be paired up
+            print('\n' + 'Lists of current sampling centers and ranges must not be empty, and must have the same length when both are given.' + '\n')
+            sys.exit()
+        self.centers, self.ranges = np.broadcast_arrays(np.ravel(self.center), np.ravel(self.range))      # pairs up the center and range of every sampling region
+        self.fractions = np.array([(round(ix - (iy / 2), 3), round(ix + (iy / 2), 3)) for ix, iy in zip(self.centers.tolist(), self.ranges.tolist())])     # fractions of the interval where every sampling region starts and finishes
+        if np.amin(self.fractions[:, 0]) < 0.01:       # checks that the sampling window avoids the very beginning of an interval
             print('\n' + 'Sampling cannot be done in the first 1 percent of an interval.' + '\n')
             sys.exit() 
-        if round(self.center + (self.range / 2), 3) > 0.99:       # checks that the sampling window avoids the very end of an interval
+        if np.amax(self.fractions[:, 1]) > 0.99:       # checks that the sampling window avoids the very end of an interval
             print('\n' + 'Sampling cannot be done in the last 1 percent of an interval.' + '\n')
             sys.exit() 
+        if self.workers != None and self.workers <= 0:       # checks that the given number of workers is greater than 0
+            print('\n' + 'Number of workers must be a positive non-zero value or None' + '\n')
+            sys.exit()
+        if self.chunk <= 0:     # checks that the given chunk size is greater than 0
+            print('\n' + 'Chunk size must be a positive non-zero value.' + '\n')
+            sys.exit()
+        if self.vertex not in ('threshold', 'correlation'):     # checks that the given vertex method is one of the available methods
+            print('\n' + 'Vertex method must be either threshold or correlation.' + '\n')
+            sys.exit()
+        if self.filter not in ('iir', 'fft'):       # checks that the given low-pass filter is one of the available filters
+            print('\n' + 'Low-pass filter must be either iir or fft.' + '\n')
+            sys.exit()
+        if self.cutoff <= 0 or self.cutoff >= 1:        # checks that the given cutoff frequency lies between zero and the Nyquist frequency
+            print('\n' + 'Cutoff frequency must be greater than 0 and less than 1 (the Nyquist frequency).' + '\n')
+            sys.exit()
+        if self.order <= 0 or self.order > 10:      # checks that the given filter order is between 1 and 10
+            print('\n' + 'Filter order must be between 1 and 10.' + '\n')
+            sys.exit()
+        if self.decimate <= 0:      # checks that the given decimation is greater than 0
+            print('\n' + 'Decimation must be a positive non-zero value.' + '\n')
+            sys.exit()
+        if [self.MA, self.CS, self.LP].count(True) > 1:        # restricts more than one analysis method from being performed
+            print('\n' + 'More than one analysis method has been selected. Please choose either one or none in order to get the raw data' + '\n')
+            sys.exit()
 
         '''CONTROL STATEMENTS'''
-        if shape.type == 'linear' and data.label == 'simulated':        # imports the potential and avoids the need to find intervals and vertices
-            self.E = self.shape.E
-        else:       # all other cases need to at least find the intervals 
-            self.Peaks()      
-
-        if self.MA == False and self.CS == False:       # returns with unanalysed raw data
-            self.Raw()
-        if self.MA == True and self.CS == False:        # returns with moving average analysed data
-            self.MovingAverage()
-        if self.MA == False and self.CS == True:        # returns with current sampling analysed data
-            self.CurrentSampling()
-        if self.MA == True and self.CS == True:     # restricts both moving average and current sampling analysis from being performed
-            print('\n' + 'Both analysis methods have been selected. Please choose either one or neither in order to get the raw data' + '\n')
-            sys.exit()
+        self.pool = ThreadPoolExecutor(max_workers = self.workers) if self.workers != None else None      # pool of threads which analyse chunks of the data in parallel, created once every option has been checked
+        try:
+            if self.alignment is not None:      # reuses the peak positions and potential waveform which were found by an earlier analysis
+                self.Align()
+            elif shape.type == 'linear' and data.label == 'simulated':        # imports the potential and avoids the need to find intervals and vertices
+                self.E = self.shape.E
+            else:       # all other cases need to at least find the intervals 
+                self.Peaks()      
+            self.aligned = self.E       # keeps the aligned potential waveform, since the analysis methods cut it down
+
+            if self.MA == False and self.CS == False and self.LP == False:      # returns with unanalysed raw data
+                self.Raw()
+            if self.MA == True:     # returns with moving average analysed data
+                self.MovingAverage()
+            if self.CS == True:     # returns with current sampling analysed data
+                self.CurrentSampling()
+            if self.LP == True:     # returns with low-pass filter analysed data
+                self.LowPass()
+        finally:        # closes the pool of threads once the analysis is finished, even if the data could not be analysed
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+
+
+    def Align(self):
+        '''Takes the peak positions, peak values, vertex positions, and aligned potential waveform from an earlier analysis of the same data'''
+
+        for ix in ('peaks', 'values', 'changes', 'lv', 'uv', 'lag', 'confidence', 'shift'):       # loops through the results of peak finding, which are missing for simulated linear data
+            if hasattr(self.alignment, ix):
+                setattr(self, ix, getattr(self.alignment, ix))
+        self.E = self.alignment.aligned     # potential waveform as it was before the earlier analysis cut it down
+
+
+    def Pieces(self, array, size):
+        '''Splits an array into pieces of the given size to be analysed in parallel, or returns it whole if no threads are used'''
+
+        if self.pool is None or array.size <= size:     # activates in cases where the array is analysed in one piece
+            return [array]
+        return [array[ix : ix + size] for ix in range(0, array.size, size)]
+
+
+    def Map(self, function, pieces):
+        '''Applies a function to every piece, in the pool of threads if one is used, returning the results in the same order as the pieces'''
+
+        return list(self.pool.map(function, pieces)) if self.pool is not None else [function(ix) for ix in pieces]
 
 
     def Peaks(self):
@@ -128,50 +267,127 @@ class Operations:
         and recalculates the potential waveform used for plotting based on this data'''
         
         '''FINDING PEAK POSITIONS'''
-        ix = 0      # counter for the moving analysis window
-        self.peaks = np.array([])       # creates an emptry array to hold the positions of all peaks in the imported current array
-        while ix < (self.data.i.size - self.shape.interval + 1):        # closes the loop when moving analysis window reaches the end of the imported current array
-            self.position = np.argmax(np.abs(self.data.i[ix : ix + self.shape.interval])) + ix      # finds the position of the maximum point (i.e. the peak) in the current analysis window
-            if ix == 0:     # allows the first peak to be added without any issues
-                self.peaks = np.append(self.peaks, int(self.position))      # adds the found peak position to the peaks array
-            elif self.position - self.peaks[-1] > 1.5 * self.shape.interval:        # activates in cases where the analysis window skips a peak for whatever reason
-                self.lost = np.argmax(np.abs(self.data.i[int(self.peaks[-1] + 0.5 * self.shape.interval) : int(self.position - 0.5 * self.shape.interval)])) + int(0.5 * self.shape.interval + self.peaks[-1])      # moves the analysis window back by half an interval and looks for the lost peak 
-                self.peaks = np.append(self.peaks, int(self.lost))      # adds the lost peak position to the peaks array
-                self.peaks = np.append(self.peaks, int(self.position))      # adds the found peak position to the peaks array
-            elif self.position - self.peaks[-1] < 0.5 * self.shape.interval:        # activates in cases when the analysis window splits a peak, allowing the second peak to be ignored
-                pass
-            else:       # for all other cases where peakfinding works as expected
-                self.peaks = np.append(self.peaks, int(self.position))      # adds the found peak position to the peaks array
-            ix += self.shape.interval       # increases the analysis window by the interval size
+        count = self.data.i.size // self.shape.interval      # number of complete analysis windows which fit into the imported current array
+        pieces = self.Pieces(np.arange(count), max(1, self.chunk // self.shape.interval))     # analysis windows in each chunk
+        positions = np.concatenate([np.zeros(0, dtype = np.int64)] + self.Map(self.Positions, pieces))     # finds the position of the maximum point (i.e. the peak) in every analysis window
+
+        '''SPLIT PEAK SUPPRESSION'''
+        split = np.zeros(count, dtype = bool)       # creates an array which marks the analysis windows whose peak is ignored
+        split[1:] = np.diff(positions) < 0.5 * self.shape.interval       # a window splits a peak when its peak lies within half an interval of the previous one (two splits can never occur in a row, so the previous peak is always kept)
+        previous = np.zeros(count, dtype = np.int64)       # creates an array to hold the position of the last kept peak before each analysis window
+        previous[1:] = positions[:-1]       # which is the peak of the previous window in most cases
+        previous[2:][split[1:-1]] = positions[:-2][split[1:-1]]      # or the peak from two windows back when the previous window split a peak
+
+        '''LOST PEAK RECOVERY'''
+        lost = ~split & (positions - previous > 1.5 * self.shape.interval)      # marks the analysis windows which skip a peak for whatever reason
+        lost[:1] = False     # allows the first peak to be added without any issues
+        lstart = (previous[lost] + 0.5 * self.shape.interval).astype(np.int64)      # moves the analysis window back by half an interval to the start of the region containing each lost peak
+        lstop = (positions[lost] - 0.5 * self.shape.interval).astype(np.int64)     # and finds the end of the region containing each lost peak
+        span = np.arange(np.amax(lstop - lstart) if lstart.size > 0 else 0)     # offsets covering the widest region containing a lost peak
+        gather = np.minimum(lstart[:, None] + span, self.data.i.size - 1)      # positions of every point in each region containing a lost peak
+        regions = np.where(span < (lstop - lstart)[:, None], np.abs(self.data.i[gather]), -1)      # absolute current in each region, padded with a value that can never be the maximum
+        recovered = np.argmax(regions, axis = 1) + lstart if lstart.size > 0 else lstart      # finds the position of each lost peak
+
+        '''COMBINING PEAK POSITIONS'''
+        self.peaks = np.empty(count - np.count_nonzero(split) + recovered.size)      # creates an array to hold the positions of all peaks in the imported current array
+        kept = np.flatnonzero(~split)       # analysis windows whose peak is kept
+        slots = np.arange(kept.size) + np.cumsum(lost[kept])       # position of each kept peak after making room for the lost peaks in front of it
+        self.peaks[slots] = positions[kept]        # adds the found peak positions to the peaks array
+        self.peaks[slots[lost[kept]] - 1] = recovered      # adds the lost peak positions to the peaks array just before the peaks which revealed them
 
         '''FINDING PEAK VALUES'''
-        self.values = np.array([])      # creates an empty array to hold the values of each of the peaks found in the previous section
-        for iy in self.peaks:       # loops through the peaks array
-            self.values = np.append(self.values, self.data.i[int(iy)])      # and adds the current value of the peak to the values array
+        self.values = self.data.i[self.peaks.astype(int)]      # takes the current value of every peak in the peaks array
 
         '''FINDING VERTEX POTENTIALS'''
-        if self.data.label == 'imported':       # all imported data also requires that you find a vertex potential in order to plot vs. the imported potential waveform
-            iz = 0      # counter for checking the change in current between two adjacent peaks
+        if self.data.label == 'imported' and self.vertex == 'correlation':      # imported data can be aligned with the potential waveform by comparing the direction of every step
+            self.Correlate()
+        elif self.data.label == 'imported':       # all imported data also requires that you find a vertex potential in order to plot vs. the imported potential waveform
             self.changes = np.diff(self.values)     # finds the change in current between two adjacent peaks
-            for iz in self.changes:     # loops through the changes
-                if iz >= np.abs(self.values[1]):        # checks if the change between two adjacent peaks is more positive than the height of a single peak
-                    self.lv = int(self.peaks[np.where(self.changes == iz)[0][0]])       # assigns the position of this change to the lower vertex potential
-                    if self.shape.dE > 0:       # activates when step size is positive
-                            self.E = np.concatenate((self.shape.E[self.shape.udp + self.shape.dp - self.lv: ], self.shape.E[:self.shape.udp + self.shape.dp -self.lv]))     # and reorganises the imported potential waveform to fit the data 
-                    elif self.shape.dE <0:      # activates when step size is negative
-                            self.E = np.concatenate((self.shape.E[self.shape.ldp - self.lv: ], self.shape.E[:self.shape.ldp - self.lv]))        # and reorganises the imported potential waveform to fit the data 
-                    break       # breaks the loop,because the other vertex potential is not needed
-                if iz <= -np.abs(self.values[1]):         # checks if the change between two adjacent peaks is more negative than the negative height of a single peak
-                    self.uv = int(self.peaks[np.where(self.changes == iz)[0][0]])       # assigns the position of this change to the upper vertex potential
-                    if self.shape.dE > 0:       # activates when step size is positive
-                            self.E = np.concatenate((self.shape.E[self.shape.udp - self.uv: ], self.shape.E[:self.shape.udp - self.uv]))        # and reorganises the imported potential waveform to fit the data 
-                    elif self.shape.dE <0:      # activates when step size is negative
-                            self.E = np.concatenate((self.shape.E[self.shape.dp + self.shape.ldp - self.uv: ], self.shape.E[:self.shape.dp + self.shape.ldp - self.uv]))        # and reorganises the imported potential waveform to fit the data 
-                    break       # breaks the loop,because the other vertex potential is not needed
+            height = np.abs(self.values[1]) if self.values.size > 1 else 0      # height of a single peak
+            hits = np.flatnonzero((self.changes >= height) | (self.changes <= -height))       # finds every change between two adjacent peaks which is larger than the height of a single peak, of which only the first is needed
+            if hits.size > 0 and self.changes[hits[0]] >= height:        # checks if the first large change between two adjacent peaks is more positive than the height of a single peak
+                self.lv = int(self.peaks[hits[0]])       # assigns the position of this change to the lower vertex potential
+                if self.shape.dE > 0:       # activates when step size is positive
+                        self.E = self.Rotate(self.shape.E, self.shape.udp + self.shape.dp - self.lv)     # and reorganises the imported potential waveform to fit the data 
+                elif self.shape.dE <0:      # activates when step size is negative
+                        self.E = self.Rotate(self.shape.E, self.shape.ldp - self.lv)        # and reorganises the imported potential waveform to fit the data 
+            elif hits.size > 0:         # otherwise the first large change between two adjacent peaks is more negative than the negative height of a single peak
+                self.uv = int(self.peaks[hits[0]])       # assigns the position of this change to the upper vertex potential
+                if self.shape.dE > 0:       # activates when step size is positive
+                        self.E = self.Rotate(self.shape.E, self.shape.udp - self.uv)        # and reorganises the imported potential waveform to fit the data 
+                elif self.shape.dE <0:      # activates when step size is negative
+                        self.E = self.Rotate(self.shape.E, self.shape.dp + self.shape.ldp - self.uv)        # and reorganises the imported potential waveform to fit the data 
         else:       # no need to find the vertex potentials for simulated data
             self.E = self.shape.E       # returns the imported potential waveform as it is
 
 
+    def Correlate(self):
+        '''Aligns the potential waveform with the data by finding the offset which best matches the direction of every step expected from \n
+        the potential waveform with the direction of the current of every step in the data (a positive step giving a positive current). \n
+        The steps in the data are laid on a grid of one interval, placed using the typical position of the peaks, so that a peak which is \n
+        misplaced at a vertex does not move the steps after it, and the direction of each step is taken from the sum of its current. The \n
+        matches for every offset are found at once by an FFT cross-correlation, and the fraction of steps which match at the best offset \n
+        is kept as a confidence score (1 when every step matches, falling towards 0 or below as more steps disagree). The steps of the \n
+        waveform start after its initial point, and every scan has the same steps, so the best offset only places the waveform to within \n
+        a scan. Where the end of a capture joins its start, the steps on either side of the join lie a point apart within an interval, \n
+        which picks out the scan and the exact point'''
+
+        E = self.shape.E        # potential waveform which is aligned
+        count = max(1, E.size // self.shape.interval)      # number of steps in the potential waveform
+        expected = np.sign(np.diff(E[np.minimum(np.arange(count + 1) * self.shape.interval, E.size - 1)]))     # direction of every step of the potential waveform, which repeats once the waveform is rotated past its end
+        
+        phase = int(np.argmax(np.bincount(self.peaks.astype(np.int64) % self.shape.interval, minlength = self.shape.interval)))      # position of the first step in the data, taken from the most common position of the peaks within an interval (which an extra or lost peak cannot move)
+        starts = np.arange(phase, self.data.i.size, self.shape.interval)        # start position of every step in the data
+        if hasattr(self.data.i, 'codes'):     # activates in cases where the current is held as integer ADC codes (see Scaled in fileopener.py)
+            sums = np.add.reduceat(self.data.i.codes, starts, dtype = np.int64) * self.data.i.gain + np.diff(starts, append = self.data.i.size) * self.data.i.shift if starts.size > 0 else np.zeros(0)       # sums the current over every step
+        else:       # all other cases sum the current itself
+            sums = np.add.reduceat(self.data.i, starts) if starts.size > 0 else np.zeros(0)       # sums the current over every step
+        measured = np.bincount(np.arange(sums.size) % count, weights = np.sign(sums), minlength = count)      # direction of the current of every step in the data, folded onto the steps of the potential waveform
+        
+        matches = np.fft.irfft(np.conj(np.fft.rfft(measured)) * np.fft.rfft(expected), n = count)      # number of matching steps less the number of steps which disagree, for every offset between the data and the waveform
+        self.lag = int(np.argmax(np.round(matches, 6)))     # number of steps by which the waveform is ahead of the data (rounded so that ties are settled by the earliest offset)
+        self.confidence = float(matches[self.lag] / max(np.count_nonzero(sums), 1))       # fraction of the steps which match at this offset
+
+        steps = max(1, count // self.shape.ns)      # number of steps in a single scan, since every scan has the same directions and the lag is only known to within a scan
+        rotation = (phase - 1 + (-self.lag % steps) * self.shape.interval) % (steps * self.shape.interval)      # number of points by which the data is ahead of the waveform (to within a scan), whose steps start after its initial point
+        joins = rotation + np.arange(self.shape.ns) * steps * self.shape.interval       # possible positions where the end of the waveform joins its start in the data, one for each scan
+        typical = self.peaks[self.peaks.astype(np.int64) % self.shape.interval == phase]       # peaks which lie at the position of the first step, where the steps on the other side of the join start a point earlier or later
+        others = self.peaks[self.peaks.astype(np.int64) % self.shape.interval != phase]        # all other peaks
+        tb, ob = np.searchsorted(typical, joins), np.searchsorted(others, joins)        # number of peaks of each kind before every possible join
+        before = tb + (others.size - ob)        # number of peaks on the expected side of the join in cases where the typical peaks lie before it
+        after = (typical.size - tb) + ob        # and in cases where they lie after it
+        join = int(np.argmax(np.maximum(before, after)))        # takes the join which best separates the typical peaks from the others (or the first join, where nothing separates them)
+        rotation = joins[join] + (1 if before[join] > after[join] else 0)       # the steps before the join start a point earlier, so the data is a point further ahead in cases where the typical peaks lie before it
+        self.E = self.Rotate(E, int(-rotation % E.size))        # reorganises the imported potential waveform to fit the data
+
+
+    def Positions(self, windows):
+        '''Finds the position of the maximum point (i.e. the peak) in each of a run of consecutive analysis windows at once'''
+
+        if windows.size == 0:       # activates in cases where there are no complete analysis windows
+            return np.zeros(0, dtype = np.int64)
+        first, last = windows[0] * self.shape.interval, (windows[-1] + 1) * self.shape.interval       # start and end position of the run of analysis windows
+        if hasattr(self.data.i, 'codes') and self.data.i.gain != 0:        # activates in cases where the current is held as integer ADC codes (see Scaled in fileopener.py)
+            blocks = np.reshape(self.data.i.codes[first : last], (windows.size, self.shape.interval))      # views the ADC codes as one analysis window per row without converting them
+            high = np.argmax(blocks, axis = 1)      # finds the position of the highest code in every analysis window
+            low = np.argmin(blocks, axis = 1)       # and the position of the lowest code
+            level = -self.data.i.shift / self.data.i.gain       # code at which the current is zero, since the size of the current only depends on the distance of a code from this level
+            above = blocks[np.arange(windows.size), high] - level      # distance of the highest code above zero current
+            below = level - blocks[np.arange(windows.size), low]       # distance of the lowest code below zero current
+            return np.where((above > below) | ((above == below) & (high < low)), high, low) + windows * self.shape.interval        # takes the first point in the case of a tie
+        blocks = np.reshape(self.data.i[first : last], (windows.size, self.shape.interval))      # views the current array as one analysis window per row without copying it
+        return np.argmax(np.abs(blocks), axis = 1) + windows * self.shape.interval
+
+
+    def Rotate(self, E, shift):
+        '''Moves the start of the potential waveform to the given position, wrapping the points before it around to the end'''
+
+        self.shift = shift      # keeps the position of the start of the potential waveform, which marks where each scan starts
+        if hasattr(E, 'rotate'):        # lazy potential waveforms from waveforms.py can be rotated without being calculated
+            return E.rotate(shift)
+        return np.concatenate((E[shift:], E[:shift]))       # otherwise the potential waveform is rotated as an array
+
+
     def Raw(self):
         '''Simply returns the oscilloscope data in its raw form'''
         
@@ -188,44 +404,885 @@ class Operations:
         
         self.method = f'moving average analysis using a window of {self.window} and steps of {self.step} '      # label for file naming
         
-        ix = 0      # moving window counter
-        self.i = np.array([])       # empty array to contain the current
-        while ix < self.data.i.size - self.window + 1:      # closes the loop when the window reaches the end of the curent array
-            self.i = np.append(self.i, np.average(self.data.i[ix : ix + self.window]))      # appends the average current to the current arraay
-            ix += self.step     # increases the moving window counter by a step
+        starts = np.arange(0, self.data.i.size - self.window + 1, self.step)      # start position of every window, stopping when the window reaches the end of the current array
+        pieces = self.Pieces(starts, max(1, self.chunk // self.step))       # windows in each chunk, where each chunk also holds the points of its last window
+        self.i = np.concatenate([np.zeros(0)] + self.Map(self.Averages, pieces))      # finds the average current in every window
 
         self.index = self.shape.index       # indexing array borrowed from waveforms.py (zipping with E and i cuts this automatically)
         self.E = self.E[::self.step][:self.i.size]      # potential waveform sampling at each step and cut to the length of the current array if necessary
         self.i = self.i[:self.E.size]       # current array cut to the length of the potential waveform if necessary
+
+
+    def Averages(self, starts):
+        '''Finds the average current in the moving average windows with the given start positions, using running totals which begin \n
+           at the first of these windows'''
+
+        if starts.size == 0:        # activates in cases where there are no windows
+            return np.zeros(0)
+        i = self.data.i[starts[0] : starts[-1] + self.window]       # points covered by the windows
+        starts = starts - starts[0]     # start position of every window within these points
+        
+        if hasattr(i, 'codes'):     # activates in cases where the current is held as integer ADC codes (see Scaled in fileopener.py)
+            csum = np.zeros(i.size + 1, dtype = np.int64)     # creates an array to hold the running total of the codes, starting from 0
+            np.cumsum(i.codes, dtype = np.int64, out = csum[1:])      # finds the running total of the codes at every point, which is exact so that no compensation is needed
+            return (csum[starts + self.window] - csum[starts]) * (i.gain / self.window) + i.shift     # converts the average code in every window into current
+
+        if self.kahan == False:     # uses a plain cumulative sum, which is accurate enough for most captures
+            csum = np.zeros(i.size + 1)       # creates an array to hold the running total of the current, starting from 0
+            np.cumsum(i, out = csum[1:])      # finds the running total of the current at every point
+            return (csum[starts + self.window] - csum[starts]) / self.window     # finds the average current in every window from the difference between two running totals
+        
+        size = 4096     # uses running totals within short blocks of this many points, joined together with Kahan compensation so that rounding errors do not build up over long captures
+        blocks = -(-i.size // size)       # number of blocks needed to cover the points
+        csum = np.zeros(blocks * size)      # creates an array to hold the running total within each block
+        csum[:i.size] = i       # fills the blocks with the current, padding the last block with zeros
+        np.cumsum(np.reshape(csum, (blocks, size)), axis = 1, out = np.reshape(csum, (blocks, size)))     # finds the running total within each block
+        hi = np.zeros(blocks)       # creates an array to hold the compensated total of all blocks before each block
+        lo = np.zeros(blocks)       # creates an array to hold the rounding error on each compensated total
+        total = 0.0     # compensated total of all blocks so far
+        error = 0.0     # rounding error carried between blocks
+        for ix in range(1, blocks):     # loops through the blocks
+            added = csum[ix * size - 1] - error     # corrects the total of the previous block using the rounding error so far
+            summed = total + added      # adds the previous block to the compensated total
+            error = (summed - total) - added        # and finds the rounding error of the addition
+            total = summed
+            hi[ix] = total      # stores the compensated total of all blocks before this one
+            lo[ix] = -error     # and the rounding error on it
+        ends = starts + self.window - 1     # position of the last point in every window
+        befores = np.maximum(starts - 1, 0)     # position of the last point before every window
+        first = starts == 0     # marks the window which has no points before it
+        blocked = (hi[ends // size] - np.where(first, 0, hi[befores // size])) + (lo[ends // size] - np.where(first, 0, lo[befores // size]))      # difference between the compensated totals of the blocks holding the end of the window and the point before it
+        return (blocked + (csum[ends] - np.where(first, 0, csum[befores]))) / self.window     # finds the average current in every window from the difference between two running totals
+        
+
+    def LowPass(self):
+        '''Smooths the current with a low-pass filter and keeps every decimate-th point, reading the current in chunks of roughly chunk \n
+        points so that only a single chunk is ever held. The cost of either filter grows with the number of points but not with the \n
+        cutoff, unlike a moving average whose cost grows with its window'''
+
+        self.method = f'{self.filter} low-pass analysis using a cutoff of {self.cutoff} of the Nyquist frequency and a decimation of {self.decimate}'       # label for file naming
+
+        if self.filter == 'fft':        # linear phase filter applied by FFT convolution
+            self.i = self.Convolve()
+        else:       # Butterworth filter applied as a recursion
+            self.i = self.Recurse()
+        
+        self.index = self.shape.index       # indexing array borrowed from waveforms.py (zipping with E and i cuts this automatically)
+        self.E = self.E[::self.decimate][:self.i.size]      # potential waveform at every kept point and cut to the length of the current array if necessary
+        self.i = self.i[:self.E.size]       # current array cut to the length of the potential waveform if necessary
+
+
+    def Segment(self, start, stop):
+        '''Returns the current from the given start to stop position as a float array, repeating the first and last points of the current \n
+        for positions before the start or beyond the end of the current array'''
+
+        size = self.data.i.size     # number of points in the current array
+        core = np.asarray(self.data.i[min(max(start, 0), size) : min(max(stop, 0), size)], dtype = np.float64)     # points which lie inside the current array (converting ADC codes only for this segment)
+        before = np.full(min(max(-start, 0), stop - start), self.data.i[0], dtype = np.float64)        # first point repeated before the start of the current array
+        after = np.full(stop - start - before.size - core.size, self.data.i[size - 1], dtype = np.float64)      # last point repeated beyond the end of the current array
+        return np.concatenate((before, core, after))
+
+
+    def Convolve(self):
+        '''Filters the current with a windowed-sinc FIR filter (Blackman window) by overlap-save FFT convolution, correcting for the delay \n
+        of the filter so that the filtered current stays aligned with the potential waveform'''
+
+        self.taps = 2 * int(np.ceil(5.5 / self.cutoff)) + 1     # number of points in the filter, which gives a transition band about as wide as the cutoff
+        kernel = self.cutoff * np.sinc(self.cutoff * (np.arange(self.taps) - self.taps // 2)) * np.blackman(self.taps)      # windowed-sinc filter
+        kernel /= np.sum(kernel)        # normalises the filter so that a constant current is unchanged
+        self.size = 1 << int(np.ceil(np.log2(4 * self.taps)))       # number of points in each FFT
+        self.response = np.fft.rfft(kernel, self.size)      # frequency response of the filter
+
+        step = self.size - self.taps + 1        # number of filtered points given by each FFT
+        length = max(1, self.chunk // self.size) * step     # number of points in each chunk, which holds a whole number of FFTs
+        bounds = [(ix, min(ix + length, self.data.i.size)) for ix in range(0, self.data.i.size, length)]        # start and stop position of every chunk
+        return np.concatenate([np.zeros(0)] + self.Map(self.Frames, bounds))      # filters the chunks (in parallel if threads are used)
+
+
+    def Frames(self, bounds):
+        '''Filters the current from the given start to stop position with overlapping FFTs, returning every decimate-th point'''
+
+        start, stop = bounds
+        step = self.size - self.taps + 1        # number of filtered points given by each FFT
+        frames = -(-(stop - start) // step)     # number of FFTs needed for this chunk
+        segment = self.Segment(start - self.taps // 2, start - self.taps // 2 + frames * step + self.taps - 1)       # current needed by this chunk, including the points either side which the filter reaches
+        blocks = np.lib.stride_tricks.sliding_window_view(segment, self.size)[::step]      # overlapping runs of size points, one per FFT, without copying the segment
+        filtered = np.fft.irfft(np.fft.rfft(blocks, axis = 1) * self.response, self.size, axis = 1)[:, self.taps - 1:]     # filters every run at once, keeping only the points which are not wrapped around by the FFT
+        filtered = np.reshape(filtered, -1)[:stop - start]      # filtered current at every point of this chunk
+        return filtered[(-start) % self.decimate :: self.decimate]       # keeps every decimate-th point of the whole current array
+
+
+    def Recurse(self):
+        '''Filters the current with a Butterworth filter of the given order, designed by the bilinear transform and split into a sum \n
+        of first order sections (one for each pole) so that every section is a simple recursion. Each recursion is solved for blocks \n
+        of points at once with a small matrix product, and the state of every section is carried from one chunk to the next. The \n
+        filter starts in the steady state of the first point, so that it does not have to settle from zero'''
+
+        analog = np.exp(1j * np.pi * (2 * np.arange(1, self.order + 1) + self.order - 1) / (2 * self.order))     # poles of an analog Butterworth filter with a cutoff of 1
+        warped = 2 * np.tan(np.pi * self.cutoff / 2)        # analog cutoff which gives the requested digital cutoff after the bilinear transform
+        poles = (2 + warped * analog) / (2 - warped * analog)       # poles of the digital filter (its zeros all lie at -1)
+        gain = np.prod(1 - poles) / 2 ** self.order     # gain which leaves a constant current unchanged
+        residues = np.array([gain * (1 + 1 / ix) ** self.order / np.prod(1 - np.delete(poles, k) / ix) for k, ix in enumerate(poles)])     # weight of every first order section
+        direct = np.real(gain - np.sum(residues))       # part of the current which passes straight through the filter
+        kept = np.imag(poles) >= -1e-12     # keeps one pole of each conjugate pair, since the other pair gives the complex conjugate
+        poles, residues = poles[kept], residues[kept]
+        weights = np.where(np.abs(np.imag(poles)) > 1e-12, 2.0, 1.0)        # counts each kept complex pole twice
+
+        first = float(self.data.i[0]) if self.data.i.size > 0 else 0.0       # first point of the current
+        states = residues * first / (1 - poles)       # steady state of every section for a constant current equal to the first point
+        outputs = []        # filtered current at every kept point, one chunk at a time
+        for ix in range(0, self.data.i.size, self.chunk):       # loops through the chunks of the current array
+            x = self.Segment(ix, min(ix + self.chunk, self.data.i.size))        # current of this chunk
+            y = direct * x      # starts with the part of the current which passes straight through
+            for k in range(poles.size):     # adds the output of every section
+                section = self.Recursion(residues[k] * x, poles[k], states[k])
+                states[k] = section[-1]     # carries the state of the section to the next chunk
+                y += weights[k] * np.real(section)
+            outputs.append(y[(-ix) % self.decimate :: self.decimate])       # keeps every decimate-th point of the whole current array
+        return np.concatenate([np.zeros(0)] + outputs)
+
+
+    def Recursion(self, u, pole, state, block = 32):
+        '''Solves y[n] = pole * y[n-1] + u[n] for every point, starting from y[-1] = state. The points are split into blocks and the \n
+        response of every block from rest is found at once with a matrix of powers of the pole, then the state at the start of every \n
+        block is found by solving the same recursion over the blocks (with the pole raised to the block size)'''
+
+        if u.size <= block:     # short recursions are solved point by point
+            y = np.empty(u.size, dtype = np.complex128)
+            for ix in range(u.size):
+                state = pole * state + u[ix]
+                y[ix] = state
+            return y
         
+        rows = -(-u.size // block)      # number of blocks
+        blocks = np.zeros((rows, block), dtype = np.complex128)     # creates an array to hold the points in blocks, padding the last block with zeros
+        np.reshape(blocks, -1)[:u.size] = u
+        lags = np.arange(block)[:, None] - np.arange(block)[None, :]        # distance between every pair of points within a block
+        powers = np.where(lags >= 0, pole ** np.maximum(lags, 0), 0)       # response of a block from rest to each of its points
+        rest = blocks @ powers.T        # response of every block from rest
+        starts = np.empty(rows, dtype = np.complex128)      # creates an array to hold the state at the start of every block
+        starts[0] = state
+        starts[1:] = self.Recursion(rest[:-1, -1], pole ** block, state)        # the state carried into each block follows the same recursion over the blocks
+        y = rest + starts[:, None] * pole ** np.arange(1, block + 1)        # adds the decay of the state carried into every block
+        return np.reshape(y, -1)[:u.size]
+
 
     def CurrentSampling(self):
         '''Isolates each interval and performs an averaging operation in a range around a certain \n
            fraction of the interval'''
         
+        if np.ndim(self.center) > 0 or np.ndim(self.range) > 0:     # activates in cases where several sampling regions are given
+            self.Sampling()
+            return
+
         self.method = f'current sampling analysis using a sampling window of {round(self.range * 100)}% centered at {round(self.center * 100)}%'       #label for file naming
 
-        self.i = np.array([])       # empty array to contain the current
-        for ix in range(0, self.peaks.size):        # loops through the size of the peaks array
-            try:        # for all but the last step
-                self.interval = self.data.i[int(self.peaks[ix]): int(self.peaks[ix + 1])]       # isolates the interval using the peak positions found earlier
-            except:     #for the last step
-                self.interval = self.data.i[int(self.peaks[ix]):int(self.peaks[ix] + self.shape.interval)]      # isolates the interval using the peak positions found earlier and estimates the end position of the last interval
-            self.urange = round((self.center + (self.range / 2)), 3) * self.interval.size     # finds the index for the upper limit of the sampling region
-            self.lrange = round((self.center - (self.range / 2)), 3) * self.interval.size     # finds the index for the lower limit of the sampling region
-            self.averaged = np.average(self.interval[int(self.lrange) : int(self.urange)])      # averages the current within the sampling region
-            self.i = np.append(self.i, self.averaged)       # and appends the result to the current array
+        starts = self.peaks.astype(np.int64)       # start position of every interval, taken from the peak positions found earlier
+        ends = np.append(starts[1:], np.minimum(starts[-1:] + self.shape.interval, self.data.i.size))     # end position of every interval, estimating the end position of the last interval
+        lower = starts + (round((self.center - (self.range / 2)), 3) * (ends - starts)).astype(np.int64)      # finds the index for the lower limit of every sampling region
+        upper = starts + (round((self.center + (self.range / 2)), 3) * (ends - starts)).astype(np.int64)      # finds the index for the upper limit of every sampling region
+        self.bounds = np.ravel(np.column_stack((np.minimum(lower, self.data.i.size - 1), upper)))       # interleaves the limits of the sampling regions so that every other segment is a sampling region
+        self.counts = upper - lower      # number of points in every sampling region
+        pieces = self.Pieces(np.arange(starts.size), max(1, self.chunk // self.shape.interval))     # intervals in each chunk
+        sums = np.concatenate([np.zeros(0)] + self.Map(self.Sums, pieces))      # sums the current within every sampling region
+        self.i = np.divide(sums, self.counts, out = np.full(self.counts.size, np.nan), where = self.counts > 0)        # averages the current within every sampling region, leaving empty regions as nan
         
         self.index = self.shape.index       # indexing array borrowed from waveforms.py (zipping with E and i cuts this automatically)
-        for ix in range(0, self.peaks.size):
-            if self.peaks[ix] > self.E.size:
-                self.E = self.E[self.peaks.astype(int)[ : ix]]     # uses the index of the peaks to work out the potential corresponding to each step, other methods caused some distortion in the plotted data
-                break
+        self.E = self.E[starts[:np.searchsorted(starts, self.E.size)]]      # uses the index of the peaks which fall inside the potential waveform to work out the potential corresponding to each step, other methods caused some distortion in the plotted data
         self.i = self.i[:self.E.size]       # current array cut to the length of the potential waveform if necessary
+
+
+    def Sampling(self):
+        '''Averages the current in several sampling regions of every interval at once, using a single running total of the current \n
+           and the positions of the limits of every region, giving one row of sampled currents per sampling region'''
+
+        self.method = f'current sampling analysis using {self.fractions.shape[0]} sampling windows between {round(np.amin(self.fractions) * 100)}% and {round(np.amax(self.fractions) * 100)}%'        #label for file naming
+
+        starts = self.peaks.astype(np.int64)       # start position of every interval, taken from the peak positions found earlier
+        ends = np.append(starts[1:], np.minimum(starts[-1:] + self.shape.interval, self.data.i.size))     # end position of every interval, estimating the end position of the last interval
+        lower = np.minimum(starts + (self.fractions[:, :1] * (ends - starts)).astype(np.int64), self.data.i.size)      # finds the index for the lower limit of every sampling region in every interval
+        upper = starts + (self.fractions[:, 1:] * (ends - starts)).astype(np.int64)      # finds the index for the upper limit of every sampling region in every interval
+        counts = upper - lower      # number of points in every sampling region
+        
+        if hasattr(self.data.i, 'codes'):     # activates in cases where the current is held as integer ADC codes (see Scaled in fileopener.py)
+            csum = np.zeros(self.data.i.size + 1, dtype = np.int64)     # creates an array to hold the running total of the codes, starting from 0
+            np.cumsum(self.data.i.codes, dtype = np.int64, out = csum[1:])      # finds the running total of the codes at every point, which is exact
+            sums = (csum[upper] - csum[lower]) * self.data.i.gain + counts * self.data.i.shift      # sums the codes within every sampling region, then converts the sums into current
+        else:       # all other cases sum the current itself
+            csum = np.zeros(self.data.i.size + 1)       # creates an array to hold the running total of the current, starting from 0
+            np.cumsum(self.data.i, out = csum[1:])      # finds the running total of the current at every point
+            sums = csum[upper] - csum[lower]        # sums the current within every sampling region from the difference between two running totals
+        self.i = np.divide(sums, counts, out = np.full(counts.shape, np.nan), where = counts > 0)        # averages the current within every sampling region, leaving empty regions as nan
+        
+        self.index = self.shape.index       # indexing array borrowed from waveforms.py (zipping with E and i cuts this automatically)
+        self.E = self.E[starts[:np.searchsorted(starts, self.E.size)]]      # uses the index of the peaks which fall inside the potential waveform to work out the potential corresponding to each step
+        self.i = self.i[:, :self.E.size]       # current array cut to the length of the potential waveform if necessary
+
+
+    def Sums(self, intervals):
+        '''Sums the current within the sampling regions of a run of consecutive intervals in a single pass'''
+
+        if intervals.size == 0:     # activates in cases where there are no intervals
+            return np.zeros(0)
+        bounds = self.bounds[2 * intervals[0] : 2 * intervals[-1] + 2]      # limits of the sampling regions of these intervals
+        first = bounds[0]       # position of the first point which is summed
+        last = self.bounds[2 * intervals[-1] + 2] if 2 * intervals[-1] + 2 < self.bounds.size else self.data.i.size       # position after the last point which can be summed (i.e. the start of the next sampling region)
+        bounds = bounds - first     # limits of the sampling regions within the points which are summed
+        if bounds[-1] == last - first:      # the last sampling region can finish at the very end of the points which are summed
+            bounds = bounds[:-1]        # in which case the segment simply runs to the end of the points
+        i = self.data.i[first : last]       # points which are summed
+        if hasattr(i, 'codes'):     # activates in cases where the current is held as integer ADC codes (see Scaled in fileopener.py)
+            return np.add.reduceat(i.codes, bounds, dtype = np.int64)[::2] * i.gain + self.counts[intervals] * i.shift       # sums the codes within every sampling region, then converts the sums into current
+        return np.add.reduceat(i, bounds)[::2]       # sums the current within every sampling region
         
     
+    def Transients(self, length = None):
+        '''Returns the transient of every step as one row of a two-dimensional array, so that every step can be analysed at once along \n
+        the second axis, along with a mask which marks the points in each row that do not belong to its step and the column where each \n
+        step starts. Steps sit on a grid of one interval, and steps which start a point or two either side of the grid are padded \n
+        on the left or right, which lets the rows be a strided view of the current array that copies nothing. Rows are only gathered \n
+        (copying the points) when the steps drift by more than a tenth of an interval. Current held as ADC codes is returned as a Scaled \n
+        array over a view of the codes \n
+
+        Requires: \n
+        length - the number of points of each step which are kept (None uses the length of the longest step), where steps which would \n
+        run past the end of the current array are left out'''
+
+        if hasattr(self, 'peaks') is False:       # activates in cases where the steps were never found (i.e. simulated linear data)
+            print('\n' + 'The transients of each step can only be found for staircase data.' + '\n')
+            sys.exit()
+
+        starts = self.peaks.astype(np.int64)       # start position of every step, taken from the peak positions found earlier
+        ends = np.append(starts[1:], np.minimum(starts[-1:] + self.shape.interval, self.data.i.size))     # end position of every step, estimating the end position of the last step
+        lengths = ends - starts if length is None else np.minimum(ends - starts, length)       # number of points kept from every step
+        length = int(np.amax(lengths, initial = 1)) if length is None else length     # number of points kept from the longest step
+        i = self.data.i.codes if hasattr(self.data.i, 'codes') else self.data.i       # points which are viewed, keeping ADC codes unconverted
+        offsets = starts - starts[:1] - np.arange(starts.size) * self.shape.interval       # distance of every step from the grid
+        low, high = int(np.amin(offsets, initial = 0)), int(np.amax(offsets, initial = 0))     # furthest distances before and after the grid
+        if high - low <= self.shape.interval // 10 and starts.size > 0 and starts[0] + low >= 0:      # activates in cases where the steps stay close to the grid
+            width = length + high - low     # number of points in every row, including the padding
+            count = int(np.searchsorted(starts - offsets + low, i.size - width, side = 'right'))        # number of rows which fit inside the current array
+            windows = np.lib.stride_tricks.sliding_window_view(i, width) if i.size >= width else np.zeros((0, width), dtype = i.dtype)       # view of every run of width points, which copies nothing
+            transients = windows[starts[0] + low :: self.shape.interval][:count]        # takes every row which starts on the grid, which is still a view
+            first = offsets[:count] - low       # column where each step starts
+        else:       # steps which drift away from the grid are gathered instead
+            count = int(np.searchsorted(starts, i.size - length, side = 'right'))        # number of steps which fit inside the current array
+            windows = np.lib.stride_tricks.sliding_window_view(i, length) if i.size >= length else np.zeros((0, length), dtype = i.dtype)       # view of every run of length points
+            transients = windows[starts[:count]]        # gathers the rows which start at every step
+            first = np.zeros(count, dtype = np.int64)       # column where each step starts
+        columns = np.arange(transients.shape[1])        # position of every point within a row
+        mask = (columns < first[:, None]) | (columns >= (first + lengths[:count])[:, None])       # marks the points in each row which lie before or beyond its step
+        if hasattr(self.data.i, 'codes'):     # activates in cases where the current is held as integer ADC codes (see Scaled in fileopener.py)
+            transients = type(self.data.i)(transients, self.data.i.gain, self.data.i.shift, self.data.i.dtype)
+        return transients, mask, first
+
+
+    def Fit(self, floor = 0.05):
+        '''Fits the transient of every step at once with the model used by the staircase simulation in simulations.py, where each step \n
+        adds a transient of i = (dE/Ru)*np.exp(-t/(Ru*Cd)) to the decaying transients carried over from the earlier steps in the same \n
+        direction. The sum of these transients decays with the same time constant, so every step is fitted with a straight line through \n
+        the logarithm of its current (weighted by the square of the current, which evens out the noise after taking the logarithm). \n
+        The time constant gives Ru*Cd, and the new current at the start of the step (once the carried current is taken away) gives Ru. \n
+        Steps which cannot be fitted are given nan, as are steps which are not a whole interval long (give or take a point), the steps \n
+        where the rotated potential waveform wraps around (where the end of the data can join its start), the first step of imported \n
+        data or of data where part of an earlier step comes before it, and the steps which follow any of these, since the current \n
+        carried over to them is not known \n
+
+        Requires: \n
+        floor - the fraction of the largest current of a step below which points are left out of the fit, where noise dominates'''
+
+        transients, mask, first = self.Transients()     # transient of every step as one row, without copying the current array
+        rows, width = transients.shape      # number of steps and number of points in every row
+        columns = np.arange(width)      # position of every point within a row
+        slope = np.full(rows, np.nan)       # creates an array to hold the slope of the fitted line of every step
+        intercept = np.full(rows, np.nan)       # creates an array to hold the intercept of the fitted line of every step
+        signs = np.zeros(rows)      # creates an array to hold the direction of the current of every step
+        
+        size = max(1, self.chunk // max(width, 1))      # number of steps fitted together, which keeps the temporary arrays to roughly chunk points
+        for ix in range(0, rows, size):     # loops through the blocks of steps
+            block = np.asarray(transients[ix : ix + size])      # current of every step in the block (converting ADC codes only for this block)
+            signs[ix : ix + size] = np.sign(np.sum(np.where(mask[ix : ix + size], 0, block), axis = 1))       # direction of the current of every step (taken from the whole step, since the peak at a vertex can fall on the last point of the previous step)
+            signed = block * signs[ix : ix + size, None]        # current of every step, made positive in its direction
+            largest = np.amax(np.where(mask[ix : ix + size], 0, signed), axis = 1, initial = 0)       # largest current of every step
+            t = (columns - first[ix : ix + size, None]) * self.shape.dt     # time since the start of the step at every point (in s)
+            valid = ~mask[ix : ix + size] & (signed >= floor * largest[:, None]) & (signed > 0)     # marks the points which are fitted
+            w = np.where(valid, signed ** 2, 0)     # weight of every point
+            y = np.log(np.where(valid, signed, 1))      # logarithm of the current at every point
+            sw, swt, swy, swtt, swty = (np.sum(ix, axis = 1) for ix in (w, w * t, w * y, w * t * t, w * t * y))     # weighted sums for the least squares fit of every step
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):        # steps with fewer than two points give nan
+                det = sw * swtt - swt ** 2
+                slope[ix : ix + size] = (sw * swty - swt * swy) / det
+                intercept[ix : ix + size] = (swtt * swy - swt * swty) / det
+
+        starts = self.peaks[:rows].astype(np.int64)     # start position of every fitted step
+        lengths = np.count_nonzero(~mask, axis = 1)     # number of points in every fitted step
+        whole = np.abs(lengths - self.shape.interval) <= 1      # marks the steps which are a whole interval long, where cut or misplaced steps are not
+        if self.data.label == 'imported' and hasattr(self, 'shift'):      # activates in cases where the potential waveform was rotated to fit the data
+            wraps = (-self.shift + np.arange(self.shape.ns) * 2 * self.shape.dp) % np.asarray(self.shape.E).size       # positions where the rotated potential waveform wraps around to its start, which mark where the end of the data may join its start (at any scan, since every scan looks the same)
+            span = 0 if hasattr(self, 'lag') else self.shape.interval      # the threshold vertex method (unlike Correlate) can place the waveform up to a step before the join
+            tolerance = self.shape.interval // 10       # steps can start a point or two either side of this position
+            for wrap in wraps:      # leaves out the steps which can hold the join
+                whole &= ~((starts - tolerance <= wrap + span) & (wrap < starts + lengths - tolerance))
+        if rows > 0 and (self.data.label == 'imported' or starts[0] >= self.shape.interval // 10):      # activates in cases where the first step follows current from before the data (or part of an earlier step), whose carried current is unknown
+            whole[0] = False
+        slope[~whole] = np.nan
+        intercept[~whole] = np.nan
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):        # steps which could not be fitted give nan
+            self.tau = -1 / slope       # time constant of every step (in s)
+            self.amplitude = signs * np.exp(intercept)     # fitted current at the start of every step (in A)
+            gaps = np.diff(starts) * self.shape.dt       # time between the starts of neighbouring steps (in s)
+            carried = self.amplitude[:-1] * np.exp(-gaps / self.tau[:-1])      # current carried over from each step to the start of the next
+            fresh = self.amplitude.copy()       # new current added at the start of every step
+            fresh[1:] -= np.where(signs[:-1] == signs[1:], carried, 0)       # takes away the current carried over from a step in the same direction
+            fresh[1:][~whole[:-1]] = np.nan     # the current carried over from a step which was left out is not known (even where the direction of a misplaced step looks different)
+            self.Ru = np.abs(self.shape.dE / fresh)     # uncompensated resistance of every step (in Ω)
+            self.Cd = self.tau / self.Ru        # double layer capacitance of every step (in F)
+        return self.Cd, self.Ru
+
+
+    def Realigned(self):
+        '''Returns an analysis whose potential waveform marks where each scan starts. The threshold vertex method can place the potential \n
+        waveform a step away from where it should be, so imported data aligned by this method is aligned again by Correlate on a copy of \n
+        this analysis (which is kept, so that this is only done once), whilst all other analyses are returned as they are'''
+
+        if self.data.label != 'imported' or getattr(self, 'peaks', np.zeros(0)).size == 0 or hasattr(self, 'lag'):      # activates in cases where the data was not aligned by the threshold vertex method
+            return self
+        if hasattr(self, 'realigned') is False:     # activates in cases where the data has not been aligned again yet
+            self.realigned = copy.copy(self)        # copy of this analysis which is aligned again without changing this analysis
+            self.realigned.Correlate()
+            self.realigned.aligned = self.realigned.E       # potential waveform used for every scan
+        return self.realigned
+
+
+    def Scans(self):
+        '''Splits the aligned data into one view for each complete scan (without copying it), analyses every scan in the same way as the \n
+        whole data in a pool of threads (one scan per thread, so that each thread only holds the working arrays of a single scan), and \n
+        returns the potential and current of every scan stacked as one row per scan (i.e. (ns, points)), cut to the shortest scan. Each scan \n
+        starts where the potential waveform of Realigned starts'''
+
+        source = self.Realigned()       # analysis whose potential waveform marks where each scan starts
+        length = 2 * self.shape.dp      # number of points in a single scan
+        first = -getattr(source, 'shift', 0) % length        # position of the start of the first complete scan in the data
+        if getattr(self, 'peaks', np.zeros(0)).size > 0:       # activates in cases where the steps have been found, so that each scan can start with a step
+            phase = int(np.round(np.median(self.peaks - np.arange(self.peaks.size) * self.shape.interval)))     # typical position of the steps in the data
+            first = (first + (phase - first + self.shape.interval // 2) % self.shape.interval - self.shape.interval // 2) % length       # moves the start of the first scan to the nearest step
+        count = min(self.shape.ns, max(0, (self.data.i.size - first) // length))      # number of complete scans in the data
+        if count < self.shape.ns:       # activates in cases where the data does not start at the start of a scan, or is too short to hold every scan
+            print('\n' + f'Only {count} of the {self.shape.ns} scans are complete in the data, so only these scans are returned.' + '\n')
+        scans = [slice(first + ix * length, first + (ix + 1) * length) for ix in range(count)]     # position of every complete scan
+
+        if self.workers != None:        # activates in cases where the scans are analysed in a pool of threads
+            with ThreadPoolExecutor(max_workers = self.workers) as pool:        # the pool of threads is closed once every scan is analysed, even if a scan cannot be analysed
+                results = list(pool.map(source.Scan, scans))
+        else:
+            results = [source.Scan(ix) for ix in scans]     # analyses every scan in turn
+        if count == 0:      # activates in cases where the data does not hold a complete scan
+            return np.zeros((0, 0)), np.zeros((0, 0))
+        
+        points = min(ix[1].shape[-1] for ix in results)     # number of points in the shortest scan, which the other scans are cut to
+        return np.stack([ix[0][:points] for ix in results]), np.stack([ix[1][..., :points] for ix in results])
+
+
+    def Scan(self, scan):
+        '''Analyses a single scan, given by a slice of the data, using a copy of this analysis which only sees the points of that scan'''
+
+        analysis = copy.copy(self)      # copy of this analysis which shares every array with it
+        analysis.data = copy.copy(self.data)        # copy of the data object which only sees the points of the scan
+        analysis.data.i = self.data.i[scan]     # view of the current of the scan
+        analysis.E = self.aligned[scan]     # potential of the scan, which is still aligned with the current
+        analysis.pool = None        # the scan is analysed in one piece, since the scans are already analysed in parallel
+        if hasattr(self, 'peaks'):      # activates in cases where the steps have been found
+            inside = (self.peaks >= scan.start - self.shape.interval // 2) & (self.peaks < scan.stop - self.shape.interval // 2)        # steps of the scan, including a first peak found just before the start of the scan
+            analysis.peaks = np.maximum(self.peaks[inside] - scan.start, 0)      # position of every step within the scan
+            if analysis.peaks.size == 0 or analysis.peaks[0] >= self.shape.interval // 2:       # activates in cases where the peak of the first step was misplaced (e.g. where the end of the capture joins its start)
+                analysis.peaks = np.concatenate(([0], analysis.peaks))      # the first step starts at the start of the scan
+        
+        if self.MA == True:     # analyses the scan in the same way as the whole data
+            analysis.MovingAverage()
+        elif self.CS == True:
+            analysis.CurrentSampling()
+        elif self.LP == True:
+            analysis.LowPass()
+        else:
+            analysis.Raw()
+        return np.asarray(analysis.E), np.asarray(analysis.i)
+
+
     def output(self):
         '''Returns the analysed oscilloscope data for checking or analysis purposes'''
 
+        if np.ndim(self.i) == 2:        # activates in cases where several sampling regions were analysed at once
+            return zip(self.index, self.E, *self.i)     # zipped array containing one column of current for every sampling region
         zipped = zip(self.index, self.E, self.i)        # zipped array containing analysed oscilloscope data
-        return zipped
\ No newline at end of file
+        return zipped
+
+
+    def header(self):
+        '''Returns a header line naming the columns of the output when several sampling regions were analysed at once (one current \n
+        column for each region), or None when the output has a single current column'''
+
+        if np.ndim(getattr(self, 'i', None)) != 2:        # activates in cases where the output has a single current column
+            return None
+        regions = [f'i (center {ix}, range {iy})' for ix, iy in zip(self.centers.tolist(), self.ranges.tolist())]      # name of the current column of every sampling region
+        return ','.join(['index', 'E'] + regions) + '\n'
+
+
+class Session:
+
+    '''Finds the peak positions and aligns the potential waveform once, then runs any number of analyses of the same data against this \n
+    alignment, keeping the most recent results so that repeated analyses are returned without being run again \n
+
+    Requires: \n
+    shape - an instance of one of the potential waveform classes from the waveforms.py file \n
+    data - an instance of either the Capacitance class from the simulations.py file or the Oscilloscope or Binary classes from the fileopener.py file \n
+    size - the number of analyses which are kept, beyond which the least recently used analyses are forgotten \n
+    kahan - a True or False option for whether moving average analysis uses a Kahan compensated sum (slower, but more accurate for long captures) \n
+    workers - the number of threads used to analyse chunks of the data in parallel (or None to analyse the data in one piece) \n
+    chunk - the approximate number of points in each chunk analysed in parallel \n
+    vertex - the method used to align imported data with the potential waveform ('threshold' or 'correlation')'''
+
+    def __init__(self, shape, data, size = 16, kahan = False, workers = None, chunk = 4194304, vertex = 'threshold'):
+
+        '''PARAMETER INITIALISATION'''
+        self.shape = shape      # potential waveform object generated by waveforms.py
+        self.data = data        # simulated or imported oscilloscope data object generated using simulations.py or fileopener.py
+        self.size = size        # number of analyses which are kept
+        self.kahan = kahan      # boolean value which decides if moving average analysis uses a Kahan compensated sum or not
+        self.workers = workers      # number of threads used to analyse chunks of the data in parallel
+        self.chunk = chunk      # approximate number of points in each chunk analysed in parallel
+        self.vertex = vertex        # method used to align imported data with the potential waveform
+
+        '''DATA TYPE ERRORS'''
+        if isinstance(self.size, (int)) is False:       # checks that the given number of kept analyses is an integer value
+            print('\n' + 'An invalid datatype was used for the number of kept analyses. Enter an integer value.' + '\n')
+            sys.exit()
+
+        '''DATA VALUE ERRORS'''
+        if self.size <= 0:      # checks that the given number of kept analyses is greater than 0
+            print('\n' + 'Number of kept analyses must be a positive non-zero value.' + '\n')
+            sys.exit()
+
+        '''PARAMETER DEFINITIONS'''
+        self.alignment = Operations(self.shape, self.data, kahan = self.kahan, workers = self.workers, chunk = self.chunk, vertex = self.vertex)      # finds the peak positions and aligns the potential waveform, returning the raw data
+        self.results = OrderedDict()        # kept analyses, ordered from the least to the most recently used
+        self.hits = 0       # number of analyses which were returned without being run again
+        self.misses = 0     # number of analyses which had to be run
+
+
+    def Raw(self):
+        '''Returns the raw data against the aligned potential waveform'''
+
+        return self.alignment
+
+
+    def MovingAverage(self, window = 1000, step = 100):
+        '''Returns the moving average analysis using the given window and steps'''
+
+        return self.Analyse(('MA', window, step), MA = True, window = window, step = step)
+
+
+    def CurrentSampling(self, center = 0.5, range = 0.95):
+        '''Returns the current sampling analysis using a sampling region of the given range around the given center'''
+
+        key = ('CS', center if np.ndim(center) == 0 else tuple(np.ravel(center)), range if np.ndim(range) == 0 else tuple(np.ravel(range)))      # lists of centers and ranges are kept as tuples so that they can be looked up
+        return self.Analyse(key, CS = True, center = center, range = range)
+
+
+    def LowPass(self, filter = 'iir', cutoff = 0.01, order = 4, decimate = 100):
+        '''Returns the low-pass filter analysis using the given filter, cutoff frequency, order, and decimation'''
+
+        return self.Analyse(('LP', filter, cutoff, order, decimate), LP = True, filter = filter, cutoff = cutoff, order = order, decimate = decimate)
+
+
+    def Analyse(self, key, **options):
+        '''Returns the kept analysis for the given key, or runs the analysis with the given options against the alignment and keeps it, \n
+        forgetting the least recently used analysis if too many are kept'''
+
+        if key in self.results:     # activates in cases where the same analysis has already been run
+            self.hits += 1
+            self.results.move_to_end(key)       # marks the analysis as the most recently used
+            return self.results[key]
+        self.misses += 1
+        analysis = Operations(self.shape, self.data, kahan = self.kahan, workers = self.workers, chunk = self.chunk, alignment = self.alignment, **options)     # runs the analysis without finding the peaks again
+        self.results[key] = analysis
+        while len(self.results) > self.size:        # forgets the least recently used analyses
+            self.results.popitem(last = False)
+        return analysis
+
+
+class Stream:
+
+    '''Analyses the given data one block at a time as it is read, giving the same results as the Operations class whilst only holding \n
+    the points which are still needed (i.e. the last two analysis windows, the current moving average window, or the current sampling \n
+    interval). Imported data is also held from the start until the vertex potential has been found, which happens during the first scan. \n
+    Only the options of the Operations class which can be carried from one block to the next are available, so the correlation vertex \n
+    method (which compares every step at once), low-pass filter analysis, and several sampling regions at once are refused. The analyses \n
+    which need every point at once (Transients, Fit, and Scans) are not part of this class, so an Operations instance is needed for them \n
+
+    Requires: \n
+    shape - an instance of one of the potential waveform classes from the waveforms.py file (created with lazy = True so that the potential waveform is not held in memory either)\n
+    data - an instance of the Oscilloscope class from the fileopener.py file created with stream = True, or any other object with a label and a Blocks method which yields the current one block at a time\n
+    MA - a True or False option for whether moving average analysis is performed \n
+    window - the window used for moving average anaysis \n
+    step - the steps taken in moving average analysis \n 
+    CS - a True or False option for whether current sampling analysis is performed \n
+    center - the fraction of the step interval where the center of the sampling region is located during current sampling analysis \n
+    range - the fraction of the step interval which is averaged during current sampling analysis \n
+    kahan - a True or False option for whether moving average analysis uses a Kahan compensated sum (slower, but more accurate for long captures) \n
+    vertex - the method used to align imported data with the potential waveform (only 'threshold' is available when streaming) \n
+    LP - a True or False option for whether low-pass filter analysis is performed (only False is available when streaming)'''
+
+    def __init__(self, shape, data, MA = False, window = 1000, step = 100, CS = False, center = 0.5, range = 0.95, kahan = False, vertex = 'threshold', LP = False):
+        
+        '''PARAMETER INITIALISATION'''
+        self.shape = shape      # potential waveform object generated by waveforms.py
+        self.data = data        # simulated or imported oscilloscope data object which yields the current one block at a time
+        self.MA = MA        # boolean value which decides if moving average analysis is performed or not
+        self.window = window        # window used to average the data in moving average analysis
+        self.step = step        # steps by which window is moved in moving average analysis
+        self.CS = CS        # boolean value which decides if current sampling analysis is performed or not
+        self.center = center      # fraction of interval where the centre of the sampling region is located in current sampling analysis
+        self.range = range      # fraction of interval which is averaged in current sampling analysis
+        self.kahan = kahan      # boolean value which decides if moving average analysis uses a Kahan compensated sum or not
+        self.vertex = vertex        # method used to align imported data with the potential waveform
+        self.LP = LP        # boolean value which decides if low-pass filter analysis is performed or not
+
+        '''DATA TYPE ERRORS'''
+        if isinstance(self.MA, (bool)) is False:        # checks that the given moving average option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the moving average option. Enter a Boolean value.' + '\n')
+            sys.exit()
+        if isinstance(self.window, (int)) is False:     # checks that the given moving average window is an integer value
+            print('\n' + 'An invalid datatype was used for the moving average window. Enter an integer value.' + '\n')
+            sys.exit()
+        if isinstance(self.step, (int)) is False:       # checks that the given moving average step is an integer value
+            print('\n' + 'An invalid datatype was used for the moving average step. Enter an integer value.' + '\n')
+            sys.exit()
+        if isinstance(self.CS, (bool)) is False:        # checks that the given current sampling option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the current sampling option. Enter a Boolean value.' + '\n')
+            sys.exit()
+        if isinstance(self.center, (list, tuple, np.ndarray)) or isinstance(self.range, (list, tuple, np.ndarray)):       # restricts several sampling regions from being analysed at once, since each block only carries a single open region
+            print('\n' + 'Several sampling regions cannot be analysed at once when streaming. Enter a float value for the current sampling center and range, or use the Operations class.' + '\n')
+            sys.exit()
+        if isinstance(self.center, (float)) is False:       # checks that the given current sampling center is a float value
+            print('\n' + 'An invalid datatype was used for the current sampling center. Enter a float value.' + '\n')
+            sys.exit()
+        if isinstance(self.range, (float)) is False:        # checks that the given current sampling range is a float value
+            print('\n' + 'An invalid datatype was used for the current sampling fraction. Enter a float value.' + '\n')
+            sys.exit()
+        if isinstance(self.kahan, (bool)) is False:     # checks that the given Kahan summation option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the Kahan summation option. Enter a Boolean value.' + '\n')
+            sys.exit()
+        if isinstance(self.vertex, (str)) is False:     # checks that the given vertex method is a string
+            print('\n' + 'An invalid datatype was used for the vertex method. Enter a string.' + '\n')
+            sys.exit()
+        if isinstance(self.LP, (bool)) is False:        # checks that the given low-pass filter option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the low-pass filter option. Enter a Boolean value.' + '\n')
+            sys.exit()
+
+        '''DATA VALUE ERRORS'''
+        if self.window <= 1:      # checks that the given moving average window is greater than 1
+            print('\n' + 'Moving average window must be greater than 1.' + '\n')
+            sys.exit()
+        if self.step <= 0:       # checks that the given moving average step is greater than 0
+            print('\n' + 'Moving average step must be greater than 0.' + '\n')
+            sys.exit() 
+        if round(self.center - (self.range / 2), 3) < 0.01:       # checks that the sampling window avoids the very beginning of an interval
+            print('\n' + 'Sampling cannot be done in the first 1 percent of an interval.' + '\n')
+            sys.exit() 
+        if round(self.center + (self.range / 2), 3) > 0.99:       # checks that the sampling window avoids the very end of an interval
+            print('\n' + 'Sampling cannot be done in the last 1 percent of an interval.' + '\n')
+            sys.exit() 
+        if self.vertex != 'threshold':      # restricts the correlation vertex method, which compares the direction of every step at once
+            print('\n' + 'Only the threshold vertex method is available when streaming. Use the Operations class for the correlation vertex method.' + '\n')
+            sys.exit()
+        if self.LP == True:     # restricts low-pass filter analysis, whose filter state is not carried from one block to the next
+            print('\n' + 'Low-pass filter analysis is not available when streaming. Use the Operations class for low-pass filter analysis.' + '\n')
+            sys.exit()
+        if self.MA == True and self.CS == True:     # restricts both moving average and current sampling analysis from being performed
+            print('\n' + 'Both analysis methods have been selected. Please choose either one or neither in order to get the raw data' + '\n')
+            sys.exit()
+        if self.CS == True and self.shape.type == 'linear' and self.data.label == 'simulated':      # restricts current sampling analysis of data without steps
+            print('\n' + 'Current sampling cannot be performed on simulated data with a linear waveform, since it has no steps to sample.' + '\n')
+            sys.exit()
+
+        '''PARAMETER DEFINITIONS'''
+        self.search = not (self.shape.type == 'linear' and self.data.label == 'simulated')     # boolean value which decides if the peaks are found (which is needed for everything but simulated linear data)
+        self.index = self.shape.index       # indexing array borrowed from waveforms.py
+        if self.MA == False and self.CS == False:       # label for file naming
+            self.method = 'no formatting'
+        if self.MA == True:
+            self.method = f'moving average analysis using a window of {self.window} and steps of {self.step} '
+        if self.CS == True:
+            self.method = f'current sampling analysis using a sampling window of {round(self.range * 100)}% centered at {round(self.center * 100)}%'
+
+
+    def Results(self):
+        '''Reads the data one block at a time, yielding the index, potential, and current arrays of each new set of results as soon as they are known'''
+
+        '''STATE INITIALISATION'''
+        self.E = self.shape.E if self.data.label != 'imported' else None        # potential waveform, which is only known for imported data once the vertex potential has been found
+        self.held = np.zeros(0)     # points of the current array which are still needed
+        self.base = 0       # position of the first held point in the current array
+        self.n = 0      # number of points received so far
+        self.windows = 0        # number of analysis windows which have been searched for peaks
+        self.recent = np.zeros(2, dtype = np.int64)        # peak positions of the last two analysis windows
+        self.split = False      # boolean value which marks whether the last analysis window split a peak
+        self.last = None        # position and value of the last peak, used to find the vertex potential
+        self.found = 0      # number of peaks found so far
+        self.threshold = None       # height of the second peak, which changes between peaks are compared against to find the vertex potential
+        self.pending = np.zeros(0, dtype = np.int64)        # start of the current sampling interval which is still open
+        self.next = 0       # next moving average window, or next raw point
+        self.sums = np.zeros(1)     # running total of the current at every held point (plus one), continued from the start of the current array
+        self.inblock = np.zeros(0)      # running total of the current within each block of 4096 points at every held point (Kahan compensated moving average)
+        self.hi = np.zeros(1)       # compensated total of all blocks before each held block (Kahan compensated moving average)
+        self.lo = np.zeros(1)       # rounding error on each compensated total (Kahan compensated moving average)
+        self.hb = 0     # block of the first compensated total which is held
+        self.total = 0.0        # compensated total of all blocks so far
+        self.error = 0.0        # rounding error carried between blocks
+        self.carry = 0.0        # running total within the block of 4096 points at the last point received
+        self.queue = []     # results which are waiting for the vertex potential to be found
+        self.rows = 0       # number of rows of results yielded so far
+        self.ended = False      # boolean value which marks that no more rows of results can fit the potential waveform
+
+        '''BLOCK ANALYSIS'''
+        for block in self.data.Blocks():        # loops through the blocks of the current array as they are read
+            self.Append(np.asarray(block))
+            self.Analyse(final = False)
+            yield from self.Flush()
+            if self.ended == True:      # stops reading once the potential waveform has been filled
+                return
+            self.Trim()
+        self.Analyse(final = True)      # closes the last current sampling interval
+        yield from self.Flush()
+        if self.E is None:      # activates in cases where no vertex potential was found in the imported data
+            raise ValueError('No vertex potential was found in the data, so the potential waveform could not be aligned with it')
+
+
+    def Append(self, block):
+        '''Adds a block to the held points, continuing the running totals used in moving average analysis'''
+
+        self.held = np.concatenate((self.held, block)) if self.held.size > 0 else block     # adds the block to the held points
+        if self.MA == True and self.kahan == False:     # continues the running total from the last held point, in the same order as a single cumulative sum
+            self.sums = np.concatenate((self.sums, np.cumsum(np.concatenate((self.sums[-1:], block)))[1:]))
+        if self.MA == True and self.kahan == True:      # continues the running total within each block of 4096 points
+            size = 4096     # number of points in each block
+            position = self.n       # position of the next point in the current array
+            parts = [self.inblock]      # running totals within each block
+            while position < self.n + block.size:       # loops through the parts of the block which fall in different blocks of 4096 points
+                offset = position % size        # position of the point within its block of 4096 points
+                part = block[position - self.n : position - self.n + size - offset].astype(np.float64)       # points which fall in the same block of 4096 points
+                part = np.cumsum(part) if offset == 0 else np.cumsum(np.concatenate(([self.carry], part)))[1:]        # running total within the block, continued from the previous point if the block has already started
+                parts.append(part)
+                position += part.size
+                self.carry = part[-1]       # running total at the last point, which the next part continues from
+                if position % size == 0:        # activates in cases where a block of 4096 points has been completed
+                    added = part[-1] - self.error       # corrects the total of the block using the rounding error so far
+                    summed = self.total + added     # adds the block to the compensated total
+                    self.error = (summed - self.total) - added      # and finds the rounding error of the addition
+                    self.total = summed
+                    self.hi = np.append(self.hi, self.total)        # stores the compensated total of all blocks before the next one
+                    self.lo = np.append(self.lo, -self.error)       # and the rounding error on it
+            self.inblock = np.concatenate(parts)
+        self.n += block.size
+
+
+    def Analyse(self, final):
+        '''Finds the new peaks and the results which can be calculated from the points received so far'''
+
+        peaks = self.Peaks() if self.search == True else np.zeros(0, dtype = np.int64)      # finds the peaks in every new complete analysis window
+        if self.E is None:      # imported data needs the vertex potential to align the potential waveform
+            self.Vertex(peaks)
+        if self.MA == False and self.CS == False:       # raw data is simply passed on
+            self.queue.append((np.arange(self.next, self.n), self.held[self.next - self.base : self.n - self.base]))
+            self.next = self.n
+        if self.MA == True:
+            self.queue.append(self.MovingAverage())
+        if self.CS == True:
+            self.queue.append(self.CurrentSampling(peaks, final))
+
+
+    def Peaks(self):
+        '''Finds the peaks in every new complete analysis window, in the same way as the Peaks method of the Operations class'''
+
+        interval = self.shape.interval      # number of points in each analysis window
+        first, last = self.windows, self.n // interval      # first and last new complete analysis windows
+        if last <= first:       # activates in cases where no new analysis window has been completed
+            return np.zeros(0, dtype = np.int64)
+        windows = np.arange(first, last)        # every new complete analysis window
+        blocks = np.reshape(self.held[first * interval - self.base : last * interval - self.base], (last - first, interval))      # views the new analysis windows as one window per row
+        positions = np.argmax(np.abs(blocks), axis = 1) + windows * interval      # finds the position of the peak in every new analysis window
+        full = np.concatenate((self.recent, positions))     # peak positions of the new analysis windows, following the peak positions of the two windows before them
+        
+        split = (windows > 0) & (positions - full[1:-1] < 0.5 * interval)       # marks the windows which split a peak
+        before = np.concatenate(([self.split], split[:-1]))     # marks the windows which follow a split peak
+        previous = np.where(windows == 0, 0, np.where((windows >= 2) & before, full[:-2], full[1:-1]))      # position of the last kept peak before each analysis window
+        lost = ~split & (positions - previous > 1.5 * interval) & (windows > 0)       # marks the analysis windows which skip a peak
+        
+        combined = np.full((last - first, 2), -1, dtype = np.int64)     # lost peak and found peak of every analysis window, with -1 marking no peak
+        for ix in np.flatnonzero(lost):     # loops through the analysis windows which skip a peak (which is rare)
+            start = np.int64(previous[ix] + 0.5 * interval)     # start of the region containing the lost peak
+            stop = np.int64(positions[ix] - 0.5 * interval)     # end of the region containing the lost peak
+            combined[ix, 0] = np.argmax(np.abs(self.held[start - self.base : stop - self.base])) + start      # finds the position of the lost peak
+        combined[~split, 1] = positions[~split]     # adds the found peaks which are kept
+        
+        self.recent = full[-2:]
+        self.split = bool(split[-1])
+        self.windows = last
+        peaks = np.ravel(combined)
+        return peaks[peaks >= 0]        # returns the peaks in order, with each lost peak before the peak which revealed it
+
+
+    def Vertex(self, peaks):
+        '''Compares the changes between new peaks against the height of the second peak to find the vertex potential, in the same way as \n
+        the Peaks method of the Operations class, then aligns the potential waveform with the data'''
+
+        values = self.held[peaks - self.base]       # current at each new peak
+        if self.threshold is None and self.found + values.size >= 2:      # activates in cases where the second peak has just been found
+            self.threshold = np.abs(values[1 - self.found])
+        positions = np.concatenate(([self.last[0]], peaks)) if self.last is not None else peaks     # positions of the new peaks, following the last peak
+        values = np.concatenate(([self.last[1]], values)) if self.last is not None else values      # values of the new peaks, following the last peak
+        self.found += peaks.size
+        if positions.size > 0:
+            self.last = (positions[-1], values[-1])
+        
+        changes = np.diff(values)       # finds the change in current between two adjacent peaks
+        if changes.size == 0:
+            return
+        hits = np.flatnonzero((changes >= self.threshold) | (changes <= -self.threshold))       # finds the changes which are larger than the height of a single peak
+        if hits.size == 0:
+            return
+        vertex = int(positions[hits[0]])        # position of the first large change
+        if changes[hits[0]] >= self.threshold:      # activates in cases where the change is positive, which marks the lower vertex potential
+            shift = self.shape.udp + self.shape.dp - vertex if self.shape.dE > 0 else self.shape.ldp - vertex
+        else:       # activates in cases where the change is negative, which marks the upper vertex potential
+            shift = self.shape.udp - vertex if self.shape.dE > 0 else self.shape.dp + self.shape.ldp - vertex
+        self.E = Operations.Rotate(self, self.shape.E, shift)       # reorganises the imported potential waveform to fit the data, in the same way as the Operations class
+
+
+    def MovingAverage(self):
+        '''Finds the average current in every moving average window which has been completely received'''
+
+        count = (self.n - self.window) // self.step + 1 if self.n >= self.window else 0     # number of moving average windows which have been completely received
+        starts = np.arange(self.next, count) * self.step        # start position of every new window
+        self.next = max(self.next, count)
+        if self.kahan == False:     # finds the average current in every window from the difference between two running totals
+            i = (self.sums[starts + self.window - self.base] - self.sums[starts - self.base]) / self.window
+        else:       # finds the average current in every window from the compensated totals of the blocks and the running totals within them
+            size = 4096     # number of points in each block
+            ends = starts + self.window - 1     # position of the last point in every window
+            befores = np.maximum(starts - 1, 0)     # position of the last point before every window
+            first = starts == 0     # marks the window which has no points before it
+            blocked = (self.hi[ends // size - self.hb] - np.where(first, 0, self.hi[befores // size - self.hb])) + (self.lo[ends // size - self.hb] - np.where(first, 0, self.lo[befores // size - self.hb]))
+            i = (blocked + (self.inblock[ends - self.base] - np.where(first, 0, self.inblock[befores - self.base]))) / self.window
+        return starts, i
+
+
+    def CurrentSampling(self, peaks, final):
+        '''Averages the current in the sampling region of every interval which has been closed by the peak that follows it (or by the end \n
+        of the data for the last interval)'''
+
+        peaks = np.concatenate((self.pending, peaks))       # peaks which start an interval that is still open
+        if final == True:       # closes the last interval, estimating its end position in the same way as the Operations class
+            starts = peaks
+            ends = np.append(peaks[1:], np.minimum(peaks[-1:] + self.shape.interval, self.n))
+            self.pending = peaks[:0]
+        else:       # closes every interval except the last
+            starts = peaks[:-1]
+            ends = peaks[1:]
+            self.pending = peaks[-1:]
+        lower = starts + (round((self.center - (self.range / 2)), 3) * (ends - starts)).astype(np.int64)      # finds the index for the lower limit of every sampling region
+        upper = starts + (round((self.center + (self.range / 2)), 3) * (ends - starts)).astype(np.int64)      # finds the index for the upper limit of every sampling region
+        counts = upper - lower      # number of points in every sampling region
+        bounds = np.ravel(np.column_stack((np.minimum(lower, self.n - 1), upper))) - self.base      # interleaves the limits of the sampling regions within the held points
+        if bounds.size > 0 and bounds[-1] == self.n - self.base:        # the last sampling region can finish at the very end of the held points
+            bounds = bounds[:-1]
+        sums = np.add.reduceat(self.held, bounds)[::2] if bounds.size > 0 else np.zeros(0)        # sums the current within every sampling region
+        i = np.divide(sums, counts, out = np.full(counts.size, np.nan), where = counts > 0)        # averages the current within every sampling region, leaving empty regions as nan
+        return starts, i
+
+
+    def Flush(self):
+        '''Yields every waiting result once the potential waveform is known, stopping at the first result which falls outside of it'''
+
+        if self.E is None:      # results wait until the vertex potential has been found
+            return
+        for positions, i in self.queue:     # loops through the waiting results in order
+            rows = np.arange(self.rows, self.rows + positions.size)     # row of each result
+            fits = np.count_nonzero((rows < self.index.size) & (positions < self.E.size))       # number of results which fit the index and potential waveform
+            if fits > 0:
+                yield np.asarray(self.index[self.rows : self.rows + fits]), np.asarray(self.E[positions[:fits]]), i[:fits]
+            self.rows += fits
+            if fits < positions.size:       # activates in cases where the potential waveform has been filled
+                self.ended = True
+                break
+        self.queue = []
+
+
+    def Trim(self):
+        '''Drops the held points (and running totals) which are no longer needed'''
+
+        keep = [self.n]     # position of the first point which is still needed
+        if self.search == True:     # the next analysis windows can look back two windows for a lost peak
+            keep.append(max(0, (self.windows - 2) * self.shape.interval))
+        if self.pending.size > 0:       # the open current sampling interval is still needed
+            keep.append(int(self.pending[0]))
+        if self.MA == True:     # the next moving average window (and the point before it) is still needed
+            keep.append(max(0, self.next * self.step - 1))
+        if self.MA == False and self.CS == False:       # raw points which have not been passed on are still needed
+            keep.append(self.next)
+        keep = min(keep)
+        
+        drop = keep - self.base     # number of held points which are dropped
+        if drop <= 0:
+            return
+        self.held = self.held[drop:]
+        if self.MA == True and self.kahan == False:
+            self.sums = self.sums[drop:]
+        if self.MA == True and self.kahan == True:
+            self.inblock = self.inblock[drop:]
+            blocks = keep // 4096 - self.hb     # number of compensated totals which are dropped
+            self.hi, self.lo, self.hb = self.hi[blocks:], self.lo[blocks:], self.hb + blocks
+        self.base = keep
+
+
+    def output(self):
+        '''Returns the analysed oscilloscope data one row at a time as it is read, for checking or analysis purposes'''
+
+        for index, E, i in self.Results():
+            yield from zip(index, E, i)
+
+
+"""
+===================================================================================================
+BENCHMARKING PARALLEL ANALYSIS FROM MAIN
+===================================================================================================
+"""
+
+if __name__ == '__main__':
+
+    import os
+    import time
+    import waveforms as wf
+    import simulations as sim
+
+    '''1. CHOOSE THE NUMBERS OF THREADS'''
+    counts = [None] + sorted({2 ** ix for ix in range((os.cpu_count() or 1).bit_length())} | {os.cpu_count() or 1})
+
+    '''2. SIMULATE A LONG CAPTURE'''
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.001, sr = 0.1, ns = 1, osf = 2000000)
+    data = sim.Capacitance(shape, Cd = 0.000050, Ru = 500)
+    print(f'Analysing {data.i.size} simulated points')
+
+    '''3. TIME EACH ANALYSIS METHOD'''
+    for method, options in (('peak finding', {}), ('moving average', {'MA': True, 'window': 20000, 'step': 2000}), ('current sampling', {'CS': True})):
+        for workers in counts:
+            start = time.time()
+            analysis = Operations(shape, data, workers = workers, **options)
+            end = time.time()
+            if workers == None:     # analysis in one piece, which the other results are compared with
+                serial, reference = end - start, analysis
+                print(f'{method} in one piece took {serial:.3f} seconds')
+                continue
+            same = np.array_equal(analysis.peaks, reference.peaks) and np.allclose(analysis.i, reference.i, rtol = 1e-9, equal_nan = True)
+            print(f'{method} on {workers} threads took {end - start:.3f} seconds ({serial / (end - start):.2f}x, {"same" if same else "different"} results)')
@@ -0,0 +1,245 @@
+'''
+===================================================================================================
+Copyright (C) 2023 Steven Linfield
+
+This file is part of the oscilloscope-reader package. This package is free software: you can
+redistribute it and/or modify it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or (at your option) any later
+version. This software is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details. You should have received a copy of the GNU General
+Public License along with oscilloscope-reader. If not, see https://www.gnu.org/licenses/
+===================================================================================================
+
+Package title:      oscilloscope-reader
+Repository:         https://github.com/MoonshinetheP/oscilloscope-reader
+Date of creation:   22/10/2022
+Main author:        Steven Linfield (MoonshinetheP)
+Collaborators:      None
+Acknowledgements:   None
+
+Filename:           pipeline.py
+
+===================================================================================================
+
+Description:
+
+This file contains the code used by the oscilloscope-reader package to open, analyse, and save a
+whole series of oscilloscope files recorded with the same potential waveform. Opening and saving
+files are done in separate threads, so that the next file is parsed and the previous file is saved
+whilst the current file is being analysed.
+
+===================================================================================================
+
+How to use this file:
+
+Whilst this file can be used by other files, it can also be used on its own in order to analyse a
+whole directory of oscilloscope files.
+
+In order to use this file:
+    1. Scroll down the the bottom of the file, to the 'RUNNING A PIPELINE FROM MAIN' section.
+    2. In the second point of this section, choose the waveform which was used in the experiments,
+       commenting out the other waveform (see reader.py for the rules on waveform parameters)
+    3. In the third point of this section, edit the conversion factor and analysis options
+    4. Run the python file and choose the directory which holds the oscilloscope files
+
+The analysed oscilloscope data will be saved in .txt files in the /analysis folder of the current
+working directory.
+
+===================================================================================================
+
+Notes:
+
+Each stage of the pipeline is joined to the next by a bounded queue. When analysis falls behind, the
+queue of opened files fills up and the thread opening files waits, and likewise when saving falls
+behind, so that no more than depth files are ever waiting at each stage. The analysis drops its
+reference to the opened file before it is passed on to be saved, so that at most depth + 2 opened
+files are held in memory at once (depth waiting to be analysed, one being analysed, and one waiting
+for room in the queue), whilst the files waiting to be saved only hold their results (although the
+result of a raw analysis is a view of the current of the opened file). Parsing with the pyarrow
+or pandas parsers and writing files both release the GIL, which allows them to run alongside the
+analysis.
+
+===================================================================================================
+'''
+
+
+import sys
+import os
+import time
+import queue
+import threading
+from errno import EEXIST
+import fileopener as fo
+import operations as op
+
+
+class Pipeline:
+
+    '''Opens, analyses, and saves a series of oscilloscope files, overlapping the opening of the next file and the saving of the previous \n
+    file with the analysis of the current file \n
+
+    Requires: \n
+    source - a directory holding the oscilloscope files, a glob pattern which matches them (see Batch in fileopener.py), or a list of files \n
+    shape - an instance of one of the potential waveform classes from the waveforms.py file \n
+    cf - user-defined voltage-to-current conversion factor of the potentiostat \n
+    depth - the number of files which can wait between two stages of the pipeline \n
+    directory - location of the folder which holds the analysed files (None uses a /analysis folder in the current working directory) \n
+    opening - a dictionary of keyword options for the Oscilloscope class (e.g. {'engine': 'pyarrow'}) \n
+    analysis - a dictionary of keyword options for the Operations class (e.g. {'MA': True, 'window': 50000})'''
+
+    def __init__(self, source, shape, cf, depth = 2, directory = None, opening = None, analysis = None):
+
+        '''PARAMETER INITIALISATION'''
+        self.source = source        # directory, glob pattern, or list of the oscilloscope files which have been selected for analysis
+        self.shape = shape      # potential waveform object generated by waveforms.py
+        self.cf = cf        # conversion factor of voltage-to-current defined by the user for the potentiostat/settings used
+        self.depth = depth      # number of files which can wait between two stages of the pipeline
+        self.directory = directory if directory is not None else os.getcwd() + '/analysis'        # location of the folder which holds the analysed files
+        self.opening = opening if opening is not None else {}       # keyword options for the Oscilloscope class
+        self.analysis = analysis if analysis is not None else {}        # keyword options for the Operations class
+
+        '''DATATYPE ERRORS'''
+        if isinstance(self.source, (str, list)) is False:       # checks that the given source is a string or a list
+            print('\n' + 'An invalid datatype was used for the source. Enter a string corresponding to a directory or a glob pattern, or a list of files.' + '\n')
+            sys.exit()
+        if isinstance(self.cf, (float)) is False:       # checks that the conversion factor is a float value
+            print('\n' + 'An invalid datatype was used for the conversion factor. Enter a float value.' + '\n')
+            sys.exit()
+        if isinstance(self.depth, (int)) is False:      # checks that the given depth is an integer value
+            print('\n' + 'An invalid datatype was used for the depth. Enter an integer value.' + '\n')
+            sys.exit()
+        if isinstance(self.directory, (str)) is False:      # checks that the given directory is a string
+            print('\n' + 'An invalid datatype was used for the analysis directory. Enter a string or None.' + '\n')
+            sys.exit()
+        if isinstance(self.opening, (dict)) is False or isinstance(self.analysis, (dict)) is False:        # checks that the given options are dictionaries
+            print('\n' + 'An invalid datatype was used for the opening or analysis options. Enter a dictionary of keyword options or None.' + '\n')
+            sys.exit()
+
+        '''DATA VALUE ERRORS'''
+        if self.cf <= 0:        # checks that the conversion factor is a positive non-zero value
+            print('\n' + 'Conversion factor must be a postive non-zero value.' + '\n')
+            sys.exit()
+        if self.depth <= 0:     # checks that the given depth is a positive non-zero value
+            print('\n' + 'Depth must be a positive non-zero value.' + '\n')
+            sys.exit()
+
+        '''ANALYSIS FOLDER'''
+        try:
+            os.makedirs(self.directory)
+        except OSError as exc:
+            if exc.errno == EEXIST and os.path.isdir(self.directory):
+                pass
+            else:
+                raise
+
+        '''PARAMETER DEFINITIONS'''
+        self.files = fo.Batch.Find(self.source) if isinstance(self.source, str) else list(self.source)       # finds every oscilloscope file in the directory or matching the pattern
+        self.opened = queue.Queue(maxsize = self.depth)     # bounded queue of files which have been opened and are waiting to be analysed
+        self.analysed = queue.Queue(maxsize = self.depth)       # bounded queue of files which have been analysed and are waiting to be saved
+        self.results = {}       # location of the saved analysis of each file
+        self.seconds = {}       # time taken to analyse each file (in s)
+        self.failures = {}      # error message of each file which could not be opened, analysed, or saved
+
+
+    def Run(self):
+        '''Runs every file through the pipeline, returning once the last file has been saved'''
+
+        start = time.time()
+        reader = threading.Thread(target = self.Open, daemon = True)        # thread which opens the files
+        writer = threading.Thread(target = self.Save, daemon = True)        # thread which saves the analysed files
+        reader.start()
+        writer.start()
+
+        while True:     # analyses the files in the order that they were opened
+            file, data = self.opened.get()      # waits for the next file to be opened
+            if file is None:        # stops once every file has been opened
+                break
+            if isinstance(data, BaseException):        # activates in cases where the file could not be opened
+                self.Fail(file, data)
+                continue
+            began = time.time()
+            try:
+                analysis = op.Operations(self.shape, data, **self.analysis)     # analyses the file
+            except (Exception, SystemExit) as exc:      # catches data which cannot be analysed as well as invalid options
+                self.Fail(file, exc)
+                continue
+            finally:
+                del data        # releases this reference to the opened file once it has been analysed
+            analysis.data = None        # releases the reference held by the analysis, which only needs its results to be saved
+            self.seconds[file] = time.time() - began
+            self.analysed.put((file, analysis))     # passes the analysis to the thread which saves it, waiting if that thread has fallen behind
+        self.analysed.put((None, None))     # tells the thread which saves the files that there are no more files
+
+        reader.join()
+        writer.join()
+        self.time = time.time() - start     # time taken to run every file through the pipeline (in s)
+        print(f'{len(self.results)} of {len(self.files)} files were analysed in {self.time} seconds')
+        return self
+
+
+    def Open(self):
+        '''Opens each file in turn, passing it to the queue of opened files (or the error if it could not be opened)'''
+
+        for file in self.files:
+            try:
+                data = fo.Oscilloscope(file, self.cf, **self.opening)       # parses the current column of the file
+            except (Exception, SystemExit) as exc:      # catches unreadable files as well as invalid options
+                data = exc
+            self.opened.put((file, data))       # waits if the queue of opened files is full
+            del data
+        self.opened.put((None, None))       # tells the analysis that there are no more files
+
+
+    def Save(self):
+        '''Saves each analysed file in turn, in the same format as reader.py'''
+
+        while True:
+            file, analysis = self.analysed.get()        # waits for the next file to be analysed
+            if file is None:        # stops once every file has been saved
+                return
+            path = f'{self.directory}/{os.path.basename(file)} {self.shape.label} data with {analysis.method}.txt'      # location of the saved analysis
+            try:
+                with open(path, 'w') as output:
+                    if analysis.header() is not None:       # activates in cases where several sampling regions were analysed at once
+                        output.write(analysis.header())     # names the current column of every sampling region
+                    output.writelines(','.join(map(str, row)) + '\n' for row in analysis.output())      # writes the analysed oscilloscope data, which can have one current column for every sampling region
+            except Exception as exc:        # catches files which cannot be written
+                self.Fail(file, exc)
+                continue
+            self.results[file] = path
+            print(f'{os.path.basename(file)} was analysed in {self.seconds[file]:.3f} seconds')
+
+
+    def Fail(self, file, exc):
+        '''Reports a file which could not be opened, analysed, or saved'''
+
+        self.failures[file] = f'{type(exc).__name__}: {exc}'
+        print(f'{os.path.basename(file)} could not be analysed ({self.failures[file]})')
+
+
+
+"""
+===================================================================================================
+RUNNING A PIPELINE FROM MAIN
+===================================================================================================
+"""
+
+if __name__ == '__main__':
+
+    from tkinter import filedialog
+    import waveforms as wf
+
+    '''1. DEFINE THE START TIME'''
+    start = time.time()
+
+    '''2. DESCRIBE THE WAVEFORM THAT WAS USED IN THE EXPERIMENTS'''
+    #shape = wf.CyclicLinearVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.001, sr = 0.5, ns = 1, osf = None)
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.001, sr = 0.5, ns = 1, osf = None)
+
+    '''3. RUN EVERY FILE IN A DIRECTORY THROUGH THE PIPELINE'''
+    pipeline = Pipeline(filedialog.askdirectory(), shape, cf = 0.000012, depth = 2, analysis = {'MA': False, 'CS': True, 'center': 0.5, 'range': 0.95}).Run()
+
+    '''4. DEFINE THE END TIME'''
+    end = time.time()
+    print(f'The oscilloscope files took {end-start} seconds to analyse')
@@ -63,20 +63,26 @@ class Plotter:
         self.display = display      # boolean value which decides if the plot is displayed or not
         self.save = save        # boolean value which decides if the plot is saved or not
 
+        '''PLOT DATA'''
+        tWF = np.asarray(self.shape.tWF)        # time array of the potential waveform (calculated once here if the waveform is lazy)
+        EWF = np.asarray(self.shape.EWF)        # potential array of the potential waveform (calculated once here if the waveform is lazy)
+        E = np.asarray(self.analysis.E)     # potential array of the oscilloscope data (calculated once here if the waveform is lazy)
+        i = np.transpose(np.asarray(self.analysis.i))     # current array of the oscilloscope data (converted once here if it is held as ADC codes), with one column per sampling region if several were analysed
+
         '''PLOT DEFINITION'''
         fig, (ax1, ax2) = plt.subplots(1,2, figsize=(12, 5))        # defines a matplotlib figure with two horizontally arranged subplots
-        left, = ax1.plot(self.shape.tWF, self.shape.EWF, linewidth = 1, linestyle = '-', color = 'blue', marker = None, label = None, visible = True)       # plots the potential waveform from waveforms.py on the left-hand subplot
-        right, = ax2.plot(self.analysis.E, self.analysis.i, linewidth = 1, linestyle = '-', color = 'red', marker = None, label = None, visible = True)     # plots the oscilloscope data from operations.py on the right-hand subplot
+        left, = ax1.plot(tWF, EWF, linewidth = 1, linestyle = '-', color = 'blue', marker = None, label = None, visible = True)       # plots the potential waveform from waveforms.py on the left-hand subplot
+        right = ax2.plot(E, i, linewidth = 1, linestyle = '-', color = 'red', marker = None, label = None, visible = True)     # plots the oscilloscope data from operations.py on the right-hand subplot (one line per sampling region)
         
         '''PLOT SETTINGS'''
-        ax1.set_xlim(np.amin(self.shape.tWF) - (0.1 * (np.amax(self.shape.tWF) - np.amin(self.shape.tWF))), np.amax(self.shape.tWF) + (0.1 * (np.amax(self.shape.tWF) - np.amin(self.shape.tWF))))      # sets the x-axis limits of the left-hand subplot to +/- 10% of the waveform's time range
-        ax1.set_ylim(np.amin(self.shape.EWF) - (0.1 * (np.amax(self.shape.EWF) - np.amin(self.shape.EWF))), np.amax(self.shape.EWF) + (0.1 * (np.amax(self.shape.EWF) - np.amin(self.shape.EWF))))      # sets the y-axis limits of the left-hand subplot to +/- 10% of the waveform's potential range
+        ax1.set_xlim(np.amin(tWF) - (0.1 * (np.amax(tWF) - np.amin(tWF))), np.amax(tWF) + (0.1 * (np.amax(tWF) - np.amin(tWF))))      # sets the x-axis limits of the left-hand subplot to +/- 10% of the waveform's time range
+        ax1.set_ylim(np.amin(EWF) - (0.1 * (np.amax(EWF) - np.amin(EWF))), np.amax(EWF) + (0.1 * (np.amax(EWF) - np.amin(EWF))))      # sets the y-axis limits of the left-hand subplot to +/- 10% of the waveform's potential range
         ax1.set_title('E vs. t', pad = 15, fontsize = 20)       # defines the title and settings of the left-hand subplot
         ax1.set_xlabel('t / s', labelpad = 5, fontsize = 15)        # defines the x-axis label and settings of the left-hand subplot
         ax1.set_ylabel('E / V', labelpad = 5, fontsize = 15)        # defines the y-axis labe and settings of the left-hand subplot
 
-        ax2.set_xlim(np.amin(self.analysis.E) - (0.1 * (np.amax(self.analysis.E) - np.amin(self.analysis.E))), np.amax(self.analysis.E) + (0.1 * (np.amax(self.analysis.E) - np.amin(self.analysis.E))))        # sets the x-axis of the right-hand subplot to +/- 10% of the oscilloscope data's potential range
-        ax2.set_ylim(np.nanmin(self.analysis.i) - (0.1 * (np.nanmax(self.analysis.i) - np.nanmin(self.analysis.i))), np.nanmax(self.analysis.i) + (0.1 * (np.nanmax(self.analysis.i) - np.nanmin(self.analysis.i))))        # sets the y-axis of the right-hand subplot to +/- 10% of the oscilloscope data's current range
+        ax2.set_xlim(np.amin(E) - (0.1 * (np.amax(E) - np.amin(E))), np.amax(E) + (0.1 * (np.amax(E) - np.amin(E))))        # sets the x-axis of the right-hand subplot to +/- 10% of the oscilloscope data's potential range
+        ax2.set_ylim(np.nanmin(i) - (0.1 * (np.nanmax(i) - np.nanmin(i))), np.nanmax(i) + (0.1 * (np.nanmax(i) - np.nanmin(i))))        # sets the y-axis of the right-hand subplot to +/- 10% of the oscilloscope data's current range
         ax2.set_title('i vs. E', pad = 15, fontsize = 20)       # defines the title and settings of the right-hand subplot
         ax2.set_xlabel('E / V', labelpad = 5, fontsize = 15)        # defines the x-axis label and settings of the right-hand subplot 
         ax2.set_ylabel('i / A', labelpad = 5, fontsize = 15)        # defines the y-axis label and settings of the right-hand subplot
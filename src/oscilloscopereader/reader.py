@@ -113,6 +113,7 @@ shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.
 
 '''4. EITHER OPEN A REAL DATA FILE OR A SIMULATED DATA FILE'''
 data = fo.Oscilloscope(filedialog.askopenfilename(), cf = 0.000012)
+#data = fo.Binary(filedialog.askopenfilename(), cf = 0.000012)
 #data = sim.Capacitance(shape, Cd = 0.000050, Ru = 250)
 
 '''5. PERFORM ANALYSIS ON THE DATA FILE'''
@@ -127,8 +128,10 @@ with open(f'{cwd}/data/{time.strftime("%Y-%m-%d %H-%M-%S")} {shape.label} wavefo
         file.write(str(ix) + ',' + str(iy) + ',' + str(iz) + '\n')
 
 with open(f'{cwd}/analysis/{time.strftime("%Y-%m-%d %H-%M-%S")} {data.label} {shape.label} data with {analysis.method}.txt', 'w') as file:
-    for ix, iy, iz in analysis.output():
-        file.write(str(ix) + ',' + str(iy) + ',' + str(iz) + '\n')
+    if analysis.header() is not None:       # activates in cases where several sampling regions were analysed at once
+        file.write(analysis.header())
+    for row in analysis.output():       # each row can have one current column for every sampling region
+        file.write(','.join(map(str, row)) + '\n')
         
 '''8. DEFINE THE END TIME'''
 end = time.time()
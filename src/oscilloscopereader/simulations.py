@@ -60,7 +60,9 @@ directory.
 import sys
 import os
 import time
+import types
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from errno import EEXIST
 import waveforms as wf
 
@@ -107,6 +109,9 @@ class Capacitance:
             print('\n' + 'Uncompensated resistnace must be a positive non-zero value' + '\n')
             sys.exit() 
 
+        '''PARAMETER DEFINITIONS'''
+        self.time = self.shape.t        # time base of the potential waveform used by every portion of the simulation
+
         '''CONTROL STATEMENTS'''         
         if self.shape.type == 'linear':     # activates in cases where simulations are performed using a linear waveform
             self.linear()
@@ -119,42 +124,29 @@ class Capacitance:
         Uses equation 1.6.23 from the 3rd edition of Electrochemical Methods:\n
         i = sr*Cd*(1-np.exp(-t/(Ru*Cd)))'''
         
-        self.i = np.array([0])      # creates a current array containing the initial current value at rest potential (0)
+        '''KERNELS'''
+        kernel = self.sr * self.Cd * (1 - np.exp((-np.asarray(self.time[:max(self.shape.dp, self.shape.udp, self.shape.ldp)])) / (self.Ru * self.Cd)))      # calculates the current for the longest portion of the potential window once, since every portion starts from the same point
+        self.iplus = kernel[..., :self.shape.dp]     # current from the positive scan direction portion of the potential window
+        self.iminus = -self.iplus       # current from the negative scan direction portion of the potential window
+        self.iupp = kernel[..., :self.shape.udp]     # current from the positive scan direction portion of the upper partial potential window
+        self.ilow = kernel[..., :self.shape.ldp]     # current from the positive scan direction portion of the lower partial potential window
         
         '''STARTING FROM LOWER VERTEX POTENTIAL'''
         if self.Eini == self.Elow:      # activates in cases where the initial potential is equal to the lower vertex potential
-            for iy in range(0, self.ns):        # loops through the number of scans
-                self.i = np.append(self.i, self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))     # appends the current from the positive scan direction portion of the potential window to the current array
-                self.i = np.append(self.i, -self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))        # appends the current from the negative scan direction portion of the potential window to the current array
+            self.Assemble([], [self.iplus, self.iminus], self.ns, [])       # every scan is a positive then a negative scan direction portion of the potential window
         
         '''STARTING FROM UPPER VERTEX POTENTIAL'''        
         if self.Eini == self.Eupp:      # activates in cases where the initial potential is equal to the upper vertex potential
-            for iy in range(0, self.ns):        # loops through the number of scans
-                self.i = np.append(self.i, -self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))        # appends the current from the negative scan direction portion of the potential window to the current array
-                self.i = np.append(self.i, self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))     # appends the current from the positive scan direction portion of the potential window to the current array
+            self.Assemble([], [self.iminus, self.iplus], self.ns, [])       # every scan is a negative then a positive scan direction portion of the potential window
         
         '''STARTING IN BETWEEN VERTEX POTENTIALS'''
         if self.Elow < self.Eini < self.Eupp:      # activates in cases where the initial potential is between the lower vertexpotential and the upper vertex potential
             '''POSITIVE SCAN DIRECTION'''
             if self.dE > 0:      # activates in cases where the step size is positive
-                for iy in range(0, self.ns):        # loops through the number of scans
-                    if iy == 0:        # for the first scan
-                        self.i = np.append(self.i, self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.udp]) / (self.Ru * self.Cd))))        # appends the current from the positive scan direction portion of the upper partial potential window to the current array
-                        self.i = np.append(self.i, -self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))        # appends the current from the negative scan direction portion of the potential window to the current array
-                    else:       # for all subsequent scans
-                        self.i = np.append(self.i, self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))     # appends the current from the positive scan direction portion of the potential window to the current array
-                        self.i = np.append(self.i, -self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))        # appends the current from the negative scan direction portion of the potential window to the current array
-                self.i = np.append(self.i, self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.ldp]) / (self.Ru * self.Cd))))        # appends the current from the final positive scan direction portion of the lower partial potential window to the current array
+                self.Assemble([self.iupp, self.iminus], [self.iplus, self.iminus], self.ns - 1, [self.ilow])        # the first scan starts with the upper partial potential window, and the final scan ends with the lower partial potential window
             '''NEGATIVE SCAN DIRECTION'''
             if self.dE < 0:      # activates in cases where the step size is negative
-                for iy in range(0, self.ns):        # loops through the number of scans
-                    if iy == 0:        # for the first scan
-                        self.i = np.append(self.i, -self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.ldp]) / (self.Ru * self.Cd))))       # appends the current from the negative scan direction portion of the lower partial potential window to the current array
-                        self.i = np.append(self.i, self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))     # appends the current from the positive scan direction portion of the potential window to the current array
-                    else:       # for all subsequent scans
-                        self.i = np.append(self.i, -self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))         # appends the current from the negative scan direction portion of the potential window to the current array
-                        self.i = np.append(self.i, self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.dp]) / (self.Ru * self.Cd))))     # appends the current from the positive scan direction portion of the potential window to the current array
-                self.i = np.append(self.i, -self.sr * self.Cd * (1 - np.exp((-self.shape.t[:self.shape.udp]) / (self.Ru * self.Cd))))       # appends the current from the final negative scan direction portion of the upper partial potential window to the current array
+                self.Assemble([-self.ilow, self.iplus], [self.iminus, self.iplus], self.ns - 1, [-self.iupp])       # the first scan starts with the lower partial potential window, and the final scan ends with the upper partial potential window
 
 
     def staircase(self):
@@ -162,101 +154,69 @@ class Capacitance:
         Uses equation 1.6.17 from the 3rd edition of Electrochemical Methods:\n
         i = (dE/Ru)*np.exp(-t/(Ru*Cd))'''   
         
-        self.i = np.array([0])      # creates a current array containing the initial current value at rest potential (0)
-        
-        self.iplus = np.zeros(self.shape.dp)        # creates an empty array to hold current from the positive scan direction portion of the potential window
-        self.iminus = np.zeros(self.shape.dp)        # creates an empty array to hold current from the negative scan direction portion of the potential window        
-        self.iupp = np.zeros(self.shape.udp)        # creates an empty array to hold current from the upper partial potential window
-        self.ilow = np.zeros(self.shape.ldp)        # creates an empty array to hold current from the lower partial potential window  
+        '''KERNELS'''
+        self.iplus = self.Transient(np.abs(self.dE), self.shape.dp, self.shape.steps)       # calculates the current from the positive scan direction portion of the potential window once, since it is the same in every scan
+        self.iminus = -self.iplus       # current from the negative scan direction portion of the potential window
+        self.iupp = self.Transient(self.dE, self.shape.udp, self.shape.usteps)      # calculates the current from the upper partial potential window
+        self.ilow = self.Transient(self.dE, self.shape.ldp, self.shape.lsteps)      # calculates the current from the lower partial potential window
 
         '''STARTING FROM LOWER VERTEX POTENTIAL'''
         if self.Eini == self.Elow:      # activates in cases where the initial potential is equal to the lower vertex potential
-            for ix in range(0, self.ns):        # loops through the number of scans
-                for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                    space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                    self.iplus[space:] = np.add(self.iplus[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))      # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                    space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                    self.iminus[space:] = np.add(self.iminus[space:], (-self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))       # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                self.i = np.append(self.i, self.iplus)      # appends the current from the positive scan direction portion of the potential window to the current array
-                self.iplus = np.zeros(self.shape.dp)        # empties the array to hold current from the positive scan direction portion of the potential window
-                self.i = np.append(self.i, self.iminus)     # appends the current from the negative scan direction portion of the potential window to the current array
-                self.iminus = np.zeros(self.shape.dp)       # empties the array to hold current from the negative scan direction portion of the potential window
+            self.Assemble([], [self.iplus, self.iminus], self.ns, [])       # every scan is a positive then a negative scan direction portion of the potential window
         
         '''STARTING FROM UPPER VERTEX POTENTIAL'''
         if self.Eini == self.Eupp:      # activates in cases where the initial potential is equal to the upper vertex potential
-            for ix in range(0, self.ns):        # loops through the number of scans
-                for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                    space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                    self.iminus[space:] = np.add(self.iminus[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))        # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                    space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                    self.iplus[space:] = np.add(self.iplus[space:], (-self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))     # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                self.i = np.append(self.i, self.iminus)     # appends the current from the negative scan direction portion of the potential window to the current array
-                self.iminus = np.zeros(self.shape.dp)        # empties the array to hold current from the negative scan direction portion of the potential window
-                self.i = np.append(self.i, self.iplus)      # appends the current from the positive scan direction portion of the potential window to the current array
-                self.iplus = np.zeros(self.shape.dp)        # empties the array to hold current from the positive scan direction portion of the potential window 
+            self.Assemble([], [self.iminus, self.iplus], self.ns, [])       # every scan is a negative then a positive scan direction portion of the potential window
 
         '''STARTING IN BETWEEN VERTEX POTENTIALS'''
         if self.Elow < self.Eini < self.Eupp:       # activates in cases where the initial potential is in between the lower vertex potential and the upper vertex potential
             
             '''POSITIVE SCAN DIRECTION'''
             if self.dE > 0:      # activates in cases where the step size is positive
-                for ix in range(0, self.ns):        # loops through the number of scans
-                    if ix == 0:       # for the first scan
-                        for iy in range(0, self.shape.usteps):      # loops through the number of steps in a upper partial potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.iupp[space:] = np.add(self.iupp[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.udp - space]) / (self.Ru * self.Cd)))       # calculates current from this step for the remainder of the upper partial potential window and buffers the start with a blank array
-                        for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.iminus[space:] = np.add(self.iminus[space:], (-self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))       # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                        self.i = np.append(self.i, self.iupp)       # appends the current from the positive scan direction portion of the upper partial potential window to the current array
-                        self.i = np.append(self.i, self.iminus)     # appends the current from the negative scan direction portion of the potential window to the current array
-                        self.iminus = np.zeros(self.shape.dp)       # empties the array to hold current from the negative scan direction portion of the potential window
-                    else:       # for all subsequent scans
-                        for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.iplus[space:] = np.add(self.iplus[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))      # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                        for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.iminus[space:] = np.add(self.iminus[space:], (-self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))       # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                        self.i = np.append(self.i, self.iplus)      # appends the current from the positive scan direction portion of the potential window to the current array
-                        self.iplus = np.zeros(self.shape.dp)        # empties the array to hold current from the positive scan direction portion of the potential window
-                        self.i = np.append(self.i, self.iminus)     # appends the current from the negative scan direction portion of the potential window to the current array
-                        self.iminus = np.zeros( self.shape.dp)        # empties the array to hold current from the negative scan direction portion of the potential window
-                for iz in range(0, self.shape.lsteps):      # loops through the number of steps in a lower partial potential window
-                    space = int(iz * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                    self.ilow[space:] = np.add(self.ilow[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.ldp - space]) / (self.Ru * self.Cd)))       # calculates current from this step for the remainder of the lower partial potential window and buffers the start with a blank array   
-                self.i = np.append(self.i, self.ilow)       # appends the current from the final positive scan direction portion of the lower partial potential window to the current array
+                self.Assemble([self.iupp, self.iminus], [self.iplus, self.iminus], self.ns - 1, [self.ilow])        # the first scan starts with the upper partial potential window, and the final scan ends with the lower partial potential window
             
             '''NEGATIVE SCAN DIRECTION'''
             if self.dE < 0:      # activates in cases where the step size is positive
-                for ix in range(0, self.ns):        # loops through the number of scans
-                    if ix == 0:       # for the first scan
-                        for iy in range(0, self.shape.lsteps):      # loops through the number of steps in a lower partial potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.ilow[space:] = np.add(self.ilow[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.ldp - space]) / (self.Ru * self.Cd)))       # calculates current from this step for the remainder of the lower partial potential window and buffers the start with a blank array
-                        for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.iplus[space:] = np.add(self.iplus[space:], (-self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))     # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                        self.i = np.append(self.i, self.ilow)       # appends the current from the negative scan direction portion of the lower partial potential window to the current array
-                        self.i = np.append(self.i, self.iplus)      # appends the current from the positive scan direction portion of the potential window to the current array
-                        self.iplus = np.zeros(self.shape.dp)        # empties the array to hold current from the positive scan direction portion of the potential window
-                    else:       # for all subsequent scans
-                        for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.iminus[space:] = np.add(self.iminus[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))        # calculates current from this step for the remainder of the potential window and buffers the start with a blank array
-                        for iy in range(0, self.shape.steps):       # loops through the number of steps in the potential window
-                            space = int(iy * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                            self.iplus[space:] = np.add(self.iplus[space:], (-self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.dp - space]) / (self.Ru * self.Cd)))     # calculates current from this step for the remainder of the potential window and buffers the start with a blank array   
-                        self.i = np.append(self.i, self.iminus)     # appends the current from the negative scan direction portion of the potential window to the current array
-                        self.iminus = np.zeros(self.shape.dp)       # empties the array to hold current from the negative scan direction portion of the potential window
-                        self.i = np.append(self.i, self.iplus)      # appends the current from the positive scan direction portion of the potential window to the current array
-                        self.iplus = np.zeros(self.shape.dp)        # empties the array to hold current from the postive scan direction portion of the potential window
-                for iz in range(0, self.shape.usteps):      # loops through the number of steps in a upper partial potential window
-                    space = int(iz * self.shape.interval)       # calulates the number of sampling points in the steps for which current has already been calculated
-                    self.iupp[space:] = np.add(self.iupp[space:], (self.dE/self.Ru) * np.exp((-self.shape.t[:self.shape.udp - space]) / (self.Ru * self.Cd)))       # calculates current from this step for the remainder of the upper partial potential window and buffers the start with a blank array 
-                self.i = np.append(self.i, self.iupp)       # appends the current from the final negative scan direction portion of the upper partial potential window to the current array
+                self.Assemble([self.ilow, self.iplus], [self.iminus, self.iplus], self.ns - 1, [self.iupp])     # the first scan starts with the lower partial potential window, and the final scan ends with the upper partial potential window
+
+
+    def Assemble(self, first, scan, repeats, last):
+        '''Fills a single preallocated current array with the initial current value at rest potential (0), followed by the first portions, \n
+        then the portions of a full scan repeated the given number of times, and finally the last portions'''
+
+        scan = np.concatenate(scan, axis = -1)      # joins the portions of a full scan together
+        self.i = np.zeros(scan.shape[:-1] + (1 + sum(ix.shape[-1] for ix in first) + repeats * scan.shape[-1] + sum(ix.shape[-1] for ix in last),))     # creates a current array large enough to hold every portion, starting with the initial current value at rest potential (0)
+        
+        position = 1        # position where the next portion starts
+        for ix in first:        # loops through the first portions
+            self.i[..., position : position + ix.shape[-1]] = ix      # and copies each one into the current array
+            position += ix.shape[-1]
+        for ix in range(0, repeats):        # loops through the repeated scans
+            self.i[..., position : position + scan.shape[-1]] = scan        # and copies the full scan into the current array
+            position += scan.shape[-1]
+        for ix in last:     # loops through the last portions
+            self.i[..., position : position + ix.shape[-1]] = ix      # and copies each one into the current array
+            position += ix.shape[-1]
+
+
+    def Transient(self, height, points, steps):
+        '''Returns the current for one portion of a staircase, made up of a number of steps of the given height spread over the given number of points \n
+        Since the RC response is a first order linear system, the current at the start of each step is the current at the start of the previous \n
+        step multiplied by the decay over one interval, plus the current from the new step. This recursion runs once per step, and the decay \n
+        within a step is then applied to every step at once, giving the same result as adding up a full exponential for every step'''
+
+        rows = -(-points // self.shape.interval)        # number of steps (including any partial step at the end) covered by the portion
+        decay = np.exp((-np.asarray(self.time[:self.shape.interval])) / (self.Ru * self.Cd))       # decay of a single transient over one interval
+        ratio = np.exp((-self.shape.interval * self.shape.dt) / (self.Ru * self.Cd))        # decay of a single transient from the start of one step to the start of the next
+        
+        carried = np.zeros(np.shape(ratio)[:-1] + (rows, 1))       # creates an array to hold the sum of all decaying transients at the start of each step (for every set of parameters)
+        total = 0.0     # sum of all decaying transients at the start of the current step
+        for ix in range(0, rows):       # loops through the steps in the portion
+            total = total * ratio + (1.0 if ix < steps else 0.0)        # decays the previous transients by one interval and adds the transient from the new step (unless the portion has run out of steps)
+            carried[..., ix, :] = total
+        
+        current = np.asarray(height / self.Ru)[..., None] * carried * decay[..., None, :]       # applies the decay within each step to every step at once
+        return np.reshape(current, current.shape[:-2] + (-1,))[..., :points]      # and cuts the result to the size of the portion
 
     
     def output(self):
@@ -267,6 +227,140 @@ class Capacitance:
 
 
 
+class Sweep(Capacitance):
+
+    '''Creates basic simulations of capacitive charging for many sets of parameters at once, all sharing the same imported potential waveform \n
+    
+    Requires: \n
+    shape - an instance of one of the potential waveform classes from the waveforms.py file \n
+    Cd - an array of double layer capacitances (in F) \n
+    Ru - an array of uncompensated resistances (in Ω), which is broadcast against Cd (e.g. use Cd[:, None] and Ru[None, :] for a full grid) \n
+    memory - the approximate memory (in bytes) used to simulate each chunk of parameters \n
+    workers - the number of processes used to simulate chunks of parameters in parallel (None simulates every chunk in this process)'''
+
+    worker = None       # sweep used by each process in the process pool
+
+    def __init__(self, shape, Cd, Ru, memory = 268435456, workers = None):
+
+        '''PARAMETER INITIALISATION'''
+        self.label  = 'simulated'       # label for file naming and for use in operations.py
+
+        self.shape = shape      # potential waveform object generated by waveforms.py
+        self.Eini = shape.Eini  # initial potential (in V)
+        self.Eupp = shape.Eupp      # upper vertex potential (in V)
+        self.Elow = shape.Elow      # lower vertex potential (in V)
+        self.dE = shape.dE      # step size (in V)
+        self.sr = shape.sr      # scan rate (in V/s)
+        self.ns = shape.ns      # number of scans
+        self.osf = shape.osf        # oscilloscope sampling frequency (in Sa/s)
+
+        self.memory = memory        # approximate memory used for each chunk of parameters (in bytes)
+        self.workers = workers      # number of processes used to simulate chunks of parameters in parallel
+
+        '''DATATYPE ERRORS'''
+        try:
+            self.Cds, self.Rus = np.broadcast_arrays(np.asarray(Cd, dtype = float), np.asarray(Ru, dtype = float))     # pairs up every double layer capacitance with its uncompensated resistance
+        except (TypeError, ValueError):     # checks that the given parameters are numerical arrays which can be broadcast together
+            print('\n' + 'An invalid datatype was used for the double layer capacitances or uncompensated resistances. Enter arrays of float values which can be broadcast together.' + '\n')
+            sys.exit()
+        if isinstance(self.memory, (int)) is False:     # checks that the given memory is an integer value
+            print('\n' + 'An invalid datatype was used for the memory. Enter an integer value corresponding to a number of bytes.' + '\n')
+            sys.exit()
+        if isinstance(self.workers, (int, type(None))) is False:        # checks that the given number of workers is an integer value or None
+            print('\n' + 'An invalid datatype was used for the number of workers. Enter an integer value or None.' + '\n')
+            sys.exit()
+
+        '''DATA VALUE ERRORS'''
+        if np.any(self.Cds <= 0):     # checks that every given double layer capacitance is greater than 0
+            print('\n' + 'Double layer capacitances must be positive non-zero values' + '\n')
+            sys.exit()
+        if np.any(self.Rus <= 0):     # checks that every given uncompensated resistance is greater than 0
+            print('\n' + 'Uncompensated resistances must be positive non-zero values' + '\n')
+            sys.exit()
+        if self.memory <= 0:        # checks that the given memory is greater than 0
+            print('\n' + 'Memory must be a positive non-zero value' + '\n')
+            sys.exit()
+        if self.workers != None and self.workers <= 0:       # checks that the given number of workers is greater than 0
+            print('\n' + 'Number of workers must be a positive non-zero value or None' + '\n')
+            sys.exit()
+
+        '''PARAMETER DEFINITIONS'''
+        self.grid = self.Cds.shape        # shape of the broadcast parameters
+        self.Cds = np.ravel(self.Cds)       # flattens the double layer capacitances into one set per row of the results
+        self.Rus = np.ravel(self.Rus)       # flattens the uncompensated resistances into one set per row of the results
+        self.time = np.asarray(self.shape.t[:max(self.shape.dp, self.shape.udp, self.shape.ldp, self.shape.interval)])     # calculates the time base shared by every simulation once
+        self.chunk = max(1, self.memory // (32 * self.shape.t.size))       # number of sets of parameters simulated at once, allowing for the temporary arrays used during a simulation
+        chunks = [slice(ix, ix + self.chunk) for ix in range(0, self.Cds.size, self.chunk)]       # sets of parameters simulated in each chunk
+
+        '''SIMULATIONS'''
+        self.i = None       # two-dimensional current array with one row for each set of parameters, created once the size of a simulation is known
+        if self.workers == None:        # activates in cases where every chunk is simulated in this process
+            results = (self.Chunk(self.Cds[ix], self.Rus[ix]) for ix in chunks)
+            self.Collect(chunks, results)
+        else:       # activates in cases where chunks are simulated in a process pool, which receives the waveform parameters and time base only once per process
+            with ProcessPoolExecutor(max_workers = self.workers, initializer = Sweep.Initialise, initargs = (self.Parameters(),)) as pool:
+                results = pool.map(Sweep.Simulate, [self.Cds[ix] for ix in chunks], [self.Rus[ix] for ix in chunks])
+                self.Collect(chunks, results)
+        
+        self.Cd = self.Cds      # double layer capacitance (in F) of each row of the results
+        self.Ru = self.Rus      # uncompensated resistance (in Ω) of each row of the results
+
+
+    def Chunk(self, Cd, Ru):
+        '''Simulates a chunk of parameters at once, broadcasting them against the shared time base'''
+
+        self.Cd = Cd[:, None]      # double layer capacitances (in F) as a column
+        self.Ru = Ru[:, None]      # uncompensated resistances (in Ω) as a column
+        if self.shape.type == 'linear':     # activates in cases where simulations are performed using a linear waveform
+            self.linear()
+        if self.shape.type == 'staircase':      # activates in cases where simulations are performed using a staircase waveform
+            self.staircase() 
+        return self.i
+
+
+    def Collect(self, chunks, results):
+        '''Copies the simulated chunks into a single preallocated current array'''
+
+        current = None      # current array being filled with the results of each chunk
+        for ix, iy in zip(chunks, results):     # loops through the chunks as they are simulated
+            if current is None:     # the size of a simulation is only known once the first chunk has been simulated
+                current = np.empty((self.Cds.size, iy.shape[-1]))     # creates a current array with one row for each set of parameters
+            current[ix] = iy        # copies the chunk into the current array
+        self.i = current if current is not None else np.zeros((0, 0))        # keeps the current array once every chunk has been copied
+
+
+    def Parameters(self):
+        '''Returns the waveform parameters and materialised time base used by Chunk, which (unlike the potential waveform object, whose \n
+        lazy arrays hold functions) can be pickled and sent to the processes of the process pool however they are started'''
+
+        shape = types.SimpleNamespace(**{name: getattr(self.shape, name) for name in ('type', 'dp', 'udp', 'ldp', 'interval', 'steps', 'usteps', 'lsteps', 'dt')})      # waveform sizes used to simulate a chunk
+        return dict(shape = shape, time = self.time, Eini = self.Eini, Eupp = self.Eupp, Elow = self.Elow, dE = self.dE, sr = self.sr, ns = self.ns)
+
+
+    @staticmethod
+    def Initialise(parameters):
+        '''Keeps a sweep made from the given parameters in each process of the process pool'''
+
+        worker = Sweep.__new__(Sweep)       # sweep without any parameter arrays, which only simulates the chunks it is given
+        worker.__dict__.update(parameters)
+        Sweep.worker = worker
+
+
+    @staticmethod
+    def Simulate(Cd, Ru):
+        '''Simulates a chunk of parameters in a process of the process pool'''
+
+        return Sweep.worker.Chunk(Cd, Ru)
+
+
+    def output(self):
+        '''Returns the simulated data for checking or analysis purposes, with one current column for each set of parameters'''
+
+        zipped = zip(self.shape.t, self.shape.E, *self.i)      # zipped array containing simulation data
+        return zipped
+
+
+
 """
 ===================================================================================================
 RUNNING SIMULATIONS FROM MAIN
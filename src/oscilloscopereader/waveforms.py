@@ -77,6 +77,12 @@ when using an oscilloscope). If the value of osf is changed to None, then only o
 two in the case of CyclicStaircaseVoltammetry) will be generated, giving you the simplest possible
 waveform.
 
+Alternatively, both waveform classes can be created with lazy = True. In this case, the index, time,
+and potential arrays are instances of the Analytic class, which calculates values from the waveform
+parameters only for the positions that are actually used (e.g. every step-th point in a moving
+average, or the peak positions in current sampling). Slicing an Analytic array does not calculate
+anything, whilst converting it with np.asarray calculates the whole array.
+
 ===================================================================================================
 '''
 
@@ -88,12 +94,80 @@ import numpy as np
 from errno import EEXIST
 
 
+class Analytic(np.lib.mixins.NDArrayOperatorsMixin):
+
+    '''Stands in for a waveform array without storing it, calculating only the elements which are asked for \n
+    Supports slicing (which returns another Analytic array), integer and Boolean indexing, iteration, arithmetic, and conversion into a full numpy array \n
+
+    Requires: \n
+    function - a function which takes an array of positions and returns the waveform values at those positions \n
+    size - the number of points in the waveform \n
+    dtype - the datatype of the waveform values'''
+
+    def __init__(self, function, size, dtype = np.float64):
+
+        '''PARAMETER INITIALISATION'''
+        self.function = function        # function which calculates the waveform values at an array of positions
+        self.size = int(size)       # number of points in the waveform
+        self.dtype = np.dtype(dtype)        # datatype of the waveform values
+        self.shape = (self.size,)       # shape of the equivalent numpy array
+        self.ndim = 1       # number of dimensions of the equivalent numpy array
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __getitem__(self, key):
+        '''Calculates the requested elements, or returns another Analytic array for slices'''
+
+        if isinstance(key, slice):      # slices remain unevaluated, in the same way that they are views of a numpy array
+            start, stop, step = key.indices(self.size)      # converts the slice into positions within this waveform
+            function = self.function        # function of this waveform, held by the new waveform
+            return Analytic(lambda positions: function(start + step * positions), len(range(start, stop, step)), self.dtype)
+        
+        positions = np.asarray(key)     # converts integer and Boolean indices into an array
+        if positions.dtype == bool:     # Boolean masks select the positions where they are True
+            if positions.shape != self.shape:
+                raise IndexError(f'boolean index has shape {positions.shape} but the waveform has shape {self.shape}')
+            positions = np.flatnonzero(positions)
+        if positions.size > 0 and (np.amin(positions) < -self.size or np.amax(positions) >= self.size):      # checks that every position is inside the waveform
+            raise IndexError(f'index out of bounds for a waveform of size {self.size}')
+        values = np.asarray(self.function(positions % self.size), dtype = self.dtype)        # calculates the waveform at the requested positions, allowing negative positions
+        return values[()] if positions.ndim == 0 else values        # returns a single value for a single integer index
+
+
+    def __iter__(self):
+        for ix in range(0, self.size, 65536):       # calculates the waveform in blocks so that iterating never holds the whole waveform
+            yield from self.function(np.arange(ix, min(ix + 65536, self.size)))
+
+
+    def __array__(self, dtype = None, copy = None):
+        values = np.asarray(self.function(np.arange(0, self.size)), dtype = self.dtype)     # calculates the whole waveform
+        return values if dtype is None else values.astype(dtype)
+
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = tuple(np.asarray(ix) if isinstance(ix, Analytic) else ix for ix in inputs)     # calculates any Analytic arrays used in arithmetic
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+
+    def rotate(self, shift):
+        '''Returns the equivalent of np.concatenate((E[shift:], E[:shift])) without calculating the waveform'''
+
+        start = slice(shift, None).indices(self.size)[0]        # converts the shift into a position within this waveform
+        function = self.function        # function of this waveform, held by the new waveform
+        size = self.size        # size of this waveform, held by the new waveform
+        return Analytic(lambda positions: function((positions + start) % size), self.size, self.dtype)
+
+
+
 class Waveform:
 
     '''Parent class for cyclic voltammetry waveforms \n
     Contains the parameter initialisation, error management, parameter calculations, and output function used by all child classes'''
 
-    def __init__(self, Eini, Eupp, Elow, dE, sr, ns, osf):
+    def __init__(self, Eini, Eupp, Elow, dE, sr, ns, osf, lazy = False):
 
         '''PARAMETER INITIALISATION'''
         self.Eini = Eini        # initial potential (in V)
@@ -103,6 +177,7 @@ class Waveform:
         self.sr = sr        # scan rate (in V/s)
         self.ns = ns        # number of scans
         self.osf = osf      # oscilloscope sampling frequency (in Sa/s)
+        self.lazy = lazy        # boolean value which decides if the waveform arrays are calculated only when they are used
         
         '''DATATYPE ERRORS'''
         if isinstance(self.Eini, (float, int)) is False:        # checks that the given initial potential is a float or an integer value
@@ -126,6 +201,9 @@ class Waveform:
         if isinstance(self.osf, (int, type(None))) is False:        # checks that the given oscilloscope sampling frequency is an integer value or None
             print('\n' + 'An invalid datatype was used for the oscilloscope sampling rate. Enter an integer value or None.' + '\n')
             sys.exit()
+        if isinstance(self.lazy, (bool)) is False:      # checks that the given lazy option is a Boolean value
+            print('\n' + 'An invalid datatype was used for the lazy option. Enter a Boolean value.' + '\n')
+            sys.exit()
 
         '''DATA VALUE ERRORS'''
         if self.Eupp == self.Elow:      # checks that the potential window is greater than 0
@@ -201,36 +279,31 @@ class CyclicLinearVoltammetry(Waveform):
     dE - step size (in V) \n
     sr - scan rate (in V/s) \n
     ns - number of scans \n
-    osf - oscilloscope sampling frequency (in Sa/s)
+    osf - oscilloscope sampling frequency (in Sa/s) \n
+    lazy - a True or False option for whether the index, time, and potential arrays are calculated only when they are used
     '''
     
-    def __init__(self, Eini, Eupp, Elow, dE, sr, ns, osf):
-        super().__init__(Eini, Eupp, Elow, dE, sr, ns, osf)     # adopts parameters from the Waveform parent class
+    def __init__(self, Eini, Eupp, Elow, dE, sr, ns, osf, lazy = False):
+        super().__init__(Eini, Eupp, Elow, dE, sr, ns, osf, lazy)     # adopts parameters from the Waveform parent class
         
         '''LABELS'''
         self.type = 'linear'        # label for use in simulations.py
         self.label = 'CV'       # label for file naming
 
-        '''INDEX'''
-        self.index = np.arange(0, round((self.tmax + self.dt) / self.dt), 1)        # produces a rounded indexing array which starts from 0
-        
-        '''TIME'''
-        self.t = np.round(self.index * self.dt, 9)      # converts the indexing array into a time array (rounded to 9 d.p)
-
         '''POTENTIAL'''
-        self.E = np.array([self.Eini])      # creates a potential array containing the initial potential
+        self.segments = []      # creates an empty list to hold the start potential, end potential, and number of points of each linear portion of the potential waveform (following the initial potential)
         
         '''STARTING FROM LOWER VERTEX POTENTIAL''' 
         if self.Eini == self.Elow:      # activates in cases where the initial potential is equal to the lower vertex potential                 
             for ix in range(0, self.ns):        # loops through the number of scans
-                self.E = np.append(self.E, np.round(np.linspace(self.Eini + (self.window / self.dp), self.Eupp, self.dp, endpoint = True), 9))      # adds the positive scan direction portion of the potential window to the potential array (rounded to 9 d.p)
-                self.E = np.append(self.E, np.round(np.linspace(self.Eupp - (self.window / self.dp), self.Eini, self.dp, endpoint = True), 9))      # adds the negtive scan direction portion of the potential window to the potential array (rounded to 9 d.p)
+                self.segments.append((self.Eini + (self.window / self.dp), self.Eupp, self.dp))      # adds the positive scan direction portion of the potential window to the list of linear portions
+                self.segments.append((self.Eupp - (self.window / self.dp), self.Eini, self.dp))      # adds the negtive scan direction portion of the potential window to the list of linear portions
 
         '''STARTING FROM UPPER VERTEX POTENTIAL'''
         if self.Eini == self.Eupp:      # activates in cases where the initial potential is equal to the upper vertex potential      
             for ix in range(0, self.ns):        # loops through the number of scans
-                self.E = np.append(self.E, np.round(np.linspace(self.Eini + (self.window / self.dp), self.Elow, self.dp, endpoint = True), 9))      # adds the negative scan direction portion of the potential window to the potential array (rounded to 9 d.p)
-                self.E = np.append(self.E, np.round(np.linspace(self.Elow - (self.window / self.dp), self.Eini, self.dp, endpoint = True), 9))      # adds the positive scan direction portion of the potential window to the potential array (rounded to 9 d.p)
+                self.segments.append((self.Eini + (self.window / self.dp), self.Elow, self.dp))      # adds the negative scan direction portion of the potential window to the list of linear portions
+                self.segments.append((self.Elow - (self.window / self.dp), self.Eini, self.dp))      # adds the positive scan direction portion of the potential window to the list of linear portions
 
         '''STARTING IN BETWEEN VERTEX POTENTIALS'''
         if self.Elow < self.Eini < self.Eupp:       # activates in cases where the initial potential is between the lower vertex potential and the upper vertex potential  
@@ -238,22 +311,54 @@ class CyclicLinearVoltammetry(Waveform):
             '''POSITIVE SCAN DIRECTION'''
             if self.dE > 0:     # activates in cases where the step potential is postive
                 for ix in range(0, self.ns):        # loops through the number of scans
-                    self.E = np.append(self.E, np.round(np.linspace(self.Eini + (self.window / self.dp), self.Eupp, self.udp, endpoint = True), 9))     # adds the postive scan direction portion of the upper partial potential window to the potential array (rounded to 9 d.p)
-                    self.E = np.append(self.E, np.round(np.linspace(self.Eupp - (self.window / self.dp), self.Elow, self.dp, endpoint = True), 9))      # adds the negative scan direction portion of the potential window to the potential array (rounded to 9 d.p)
-                    self.E = np.append(self.E, np.round(np.linspace(self.Elow + (self.window / self.dp), self.Eini, self.ldp, endpoint = True), 9))     # adds the positive scan direction portion of the lower partial potential window to the potential array (rounded to 9 d.p)
+                    self.segments.append((self.Eini + (self.window / self.dp), self.Eupp, self.udp))     # adds the postive scan direction portion of the upper partial potential window to the list of linear portions
+                    self.segments.append((self.Eupp - (self.window / self.dp), self.Elow, self.dp))      # adds the negative scan direction portion of the potential window to the list of linear portions
+                    self.segments.append((self.Elow + (self.window / self.dp), self.Eini, self.ldp))     # adds the positive scan direction portion of the lower partial potential window to the list of linear portions
             
             '''NEGATIVE SCAN DIRECTION'''
             if self.dE < 0:     # activates in cases where the step potential is negative
                 for ix in range(0, self.ns):        # loops through the number of scans
-                    self.E = np.append(self.E, np.round(np.linspace(self.Eini - (self.window / self.dp), self.Elow, self.ldp, endpoint = True), 9))     # adds the negative scan direction portion of the lower partial potential window to the potential array (rounded to 9 d.p)
-                    self.E = np.append(self.E, np.round(np.linspace(self.Elow + (self.window / self.dp), self.Eupp, self.dp, endpoint = True), 9))      # adds the positrive scan direction portion of the potential window to the potential array (rounded to 9 d.p)
-                    self.E = np.append(self.E, np.round(np.linspace(self.Eupp + (self.window / self.dp), self.Eini, self.udp, endpoint = True), 9))     # adds the negative scan direction portion of the upper partial potential window to the potential array (rounded to 9 d.p)
+                    self.segments.append((self.Eini - (self.window / self.dp), self.Elow, self.ldp))     # adds the negative scan direction portion of the lower partial potential window to the list of linear portions
+                    self.segments.append((self.Elow + (self.window / self.dp), self.Eupp, self.dp))      # adds the positrive scan direction portion of the potential window to the list of linear portions
+                    self.segments.append((self.Eupp + (self.window / self.dp), self.Eini, self.udp))     # adds the negative scan direction portion of the upper partial potential window to the list of linear portions
         
+        self.segments = np.reshape(np.array(self.segments, dtype = float), (-1, 3))      # converts the list of linear portions into an array
+        self.bounds = np.concatenate(([1], 1 + np.cumsum(self.segments[:, 2].astype(np.int64))))      # position of the first point of each linear portion, followed by the size of the potential waveform
+
+        if self.lazy == False:      # activates in cases where the waveform arrays are generated straight away
+            self.index = np.arange(0, round((self.tmax + self.dt) / self.dt), 1)        # produces a rounded indexing array which starts from 0
+            self.t = self.Time(self.index)      # converts the indexing array into a time array (rounded to 9 d.p)
+            self.E = self.Potential(np.arange(0, self.bounds[-1]))      # produces the potential array from the linear portions
+        else:       # activates in cases where the waveform arrays are only calculated when they are used
+            self.index = Analytic(lambda positions: positions, round((self.tmax + self.dt) / self.dt), np.int64)        # indexing array which starts from 0
+            self.t = Analytic(self.Time, self.index.size)       # time array (rounded to 9 d.p)
+            self.E = Analytic(self.Potential, self.bounds[-1])      # potential array
+
         self.indexWF = self.index       # exported indexing array
         self.tWF = self.t       # exported time array
         self.EWF = self.E       # exported potential array
 
 
+    def Time(self, positions):
+        '''Calculates the time (rounded to 9 d.p) at the given positions of the waveform'''
+
+        return np.round(np.asarray(positions) * self.dt, 9)
+
+
+    def Potential(self, positions):
+        '''Calculates the potential at the given positions of the linear waveform, giving exactly the same values as \n
+        np.round(np.linspace(start, end, points, endpoint = True), 9) would for each linear portion'''
+
+        positions = np.asarray(positions)       # converts the positions into an array
+        portion = np.searchsorted(self.bounds, positions, side = 'right') - 1       # finds the linear portion containing each position (-1 for the initial potential)
+        start, end, points = np.moveaxis(self.segments[np.maximum(portion, 0)], -1, 0)      # start potential, end potential, and number of points of the linear portion containing each position
+        local = positions - self.bounds[np.maximum(portion, 0)]        # position within each linear portion
+        step = (end - start) / np.maximum(points - 1, 1)        # potential step within each linear portion
+        E = np.round(np.where((local == points - 1) & (points > 1), end, local * step + start), 9)      # potential at each position, finishing exactly on the end potential of each linear portion
+        return np.where(portion < 0, self.Eini, E)      # the first position holds the initial potential
+
+
+
       
 class CyclicStaircaseVoltammetry(CyclicLinearVoltammetry):
 
@@ -265,65 +370,73 @@ class CyclicStaircaseVoltammetry(CyclicLinearVoltammetry):
     dE - the step size (in V) \n
     sr - the scan rate (in V/s) \n
     ns - the number of scans \n
-    osf - the oscilloscope sampling frequency (in Sa/s)
+    osf - the oscilloscope sampling frequency (in Sa/s) \n
+    lazy - a True or False option for whether the index, time, and potential arrays are calculated only when they are used
     '''
 
-    def __init__(self, Eini, Eupp, Elow, dE, sr, ns, osf):
-        super().__init__(Eini, Eupp, Elow, dE, sr, ns, osf)     # adopts parameters from the CyclicLinearVoltammetry class
+    def __init__(self, Eini, Eupp, Elow, dE, sr, ns, osf, lazy = False):
+        super().__init__(Eini, Eupp, Elow, dE, sr, ns, osf, lazy)     # adopts parameters from the CyclicLinearVoltammetry class
 
         '''LABELS'''
         self.type = 'staircase'     # label for use in simulations.py
         self.label = 'CSV'      # label for file naming
                       
-        '''INDEX'''
-        self.indexWF = np.arange(0, round((self.tmax + (self.dE/self.sr)) / self.dt) + (2 * self.ns * self.steps + 1), 1)     # produces a rounded indexing array which accounts for the additional step at the end of the waveform and for staircase points equal to the total number of steps taken (plus one)
-        
-        '''TIME'''
-        self.tWF = np.array([])     # creates an empty time array
-        for ix in range(0, 2 * self.ns * self.steps + 1):       # loops through the total number of steps (plus one)
-            self.tWF = np.append(self.tWF, np.linspace(0, self.dt * self.interval, self.interval + 1) + ix * self.dt * self.interval)       # creates a temporary time array for a single step, then adds the step time for the current step and appends the result to the time array (the beginning of each temporary array overlaps with the end of the previous one, making a staircase time array)
-        
-        '''POTENTIAL'''
-        self.EWF = np.ones(self.interval + 1) * self.Eini       # creates an array containing as many elements as the interval sampling points (plus one), all equal to the initial potential
+        '''STEP POTENTIALS'''
+        self.levels = np.array([])       # creates an empty array to hold the potential of each step in a single scan
 
         '''STARTING FROM LOWER VERTEX POTENTIAL'''
         if self.Eini == self.Elow:      # activates in cases where the initial potential is equal to the lower vertex potential                   
-            for ix in range(0, self.ns):        # loops through the number of scans
-                for iy in np.round(np.linspace(self.Eini + self.dE, self.Eupp, self.steps, endpoint = True), 6):        # loops through the positive scan direction portion of the potential window (rounded to 6 d.p)
-                    self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # creates an array of each potential with as many elements as the interval sampling points (plus one) and adds it to the potential array
-                for iy in np.round(np.linspace(self.Eupp - self.dE, self.Eini, self.steps, endpoint = True), 6):        # loops through the negative scan direction portion of the potential window (rounded to 9 d.p)
-                    self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # creates an array of each potential with as many elements as the interval sampling points (plus one) and adds it to the potential array
+            self.levels = np.concatenate((np.round(np.linspace(self.Eini + self.dE, self.Eupp, self.steps, endpoint = True), 6),       # positive scan direction portion of the potential window (rounded to 6 d.p)
+                                          np.round(np.linspace(self.Eupp - self.dE, self.Eini, self.steps, endpoint = True), 6)))      # negative scan direction portion of the potential window (rounded to 6 d.p)
         
         '''STARTING FROM UPPER VERTEX POTENTIAL'''
         if self.Eini == self.Eupp:      # activates in cases where the initial potential is equal to the upper vertex potential   
-            for ix in range(0, self.ns):        # loops through the number of scans
-                for iy in np.round(np.linspace(self.Elow - self.dE, self.Eini, self.steps, endpoint = True), 6):        # loops through the negative scan direction portion of the potential window (rounded to 6 d.p)
-                    self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # creates an array of each potential with as many elements as the interval sampling points (plus one) and adds it to the potential array
-                for iy in np.round(np.linspace(self.Elow - self.dE, self.Eini, self.steps, endpoint = True), 6):       # loops through the positive scan direction portion of the potential window (rounded to 6 d.p)
-                    self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # creates an array of each potential with as many elements as the interval sampling points (plus one) and adds it to the potential array
+            self.levels = np.concatenate((np.round(np.linspace(self.Elow - self.dE, self.Eini, self.steps, endpoint = True), 6),       # negative scan direction portion of the potential window (rounded to 6 d.p)
+                                          np.round(np.linspace(self.Elow - self.dE, self.Eini, self.steps, endpoint = True), 6)))      # positive scan direction portion of the potential window (rounded to 6 d.p)
         
         '''STARTING IN BETWEEN VERTEX POTENTIALS'''
         if self.Elow < self.Eini < self.Eupp:       # activates in cases where the initial potential is between the lower vertex potential and the upper vertex potential        
             
             '''POSITIVE SCAN DIRECTION'''
             if self.dE > 0:     # activates in cases where the step potential is positive   
-                for ix in range(0, self.ns):        # loops through the number of scans
-                    for iy in np.round(np.linspace(self.Eini + self.dE, self.Eupp, self.usteps, endpoint = True), 6):       # loops through the positive scan direction portion of the upper partial potential window (rounded to 6 d.p)
-                        self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # creates an array of each potential with as many elements as the interval sampling points (plus one) and adds it to the potential array
-                    for iy in np.round(np.linspace(self.Eupp - self.dE, self.Elow, self.steps, endpoint = True), 6):        # loops through the negative scan direction portion of the potential window (rounded to 6 d.p)
-                        self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # creates an array of each potential with as many elements as the interval sampling points (plus one) and adds it to the potential array
-                    for iy in np.round(np.linspace(self.Elow + self.dE, self.Eini, self.lsteps, endpoint = True), 6):       # loops through the positive scan direction portion of the lower partial potential window (rounded to 6 d.p)
-                        self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # creates an array of each potential with as many elements as the interval sampling points (plus one) and adds it to the potential array
+                self.levels = np.concatenate((np.round(np.linspace(self.Eini + self.dE, self.Eupp, self.usteps, endpoint = True), 6),      # positive scan direction portion of the upper partial potential window (rounded to 6 d.p)
+                                              np.round(np.linspace(self.Eupp - self.dE, self.Elow, self.steps, endpoint = True), 6),       # negative scan direction portion of the potential window (rounded to 6 d.p)
+                                              np.round(np.linspace(self.Elow + self.dE, self.Eini, self.lsteps, endpoint = True), 6)))     # positive scan direction portion of the lower partial potential window (rounded to 6 d.p)
             
             '''NEGATIVE SCAN DIRECTION'''
             if self.dE < 0:     # activates in cases where the step potential is negative  
-                for ix in range(0, self.ns):        # loops through the number of scans
-                    for iy in np.round(np.linspace(self.Eini - self.dE, self.Elow, self.lsteps, endpoint = True), 6):       # loops through the negative scan direction portion of the lower partial potential window (rounded to 6 d.p)
-                        self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # adds the negative scan direction portion of the lower partial potential window to the potential array (rounded to 9 d.p)
-                    for iy in np.round(np.linspace(self.Elow + self.dE, self.Eupp, self.steps, endpoint = True), 6):        # loops through the positive scan direction portion of the potential window (rounded to 6 d.p)
-                        self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # adds the negative scan direction portion of the lower partial potential window to the potential array (rounded to 9 d.p)
-                    for iy in np.round(np.linspace(self.Eupp + self.dE, self.Eini, self.usteps, endpoint = True), 6):       # loops through the negative scan direction portion of the upper partial potential window (rounded to 6 d.p)
-                        self.EWF = np.append(self.EWF, np.ones(self.interval + 1) * iy)     # adds the negative scan direction portion of the lower partial potential window to the potential array (rounded to 9 d.p)
+                self.levels = np.concatenate((np.round(np.linspace(self.Eini - self.dE, self.Elow, self.lsteps, endpoint = True), 6),      # negative scan direction portion of the lower partial potential window (rounded to 6 d.p)
+                                              np.round(np.linspace(self.Elow + self.dE, self.Eupp, self.steps, endpoint = True), 6),       # positive scan direction portion of the potential window (rounded to 6 d.p)
+                                              np.round(np.linspace(self.Eupp + self.dE, self.Eini, self.usteps, endpoint = True), 6)))     # negative scan direction portion of the upper partial potential window (rounded to 6 d.p)
+
+        self.stairs = np.concatenate(([self.Eini], np.tile(self.levels, self.ns)))        # potential of the initial step and of every step in every scan
+        self.single = np.linspace(0, self.dt * self.interval, self.interval + 1)        # time array for a single step
+
+        if self.lazy == False:      # activates in cases where the waveform arrays are generated straight away
+
+            '''INDEX'''
+            self.indexWF = np.arange(0, round((self.tmax + (self.dE/self.sr)) / self.dt) + (2 * self.ns * self.steps + 1), 1)     # produces a rounded indexing array which accounts for the additional step at the end of the waveform and for staircase points equal to the total number of steps taken (plus one)
+        
+            '''TIME'''
+            self.tWF = np.empty((2 * self.ns * self.steps + 1, self.interval + 1))        # creates a time array with one row for each of the total number of steps (plus one)
+            np.add(self.single, (np.arange(0, 2 * self.ns * self.steps + 1) * self.dt * self.interval)[:, None], out = self.tWF)      # adds the step time for each step to the time array for a single step (the beginning of each row overlaps with the end of the previous one, making a staircase time array)
+            self.tWF = np.reshape(self.tWF, -1)     # joins the rows together into a single time array
+
+            '''POTENTIAL'''
+            self.EWF = np.repeat(self.stairs, self.interval + 1)       # repeats the potential of each step as many times as the interval sampling points (plus one)
+
+        else:       # activates in cases where the waveform arrays are only calculated when they are used
+            self.indexWF = Analytic(lambda positions: positions, round((self.tmax + (self.dE/self.sr)) / self.dt) + (2 * self.ns * self.steps + 1), np.int64)     # indexing array which accounts for the additional step at the end of the waveform and for staircase points equal to the total number of steps taken (plus one)
+            self.tWF = Analytic(self.StepTime, (2 * self.ns * self.steps + 1) * (self.interval + 1))      # staircase time array
+            self.EWF = Analytic(lambda positions: self.stairs[positions // (self.interval + 1)], self.stairs.size * (self.interval + 1))        # staircase potential array
+
+
+    def StepTime(self, positions):
+        '''Calculates the time at the given positions of the staircase waveform, where the beginning of each step overlaps with the end of the previous one'''
+
+        positions = np.asarray(positions)       # converts the positions into an array
+        return self.single[positions % (self.interval + 1)] + (positions // (self.interval + 1)) * self.dt * self.interval
+
 
 
 
@@ -0,0 +1,98 @@
+'''
+Reference implementations of the analysis as it was first written (one loop per window, peak, or
+step), which the vectorised analyses in operations.py and the recursive simulation in simulations.py are checked against,
+along with the original whole dataframe parse which the column parsers in fileopener.py are checked against.
+'''
+
+import numpy as np
+import pandas as pd
+
+
+def Peaks(i, shape, label):
+    '''Returns the peak positions, peak values, and aligned potential waveform found by the original peak finding loop'''
+
+    peaks = np.array([])
+    ix = 0
+    while ix < (i.size - shape.interval + 1):
+        position = np.argmax(np.abs(i[ix : ix + shape.interval])) + ix
+        if ix == 0:
+            peaks = np.append(peaks, int(position))
+        elif position - peaks[-1] > 1.5 * shape.interval:
+            lost = np.argmax(np.abs(i[int(peaks[-1] + 0.5 * shape.interval) : int(position - 0.5 * shape.interval)])) + int(0.5 * shape.interval + peaks[-1])
+            peaks = np.append(peaks, int(lost))
+            peaks = np.append(peaks, int(position))
+        elif position - peaks[-1] < 0.5 * shape.interval:
+            pass
+        else:
+            peaks = np.append(peaks, int(position))
+        ix += shape.interval
+
+    values = np.array([])
+    for iy in peaks:
+        values = np.append(values, i[int(iy)])
+
+    E = np.asarray(shape.E)
+    if label == 'imported':
+        for iz in np.diff(values):
+            if iz >= np.abs(values[1]):
+                lv = int(peaks[np.where(np.diff(values) == iz)[0][0]])
+                shift = shape.udp + shape.dp - lv if shape.dE > 0 else shape.ldp - lv
+                E = np.concatenate((E[shift:], E[:shift]))
+                break
+            if iz <= -np.abs(values[1]):
+                uv = int(peaks[np.where(np.diff(values) == iz)[0][0]])
+                shift = shape.udp - uv if shape.dE > 0 else shape.dp + shape.ldp - uv
+                E = np.concatenate((E[shift:], E[:shift]))
+                break
+    return peaks, values, E
+
+
+def MovingAverage(i, window, step):
+    '''Returns the average current of every window found by the original moving average loop'''
+
+    averages = np.array([])
+    ix = 0
+    while ix < i.size - window + 1:
+        averages = np.append(averages, np.average(i[ix : ix + window]))
+        ix += step
+    return averages
+
+
+def CurrentSampling(i, peaks, interval, center, range):
+    '''Returns the average current of every sampling region found by the original current sampling loop'''
+
+    averages = np.array([])
+    for ix in np.arange(peaks.size):
+        if ix + 1 < peaks.size:
+            step = i[int(peaks[ix]) : int(peaks[ix + 1])]
+        else:
+            step = i[int(peaks[ix]) : int(peaks[ix] + interval)]
+        upper = round((center + (range / 2)), 3) * step.size
+        lower = round((center - (range / 2)), 3) * step.size
+        with np.errstate(invalid = 'ignore'):
+            averages = np.append(averages, np.average(step[int(lower) : int(upper)]) if int(upper) > int(lower) else np.nan)
+    return averages
+
+
+def Staircase(shape, Cd, Ru):
+    '''Returns the current of a staircase starting from the lower vertex potential, found by adding a whole exponential for every step \n
+    as the original simulation did'''
+
+    i = np.array([0.0])
+    for ix in np.arange(shape.ns):
+        for sign in (1, -1):
+            window = np.zeros(shape.dp)
+            for iy in np.arange(shape.steps):
+                space = int(iy * shape.interval)
+                window[space:] += (sign * shape.dE / Ru) * np.exp(-shape.t[:shape.dp - space] / (Ru * Cd))
+            i = np.append(i, window)
+    return i
+
+
+def Parse(file, cf):
+    '''Returns the current column found by the original parse, which read the whole file into a dataframe and converted every column'''
+
+    df = pd.read_csv(file, header = 1, low_memory = False)
+    i = df.to_numpy().astype(float)[:,1]
+    i *= -cf
+    return i
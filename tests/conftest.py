@@ -0,0 +1,9 @@
+'''
+Shared setup for the oscilloscope-reader tests. The modules of the package import each other by
+their plain names (e.g. import operations as op), so the package folder is put on the path.
+'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'oscilloscopereader'))
@@ -0,0 +1,101 @@
+'''
+Tests that the vectorised analyses in operations.py, the lazy waveforms in waveforms.py, and the
+recursive simulation in simulations.py give the same results as the original loops in baseline.py.
+'''
+
+import numpy as np
+import pytest
+import baseline
+import fileopener as fo
+import waveforms as wf
+import simulations as sim
+import operations as op
+
+
+def capture(Eini = 0.0, dE = 0.005, ns = 2, osf = 20000, roll = 0, noise = 0.0, label = 'imported'):
+    '''Simulated staircase capture, rotated by roll points and given some noise'''
+
+    shape = wf.CyclicStaircaseVoltammetry(Eini = Eini, Eupp = 0.5, Elow = -0.5, dE = dE, sr = 0.5, ns = ns, osf = osf)
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    data.i = np.roll(data.i, roll) + np.random.default_rng(roll).normal(0, noise, data.i.size)
+    data.label = label
+    return shape, data
+
+
+CAPTURES = [dict(), dict(roll = 5000), dict(Eini = 0.2, dE = -0.005, roll = 777), dict(roll = 123, noise = 2e-6), dict(label = 'simulated'), dict(Eini = -0.5, dE = 0.01, osf = 5000, roll = 31, noise = 5e-6)]
+
+
+@pytest.mark.parametrize('options', CAPTURES)
+def test_peaks_match_baseline(options):
+    shape, data = capture(**options)
+    analysis = op.Operations(shape, data)
+    peaks, values, E = baseline.Peaks(data.i, shape, data.label)
+    assert analysis.peaks.dtype == peaks.dtype
+    assert np.array_equal(analysis.peaks, peaks)
+    assert np.array_equal(analysis.values, values)
+    assert np.array_equal(np.asarray(analysis.aligned), E)
+
+
+@pytest.mark.parametrize('options', CAPTURES[:4])
+@pytest.mark.parametrize('window, step', [(2, 7), (1000, 100), (4999, 3000)])
+@pytest.mark.parametrize('kahan', [False, True])
+def test_moving_average_matches_baseline(options, window, step, kahan):
+    shape, data = capture(**options)
+    analysis = op.Operations(shape, data, MA = True, window = window, step = step, kahan = kahan)
+    averages = baseline.MovingAverage(data.i, window, step)
+    peaks, values, E = baseline.Peaks(data.i, shape, data.label)
+    size = min(averages.size, E[::step].size)
+    assert np.array_equal(np.asarray(analysis.E), E[::step][:size])
+    assert np.allclose(analysis.i, averages[:size], rtol = 1e-9, atol = 1e-15)
+
+
+def test_kahan_moving_average_on_offset_capture():
+    shape, data = capture(ns = 4, label = 'simulated')
+    data.i = data.i + 1.0       # a large offset, where a plain running total loses accuracy over a long capture
+    plain = op.Operations(shape, data, MA = True, window = 1000, step = 100)
+    kahan = op.Operations(shape, data, MA = True, window = 1000, step = 100, kahan = True)
+    averages = baseline.MovingAverage(data.i, 1000, 100)[:kahan.i.size]
+    assert np.amax(np.abs(kahan.i - averages)) <= np.amax(np.abs(plain.i - averages))
+    assert np.allclose(kahan.i, averages, rtol = 1e-13, atol = 0)
+
+
+@pytest.mark.parametrize('options', CAPTURES)
+@pytest.mark.parametrize('center, range', [(0.5, 0.95), (0.3, 0.2), (0.75, 0.01)])
+def test_current_sampling_matches_baseline(options, center, range):
+    shape, data = capture(**options)
+    analysis = op.Operations(shape, data, CS = True, center = center, range = range)
+    peaks, values, E = baseline.Peaks(data.i, shape, data.label)
+    averages = baseline.CurrentSampling(data.i, peaks, shape.interval, center, range)
+    kept = peaks[peaks < E.size].astype(int)      # steps which start inside the potential waveform
+    assert np.array_equal(np.asarray(analysis.E), E[kept])
+    assert np.allclose(analysis.i, averages[:kept.size], rtol = 1e-12, atol = 1e-18, equal_nan = True)
+
+
+def test_scaled_codes_match_baseline():
+    shape, data = capture(roll = 400)
+    step = np.amax(np.abs(data.i)) / 30000
+    codes = np.round(data.i / step).astype(np.int16)
+    data.i = codes * step
+    scaled = op.Operations(shape, type('Data', (), {'i': fo.Scaled(codes, step, 0.0), 'label': 'imported'})(), CS = True)
+    peaks, values, E = baseline.Peaks(data.i, shape, data.label)
+    assert np.array_equal(scaled.peaks, peaks)
+    assert np.allclose(scaled.i, baseline.CurrentSampling(data.i, peaks, shape.interval, 0.5, 0.95)[:scaled.i.size], rtol = 1e-12, atol = 1e-18)
+
+
+@pytest.mark.parametrize('ns, osf', [(1, 20000), (2, 5000), (3, 20000)])
+def test_recursive_staircase_matches_superposition(ns, osf):
+    shape = wf.CyclicStaircaseVoltammetry(Eini = -0.5, Eupp = 0.5, Elow = -0.5, dE = 0.01, sr = 0.5, ns = ns, osf = osf)
+    i = sim.Capacitance(shape, Cd = 0.00005, Ru = 500).i
+    reference = baseline.Staircase(shape, Cd = 0.00005, Ru = 500)
+    assert i.size == reference.size
+    assert np.allclose(i, reference, rtol = 1e-12, atol = 1e-18)
+
+
+@pytest.mark.parametrize('kind', ['CyclicLinearVoltammetry', 'CyclicStaircaseVoltammetry'])
+@pytest.mark.parametrize('Eini, dE', [(0.0, 0.005), (0.2, -0.005), (-0.5, 0.01), (0.5, -0.01)])
+def test_lazy_waveforms_match_eager(kind, Eini, dE):
+    eager = getattr(wf, kind)(Eini, 0.5, -0.5, dE, 0.1, 2, 20000)
+    lazy = getattr(wf, kind)(Eini, 0.5, -0.5, dE, 0.1, 2, 20000, lazy = True)
+    for name in ('index', 't', 'E'):
+        assert np.array_equal(np.asarray(getattr(lazy, name)), np.asarray(getattr(eager, name))), name
+    assert np.array_equal(np.asarray(lazy.E[1000:5000:7]), np.asarray(eager.E)[1000:5000:7])
@@ -0,0 +1,64 @@
+'''
+Tests for opening a whole directory of oscilloscope files at once (Batch in fileopener.py).
+'''
+
+import gzip
+import os
+import numpy as np
+import pytest
+import fileopener as fo
+
+
+def capture(path, values):
+    '''Writes an oscilloscope .csv file with two header rows, then a time and voltage column'''
+
+    text = 'x-axis,1\nsecond,Volt\n' + ''.join(f'{ix * 5e-6!r},{float(iy)!r}\n' for ix, iy in enumerate(values))
+    if str(path).endswith('.gz'):
+        path.write_bytes(gzip.compress(text.encode()))
+    else:
+        path.write_text(text)
+    return str(path)
+
+
+@pytest.fixture
+def source(tmp_path):
+    '''A directory of oscilloscope files in which one file cannot be parsed and one file is not an oscilloscope file'''
+
+    folder = tmp_path / 'captures'
+    folder.mkdir()
+    files = [capture(folder / 'a.csv', np.linspace(-1, 1, 300)), capture(folder / 'c.csv.gz', np.linspace(1, -1, 500))]
+    (folder / 'b.csv').write_text('x-axis,1\nsecond,Volt\n0.0,0.1\n5e-06,not a number\n')
+    (folder / 'notes.txt').write_text('not an oscilloscope file')
+    return str(folder), files, os.path.join(str(folder), 'b.csv')
+
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_bad_file_is_reported_and_the_rest_are_loaded(tmp_path, source, workers):
+    folder, files, bad = source
+    batch = fo.Batch(folder, 1e-5, workers = workers, directory = str(tmp_path / 'batch'), engine = 'numpy')
+    assert batch.files == sorted(files + [bad])
+    assert list(batch.failures) == [bad] and 'ValueError' in batch.failures[bad]
+    assert sorted(batch.i) == files
+    for file in files:
+        assert isinstance(batch.i[file], np.memmap)
+        assert batch.rows[file] == batch.i[file].size
+        assert np.array_equal(batch.i[file], fo.Oscilloscope(file, 1e-5, engine = 'numpy').i)
+    batch.Close()
+
+
+def test_close_deletes_the_batch_files(tmp_path, source):
+    folder, files, bad = source
+    with fo.Batch(folder, 1e-5, directory = str(tmp_path / 'batch'), engine = 'numpy') as batch:
+        assert len(os.listdir(tmp_path / 'batch')) == 2
+    assert batch.i == {}
+    assert os.path.exists(tmp_path / 'batch') is False      # the batch folder was created by the batch
+
+
+def test_close_keeps_a_folder_which_already_existed(tmp_path, source):
+    folder, files, bad = source
+    (tmp_path / 'batch').mkdir()
+    (tmp_path / 'batch' / 'results.txt').write_text('kept')
+    batch = fo.Batch(folder, 1e-5, directory = str(tmp_path / 'batch'), engine = 'numpy')
+    batch.Close()
+    assert os.listdir(tmp_path / 'batch') == ['results.txt']
+    batch.Close()       # closing twice does nothing
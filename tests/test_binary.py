@@ -0,0 +1,72 @@
+'''
+Tests for opening raw binary oscilloscope exports of int8 or int16 ADC codes (Binary in fileopener.py).
+'''
+
+import numpy as np
+import pytest
+import fileopener as fo
+
+
+def header(magic = b'OSCB', width = 2, samples = 0, scale = 1e-3, offset = 0.0, interval = 5e-6):
+    '''Header of a binary oscilloscope file, built field by field from the documented layout'''
+
+    fields = np.zeros(1, dtype = fo.Binary.header)
+    fields['magic'], fields['version'], fields['width'], fields['length'] = magic, 1, width, fo.Binary.header.itemsize
+    fields['samples'], fields['scale'], fields['offset'], fields['interval'] = samples, scale, offset, interval
+    return fields.tobytes()
+
+
+@pytest.mark.parametrize('code', [np.int8, np.int16])
+def test_codes_are_decoded_and_scaled(tmp_path, code):
+    info = np.iinfo(code)
+    codes = np.array([info.min, -1, 0, 1, info.max] * 3, dtype = code)
+    path = tmp_path / 'capture.bin'
+    fo.Binary.Write(path, codes, scale = 0.002, offset = -0.25, interval = 5e-6)
+
+    binary = fo.Binary(str(path), cf = 1.2e-5)
+    assert binary.width == np.dtype(code).itemsize and binary.samples == codes.size
+    assert binary.scale == 0.002 and binary.offset == -0.25 and binary.interval == 5e-6
+    assert np.array_equal(binary.codes, codes)
+    expected = -(codes.astype(np.float64) * 0.002 + -0.25) * 1.2e-5     # voltage of every code, inverted and converted into current
+    assert np.allclose(np.asarray(binary.i), expected, rtol = 1e-12, atol = 0)
+    assert np.allclose(binary.i[1:4], expected[1:4], rtol = 1e-12, atol = 0)
+    assert binary.i[2] == pytest.approx(0.25 * 1.2e-5)
+
+
+def test_layout_matches_header_fields(tmp_path):
+    codes = np.array([-3, 7, 120], dtype = '<i2')
+    path = tmp_path / 'capture.bin'
+    path.write_bytes(header(width = 2, samples = codes.size, scale = 0.5, offset = 1.0) + codes.tobytes())
+    assert np.allclose(np.asarray(fo.Binary(str(path), cf = 2.0).i), -(codes * 0.5 + 1.0) * 2.0)
+
+
+def test_truncated_file_is_refused(tmp_path):
+    path = tmp_path / 'capture.bin'
+    path.write_bytes(header(width = 2, samples = 10) + np.zeros(9, dtype = '<i2').tobytes())
+    with pytest.raises(ValueError, match = 'shorter'):
+        fo.Binary(str(path), cf = 1.0)
+
+
+@pytest.mark.parametrize('contents', [header(magic = b'OSCX', samples = 1) + b'\0\0', b'Second,Volt,\n', b''])
+def test_bad_magic_is_refused(tmp_path, contents):
+    path = tmp_path / 'capture.bin'
+    path.write_bytes(contents)
+    with pytest.raises(ValueError, match = 'not a binary oscilloscope file'):
+        fo.Binary(str(path), cf = 1.0)
+
+
+def test_unsupported_code_width_is_refused(tmp_path):
+    path = tmp_path / 'capture.bin'
+    path.write_bytes(header(width = 4, samples = 1) + b'\0' * 4)
+    with pytest.raises(ValueError, match = 'only 1 or 2 bytes'):
+        fo.Binary(str(path), cf = 1.0)
+    with pytest.raises(ValueError, match = 'int8 or int16'):
+        fo.Binary.Write(tmp_path / 'wide.bin', np.zeros(3, dtype = np.int32), 1.0, 0.0, 1.0)
+
+
+def test_benchmark_codes_match_the_values_used_to_write_them(tmp_path):
+    samples = np.arange(100000)
+    path = tmp_path / 'benchmark.bin'
+    fo.Binary.Write(path, np.round(0.01 * np.sin(samples * 5e-4) / 1e-6).astype(np.int16), scale = 1e-6, offset = 0.0, interval = 5e-7)
+    expected = -np.round(0.01 * np.sin(samples * 5e-4) / 1e-6) * 1e-6
+    assert np.amax(np.abs(np.asarray(fo.Binary(str(path), cf = 1.0).i) - expected)) <= 1e-18
@@ -0,0 +1,104 @@
+'''
+Tests for keeping and reopening parsed oscilloscope files (Cache in fileopener.py).
+'''
+
+import os
+import numpy as np
+import pytest
+import fileopener as fo
+
+
+def capture(path, values):
+    '''Writes an oscilloscope .csv file with two header rows, then a time and voltage column'''
+
+    with open(path, 'w') as file:
+        file.write('x-axis,1\nsecond,Volt\n')
+        for ix, iy in enumerate(values):
+            file.write(f'{ix * 5e-6!r},{float(iy)!r}\n')
+    return str(path)
+
+
+def cached(cache):
+    '''Names of the files in the cache folder'''
+
+    return sorted(os.listdir(cache.directory))
+
+
+def test_hit_after_miss(tmp_path, monkeypatch):
+    file = capture(tmp_path / 'capture.csv', np.linspace(-1, 1, 500))
+    cache = fo.Cache(str(tmp_path / 'cache'))
+    assert cache.Load(file, 1e-5, np.float64) is None
+    first = fo.Oscilloscope(file, 1e-5, cache = cache, engine = 'numpy')
+    assert len(cached(cache)) == 1
+
+    monkeypatch.setattr(fo.Oscilloscope, 'Parse', lambda self: pytest.fail('a cached file was parsed again'))
+    second = fo.Oscilloscope(file, 1e-5, cache = cache, engine = 'numpy')
+    assert isinstance(second.i, np.memmap)
+    assert np.array_equal(second.i, first.i)
+
+
+def test_keys_are_separated_by_cf_dtype_and_mtime(tmp_path):
+    file = capture(tmp_path / 'capture.csv', np.linspace(-1, 1, 500))
+    cache = fo.Cache(str(tmp_path / 'cache'))
+    keys = {cache.Key(file, 1e-5, np.float64), cache.Key(file, 2e-5, np.float64), cache.Key(file, 1e-5, np.float32)}
+    os.utime(file, ns = (os.stat(file).st_atime_ns, os.stat(file).st_mtime_ns + 10**9))     # the same contents, saved again later
+    keys.add(cache.Key(file, 1e-5, np.float64))
+    assert len(keys) == 4
+    assert cache.Key(file, 1e-5, np.float64) == cache.Key(file, 1e-5, np.float64)
+
+    for cf, dtype in [(1e-5, np.float64), (2e-5, np.float64), (1e-5, np.float32)]:
+        i = fo.Oscilloscope(file, cf, cache = cache, dtype = dtype, engine = 'numpy').i
+        reopened = cache.Load(file, cf, dtype)
+        assert reopened.dtype == np.dtype(dtype)
+        assert np.array_equal(reopened, i)
+        assert np.allclose(reopened, -np.linspace(-1, 1, 500) * cf, rtol = 1e-6)
+    assert len(cached(cache)) == 3
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    files = [capture(tmp_path / f'capture {ix}.csv', np.full(1000, ix + 1.0)) for ix in range(3)]
+    cache = fo.Cache(str(tmp_path / 'cache'), limit = 18000)     # room for two cached files of 1000 float64 values (and a header) but not three
+    for ix, file in enumerate(files[:2]):
+        cache.Store(file, 1e-5, np.float64, np.full(1000, float(ix)))
+        os.utime(cache.Key(file, 1e-5, np.float64), ns = (10**18 + ix, 10**18 + ix))        # the first file is the oldest
+    assert cache.Load(files[0], 1e-5, np.float64) is not None       # using the first file makes the second the least recently used
+
+    cache.Store(files[2], 1e-5, np.float64, np.full(1000, 2.0))
+    assert cache.Load(files[1], 1e-5, np.float64) is None
+    assert np.array_equal(cache.Load(files[0], 1e-5, np.float64), np.zeros(1000))
+    assert np.array_equal(cache.Load(files[2], 1e-5, np.float64), np.full(1000, 2.0))
+    assert sum(os.path.getsize(os.path.join(cache.directory, ix)) for ix in cached(cache)) <= cache.limit
+
+
+def test_file_larger_than_the_limit_is_kept(tmp_path):
+    file = capture(tmp_path / 'capture.csv', np.ones(1000))
+    cache = fo.Cache(str(tmp_path / 'cache'), limit = 100)
+    cache.Store(file, 1e-5, np.float64, np.ones(1000))
+    assert np.array_equal(cache.Load(file, 1e-5, np.float64), np.ones(1000))
+
+
+def test_store_writes_a_temporary_file_then_replaces(tmp_path, monkeypatch):
+    file = capture(tmp_path / 'capture.csv', np.ones(100))
+    cache = fo.Cache(str(tmp_path / 'cache'))
+    path = cache.Key(file, 1e-5, np.float64)
+    moves = []
+    replace = os.replace
+
+    def record(source, destination):
+        assert not os.path.exists(destination)      # the cached file does not exist until the temporary file is complete
+        assert np.array_equal(np.load(source), np.arange(100.0))
+        moves.append((source, destination))
+        replace(source, destination)
+
+    monkeypatch.setattr(fo.os, 'replace', record)
+    cache.Store(file, 1e-5, np.float64, np.arange(100.0))
+    assert moves == [(path + '.tmp.npy', path)]
+    assert cached(cache) == [os.path.basename(path)]
+
+
+def test_unreadable_cached_file_is_a_miss(tmp_path):
+    file = capture(tmp_path / 'capture.csv', np.ones(100))
+    cache = fo.Cache(str(tmp_path / 'cache'))
+    with open(cache.Key(file, 1e-5, np.float64), 'wb') as partial:
+        partial.write(b'\x93NUMPY')     # a cached file which was cut short
+    assert cache.Load(file, 1e-5, np.float64) is None
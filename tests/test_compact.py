@@ -0,0 +1,46 @@
+'''
+Tests for holding current values as integer ADC codes (Compact of the Scaled class in fileopener.py).
+'''
+
+import numpy as np
+import pytest
+import fileopener as fo
+
+
+def levels(size = 2000000, step = 1e-6):
+    '''Current values which all lie on the evenly spaced levels of an ADC'''
+
+    return np.round(np.sin(np.arange(size) * 1e-3) * 100) * step
+
+
+def test_values_on_levels_are_compacted():
+    values = levels()
+    compacted = fo.Scaled.Compact(values)
+    assert compacted is not None and compacted.codes.dtype == np.int8
+    assert np.allclose(np.asarray(compacted), values, rtol = 0, atol = 1e-12)
+
+
+@pytest.mark.parametrize('bad', [np.nan, np.inf, -np.inf])
+@pytest.mark.parametrize('position', [5, 1500000])
+def test_nan_and_infinite_values_are_not_compacted(bad, position):
+    values = levels()
+    values[position] = bad
+    assert fo.Scaled.Compact(values) is None
+
+
+def test_values_off_the_levels_after_the_first_mebibyte_are_not_compacted():
+    values = levels()
+    values[1500000] += 0.5e-6
+    assert fo.Scaled.Compact(values) is None
+
+
+def test_levels_missing_from_the_first_mebibyte_are_not_lost():
+    values = levels() * 2     # only even levels...
+    values[1500000:1500010] += 1e-6      # ...until odd levels appear after the first MiB, where the spacing was estimated
+    compacted = fo.Scaled.Compact(values)
+    assert compacted is None or np.allclose(np.asarray(compacted), values, rtol = 0, atol = 1e-12)
+
+
+def test_empty_and_constant_values_are_not_compacted():
+    assert fo.Scaled.Compact(np.zeros(0)) is None
+    assert fo.Scaled.Compact(np.full(10, 3e-6)) is None
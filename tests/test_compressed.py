@@ -0,0 +1,101 @@
+'''
+Tests that compressed oscilloscope files (.csv.gz, .csv.xz, or .csv.bz2) give the same current as the
+uncompressed file for every parser, with or without decompression in a separate thread (Decompressor
+in fileopener.py).
+'''
+
+import bz2
+import gzip
+import io
+import lzma
+import threading
+import numpy as np
+import pytest
+import fileopener as fo
+
+
+COMPRESSIONS = {'.gz': gzip.compress, '.xz': lzma.compress, '.bz2': bz2.compress}
+
+
+@pytest.fixture(scope = 'module')
+def files(tmp_path_factory):
+    '''An oscilloscope .csv file larger than a decompressed chunk, along with a copy in every compressed format'''
+
+    folder = tmp_path_factory.mktemp('compressed')
+    values = np.random.default_rng(0).normal(0, 0.1, 50000)
+    text = 'x-axis,1\nsecond,Volt\n' + ''.join(f'{ix * 5e-6!r},{float(iy)!r}\n' for ix, iy in enumerate(values))
+    paths = {'': folder / 'capture.csv'}
+    paths[''].write_text(text)
+    for extension, compress in COMPRESSIONS.items():
+        paths[extension] = folder / f'capture.csv{extension}'
+        paths[extension].write_bytes(compress(text.encode()))
+    return {extension: str(path) for extension, path in paths.items()}
+
+
+@pytest.mark.parametrize('extension', list(COMPRESSIONS))
+@pytest.mark.parametrize('engine', ['pyarrow', 'pandas', 'numpy'])
+@pytest.mark.parametrize('thread', [False, True])
+def test_parse_matches_uncompressed(files, extension, engine, thread):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    expected = fo.Oscilloscope(files[''], 1e-5, engine = engine).i
+    i = fo.Oscilloscope(files[extension], 1e-5, engine = engine, thread = thread).i
+    assert i.size == 50000
+    assert np.array_equal(i, expected)
+
+
+@pytest.mark.parametrize('extension', list(COMPRESSIONS))
+@pytest.mark.parametrize('thread', [False, True])
+def test_blocks_match_uncompressed(files, extension, thread):
+    expected = list(fo.Oscilloscope(files[''], 1e-5, stream = True, block = 7777).Blocks())
+    blocks = list(fo.Oscilloscope(files[extension], 1e-5, stream = True, block = 7777, thread = thread).Blocks())
+    assert [ix.size for ix in blocks] == [ix.size for ix in expected]
+    assert np.array_equal(np.concatenate(blocks), np.concatenate(expected))
+
+
+class Failing(io.RawIOBase):
+    '''Compressed stream which gives one chunk and then fails, as a corrupt file would'''
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size = -1):
+        self.calls += 1
+        if self.calls == 1:
+            return b'x' * 10
+        raise EOFError('Compressed file ended before the end-of-stream marker was reached')
+
+
+def read(stream, size):
+    '''Reads from the stream in another thread, so that a read which never returns fails the test instead of hanging it'''
+
+    result = {}
+    def target():
+        try:
+            result['data'] = stream.read(size)
+        except Exception as exc:
+            result['error'] = exc
+    reader = threading.Thread(target = target, daemon = True)
+    reader.start()
+    reader.join(timeout = 5)
+    assert reader.is_alive() is False, 'the read never returned'
+    return result
+
+
+def test_error_is_raised_on_every_read():
+    stream = fo.Decompressor(Failing())
+    assert read(stream, 10) == {'data': b'x' * 10}
+    for ix in range(3):     # the thread has stopped, so every read after the error raises it again instead of waiting
+        assert isinstance(read(stream, 10)['error'], EOFError)
+    stream.close()
+
+
+def test_corrupt_file_raises(tmp_path, files):
+    with open(files['.gz'], 'rb') as whole:
+        (tmp_path / 'corrupt.csv.gz').write_bytes(whole.read()[:-5000])     # a compressed file which was cut short
+    with pytest.raises(EOFError):
+        fo.Oscilloscope(str(tmp_path / 'corrupt.csv.gz'), 1e-5, engine = 'numpy', thread = True)
@@ -0,0 +1,48 @@
+'''
+Tests for aligning imported data with the potential waveform by cross-correlation (Correlate in operations.py).
+'''
+
+import numpy as np
+import pytest
+import waveforms as wf
+import simulations as sim
+import operations as op
+
+
+def imported(Eini, dE, ns, roll, noise = 0.0):
+    '''Simulated capture of ns scans, marked as imported, rotated by roll points and given some noise'''
+
+    shape = wf.CyclicStaircaseVoltammetry(Eini = Eini, Eupp = 0.5, Elow = -0.5, dE = dE, sr = 0.5, ns = ns, osf = 20000)
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    data.i = np.roll(data.i, roll) + np.random.default_rng(roll).normal(0, noise, data.i.size)
+    data.label = 'imported'
+    return shape, data
+
+
+@pytest.mark.parametrize('Eini, dE', [(0.0, 0.005), (0.2, -0.005), (-0.5, 0.01)])
+@pytest.mark.parametrize('roll', [0, 1, 199, 777, 4000, 5000, 12345, 40000, 60000, 79999])
+def test_single_scan_is_placed_at_the_roll(Eini, dE, roll):
+    shape, data = imported(Eini, dE, 1, roll)
+    analysis = op.Operations(shape, data, vertex = 'correlation')
+    size = np.asarray(shape.E).size
+    assert analysis.shift == -roll % size
+    assert np.array_equal(np.asarray(analysis.E), np.roll(np.asarray(shape.E), roll))
+    assert analysis.confidence > 0.99      # only the steps either side of the join of the capture can disagree
+
+
+@pytest.mark.parametrize('ns', [2, 3])
+@pytest.mark.parametrize('roll', [0, 777, 4000, 5000, 12345, 79999, 80000, 100000, 150000, 159999])
+def test_several_scans_are_placed_at_the_roll(ns, roll):
+    shape, data = imported(0.0, 0.01, ns, roll)
+    analysis = op.Operations(shape, data, vertex = 'correlation')
+    assert analysis.shift == -roll % np.asarray(shape.E).size      # every scan has the same steps, so the scan is taken from where the capture joins
+
+
+@pytest.mark.parametrize('Eini, dE', [(0.0, 0.005), (-0.5, 0.01)])
+@pytest.mark.parametrize('roll', [0, 200, 5000, 12345, 60000])
+def test_noisy_capture_is_placed_within_a_point(Eini, dE, roll):
+    shape, data = imported(Eini, dE, 1, roll, noise = 1e-7)     # roll 200 adds a peak in the part of a step before the first whole step
+    analysis = op.Operations(shape, data, vertex = 'correlation')
+    size = np.asarray(shape.E).size
+    assert min((analysis.shift + roll) % size, -(analysis.shift + roll) % size) <= 1
+    assert analysis.confidence > 0.9
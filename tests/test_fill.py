@@ -0,0 +1,69 @@
+'''
+Tests for reading an oscilloscope file in blocks (Blocks and Fill in fileopener.py), which should give
+the same current as loading the whole file straight away.
+'''
+
+import numpy as np
+import pytest
+import fileopener as fo
+
+
+@pytest.fixture(scope = 'module')
+def file(tmp_path_factory):
+    '''Oscilloscope .csv file with two header rows, then a time and voltage column'''
+
+    path = tmp_path_factory.mktemp('fill') / 'capture.csv'
+    t = np.arange(25000) * 5e-6
+    with open(path, 'w') as csv:
+        csv.write('x-axis,1\nsecond,Volt\n')
+        np.savetxt(csv, np.column_stack((t, 0.01 * np.sin(t * 1000))), fmt = '%.9e', delimiter = ',')
+    return str(path)
+
+
+@pytest.mark.parametrize('block', [999, 4096, 25000, 100000])
+def test_blocks_apply_cf_with_the_block_size(file, block):
+    eager = fo.Oscilloscope(file, 1.2e-5, engine = 'pandas').i
+    blocks = list(fo.Oscilloscope(file, 1.2e-5, stream = True, block = block).Blocks())
+    assert [ix.size for ix in blocks[:-1]] == [block] * (len(blocks) - 1)       # every block but the last holds the requested number of rows
+    assert 0 < blocks[-1].size <= block
+    assert np.array_equal(np.concatenate(blocks), eager)        # which has already been modified using the conversion factor
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_fill_in_memory_matches_eager(file, dtype):
+    eager = fo.Oscilloscope(file, 1.2e-5, engine = 'pandas', dtype = dtype).i
+    data = fo.Oscilloscope(file, 1.2e-5, stream = True, block = 4096, dtype = dtype)
+    out = np.full(30000, np.nan, dtype = dtype)     # larger than the file
+    i = data.Fill(out = out)
+    assert i is data.i and np.shares_memory(i, out)
+    assert i.dtype == np.dtype(dtype)
+    assert np.array_equal(i, eager)
+    assert np.all(np.isnan(out[eager.size:]))      # nothing is written past the end of the file
+
+
+def test_fill_memory_mapped_array_matches_eager(file, tmp_path):
+    eager = fo.Oscilloscope(file, 1.2e-5, engine = 'pandas').i
+    out = np.lib.format.open_memmap(str(tmp_path / 'out.npy'), mode = 'w+', dtype = np.float64, shape = (eager.size,))
+    assert np.array_equal(fo.Oscilloscope(file, 1.2e-5, stream = True, block = 4096).Fill(out = out), eager)
+    out.flush()
+    assert np.array_equal(np.load(str(tmp_path / 'out.npy')), eager)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_fill_path_matches_eager(file, tmp_path, dtype):
+    eager = fo.Oscilloscope(file, 1.2e-5, engine = 'pandas', dtype = dtype).i
+    i = fo.Oscilloscope(file, 1.2e-5, stream = True, block = 4096, dtype = dtype).Fill(path = str(tmp_path / 'current.bin'))
+    assert isinstance(i, np.memmap) and i.dtype == np.dtype(dtype)
+    assert np.array_equal(i, eager)
+    assert np.array_equal(np.fromfile(str(tmp_path / 'current.bin'), dtype = dtype), eager)
+
+
+def test_fill_refuses_a_small_array(file):
+    with pytest.raises(ValueError, match = 'holds more rows'):
+        fo.Oscilloscope(file, 1.2e-5, stream = True, block = 4096).Fill(out = np.empty(10000))
+
+
+@pytest.mark.parametrize('destinations', [dict(), dict(out = np.empty(10), path = 'current.bin')])
+def test_fill_needs_exactly_one_destination(file, destinations):
+    with pytest.raises(SystemExit):
+        fo.Oscilloscope(file, 1.2e-5, stream = True).Fill(**destinations)
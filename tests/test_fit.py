@@ -0,0 +1,32 @@
+'''
+Tests for fitting Cd and Ru to the transient of every step (Fit in operations.py).
+'''
+
+import numpy as np
+import pytest
+import waveforms as wf
+import simulations as sim
+import operations as op
+
+
+@pytest.mark.parametrize('Eini, dE', [(0, 0.01), (0.2, -0.005), (0, 0.002)])
+def test_unrotated_simulated_steps(Eini, dE):
+    shape = wf.CyclicStaircaseVoltammetry(Eini = Eini, Eupp = 0.5, Elow = -0.5, dE = dE, sr = 0.5, ns = 2, osf = 20000)
+    Cd, Ru = op.Operations(shape, sim.Capacitance(shape, Cd = 0.00005, Ru = 500)).Fit()
+    assert np.count_nonzero(np.isnan(Cd)) == 0
+    assert np.allclose(Cd, 0.00005, rtol = 0.0025) and np.allclose(Ru, 500, rtol = 0.0025)     # vertex steps which start a point early are out by 0.2%
+
+
+@pytest.mark.parametrize('Eini, dE, roll', [(0, 0.01, 5000), (0.2, -0.005, 777), (0, 0.002, 12345), (0, 0.01, 0), (0, 0.01, 4000), (0, 0.01, 80000), (0.2, -0.005, 40000)])
+@pytest.mark.parametrize('vertex', ['threshold', 'correlation'])
+@pytest.mark.parametrize('lazy', [False, True])
+def test_rotated_imported_steps_are_left_out_or_correct(Eini, dE, roll, vertex, lazy):
+    shape = wf.CyclicStaircaseVoltammetry(Eini = Eini, Eupp = 0.5, Elow = -0.5, dE = dE, sr = 0.5, ns = 2, osf = 20000, lazy = lazy)
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    data.label = 'imported'
+    data.i = np.roll(data.i, roll)      # rolls by a whole number of steps start the capture on a step
+    Cd, Ru = op.Operations(shape, data, vertex = vertex).Fit()
+    kept = ~np.isnan(Cd)
+    assert np.isnan(Cd[0]) and np.isnan(Ru[0])       # the current carried into the first step from before the capture is not known
+    assert np.count_nonzero(kept) > 0.9 * Cd.size
+    assert np.allclose(Cd[kept], 0.00005, rtol = 0.0025) and np.allclose(Ru[kept], 500, rtol = 0.0025)
@@ -0,0 +1,130 @@
+'''
+Tests that the results of operations.py do not depend on how the data is split up: the block size of
+streamed data (Stream), the number of threads and the chunk size (workers and chunk), and whether the
+transients of every step are viewed or gathered (Transients).
+'''
+
+import numpy as np
+import pytest
+import fileopener as fo
+import waveforms as wf
+import simulations as sim
+import operations as op
+
+
+class Blocks:
+    '''Stands in for an Oscilloscope opened with stream = True, yielding the current in blocks of the given size'''
+
+    def __init__(self, i, label, size):
+        self.i, self.label, self.size = i, label, size
+
+    def Blocks(self):
+        for ix in range(0, self.i.size, self.size):
+            yield self.i[ix : ix + self.size].copy()
+
+
+def capture(Eini = 0.0, dE = 0.005, roll = 0, label = 'imported'):
+    '''Simulated staircase capture of two scans, rotated by roll points and given some noise'''
+
+    shape = wf.CyclicStaircaseVoltammetry(Eini = Eini, Eupp = 0.5, Elow = -0.5, dE = dE, sr = 0.5, ns = 2, osf = 20000)
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    data.i = np.roll(data.i, roll) + np.random.default_rng(roll).normal(0, 1e-9, data.i.size)
+    data.label = label
+    return shape, data
+
+
+def columns(rows):
+    '''Joins the rows given by output() into one array for each column'''
+
+    rows = list(rows)
+    return [np.array(ix) for ix in zip(*rows)] if len(rows) > 0 else []
+
+
+OPTIONS = [dict(), dict(MA = True, window = 1000, step = 100), dict(MA = True, window = 50, step = 7, kahan = True), dict(CS = True), dict(CS = True, center = 0.3, range = 0.2)]
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+@pytest.mark.parametrize('label, roll', [('imported', 0), ('imported', 3333), ('simulated', 0)])
+def test_stream_matches_batch_for_every_block_size(options, label, roll):
+    shape, data = capture(roll = roll, label = label)
+    batch = columns(op.Operations(shape, data, **options).output())
+    for size in (1000, shape.interval, 4999, 200000):
+        streamed = columns(op.Stream(shape, Blocks(data.i, label, size), **options).output())
+        assert len(streamed) == len(batch)
+        for ix, iy in zip(streamed, batch):
+            assert np.array_equal(ix, iy, equal_nan = True), size
+
+
+@pytest.mark.parametrize('options', OPTIONS + [dict(LP = True), dict(LP = True, filter = 'fft'), dict(CS = True, center = [0.3, 0.5], range = 0.2)])
+@pytest.mark.parametrize('codes', [False, True])
+def test_workers_and_chunks_match_one_piece(options, codes):
+    shape, data = capture(roll = 777)
+    if codes:       # current held as integer ADC codes
+        step = np.amax(np.abs(data.i)) / 30000
+        data.i = fo.Scaled(np.round(data.i / step).astype(np.int16), step, 0.0)
+    whole = op.Operations(shape, data, **options)
+    for workers, chunk in ((2, 5000), (4, 77777), (None, 3001)):
+        split = op.Operations(shape, data, workers = workers, chunk = chunk, **options)
+        assert np.array_equal(split.peaks, whole.peaks)
+        assert np.array_equal(np.asarray(split.E), np.asarray(whole.E))
+        if options.get('MA', False) is True and codes is False:      # running totals restart at each chunk, which only changes float rounding
+            assert np.allclose(split.i, whole.i, rtol = 1e-9, atol = 1e-15)
+        elif options.get('LP', False) is True and options.get('filter', 'iir') == 'iir':        # the recursion is solved in blocks which follow the chunks, which only changes float rounding
+            assert np.allclose(split.i, whole.i, rtol = 1e-9, atol = 1e-15)
+        else:
+            assert np.array_equal(np.asarray(split.i), np.asarray(whole.i), equal_nan = True)
+
+
+@pytest.mark.parametrize('roll', [0, 777, 12345])
+@pytest.mark.parametrize('codes', [False, True])
+def test_transients_are_the_steps_of_the_current(roll, codes):
+    shape, data = capture(roll = roll)
+    if codes:       # current held as integer ADC codes
+        step = np.amax(np.abs(data.i)) / 30000
+        data.i = fo.Scaled(np.round(data.i / step).astype(np.int16), step, 0.0)
+    analysis = op.Operations(shape, data)
+    transients, mask, first = analysis.Transients()
+    current = np.asarray(data.i)
+    starts = analysis.peaks.astype(int)
+    ends = np.append(starts[1:], starts[-1] + shape.interval)
+    rows = np.asarray(transients)
+    for ix in range(rows.shape[0]):
+        assert np.array_equal(rows[ix][~mask[ix]], current[starts[ix] : ends[ix]][:np.count_nonzero(~mask[ix])])
+        assert rows[ix][first[ix]] == current[starts[ix]]
+    held = transients.codes if codes else transients
+    if np.ptp(starts - np.arange(starts.size) * shape.interval) <= shape.interval // 10:      # rows of steps which stay close to the grid are a view of the current
+        assert np.shares_memory(held, data.i.codes if codes else data.i)
+
+
+def test_threads_are_closed_when_the_analysis_fails():
+    import threading
+    shape, data = capture(roll = 777)
+    before = threading.active_count()
+    with pytest.raises(SystemExit):     # invalid options are refused before any thread is started
+        op.Operations(shape, data, MA = True, CS = True, workers = 4)
+    flat = capture()[1]
+    flat.i = np.full(flat.i.size, 1e-6)     # imported data without a vertex, which cannot be aligned
+    with pytest.raises(AttributeError):
+        op.Operations(shape, flat, workers = 4, chunk = 5000)
+    with pytest.raises(Exception):
+        op.Operations(shape, type('Data', (), {'i': np.array(['a'] * 1000), 'label': 'imported'})(), workers = 4, chunk = 100)
+    assert threading.active_count() == before
+
+
+@pytest.mark.parametrize('options', [dict(vertex = 'correlation'), dict(LP = True), dict(CS = True, center = [0.3, 0.5], range = 0.2), dict(CS = True, center = 0.5, range = [0.2, 0.4]), dict(vertex = 'nearest')])
+def test_stream_refuses_options_it_does_not_carry(options):
+    shape, data = capture()
+    with pytest.raises(SystemExit):
+        op.Stream(shape, Blocks(data.i, data.label, 5000), **options)
+
+
+def test_stream_has_no_whole_capture_analyses():
+    shape, data = capture(roll = 3333)
+    stream = op.Stream(shape, Blocks(data.i, data.label, 5000), CS = True)
+    for name in ('Transients', 'Fit', 'Scans', 'Scan', 'Correlate', 'Realigned', 'LowPass', 'Raw', 'Align'):       # analyses which need every point at once are only part of the Operations class
+        assert hasattr(stream, name) is False, name
+    assert isinstance(stream, op.Operations) is False
+    rows = list(stream.output())
+    assert len(rows) > 0 and stream.shift == op.Operations(shape, data).shift
+    with pytest.raises(SystemExit):     # a stream cannot stand in for the alignment of an earlier analysis
+        op.Operations(shape, data, alignment = stream)
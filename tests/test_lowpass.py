@@ -0,0 +1,71 @@
+'''
+Tests for the low-pass filter analysis (LowPass, Convolve, and Recurse in operations.py).
+'''
+
+import numpy as np
+import pytest
+import waveforms as wf
+import simulations as sim
+import operations as op
+
+
+def capture(i):
+    '''Staircase capture whose current is replaced by the given array'''
+
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.005, sr = 0.5, ns = 2, osf = 20000)
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    data.i = i[:data.i.size] if i is not None else data.i
+    return shape, data
+
+
+def butterworth(cutoff, order):
+    '''Numerator and denominator of the digital Butterworth filter, for filtering with the difference equation'''
+
+    analog = np.exp(1j * np.pi * (2 * np.arange(1, order + 1) + order - 1) / (2 * order))
+    warped = 2 * np.tan(np.pi * cutoff / 2)
+    poles = (2 + warped * analog) / (2 - warped * analog)
+    gain = np.prod(1 - poles) / 2 ** order
+    return np.real(gain * np.poly(-np.ones(order))), np.real(np.poly(poles))
+
+
+@pytest.mark.parametrize('filter', ['iir', 'fft'])
+@pytest.mark.parametrize('decimate', [1, 100])
+def test_constant_current_is_unchanged(filter, decimate):
+    shape, data = capture(np.full(10 ** 6, 3.5e-6))
+    analysis = op.Operations(shape, data, LP = True, filter = filter, decimate = decimate, chunk = 70000)
+    assert analysis.i.size == analysis.E.size == -(-data.i.size // decimate)
+    assert np.allclose(analysis.i, 3.5e-6, rtol = 1e-9, atol = 0)
+
+
+@pytest.mark.parametrize('decimate', [1, 7])
+def test_fft_filter_matches_direct_convolution(decimate):
+    shape, data = capture(None)
+    analysis = op.Operations(shape, data, LP = True, filter = 'fft', cutoff = 0.02, decimate = decimate, chunk = 30000)
+    kernel = 0.02 * np.sinc(0.02 * (np.arange(analysis.taps) - analysis.taps // 2)) * np.blackman(analysis.taps)
+    padded = np.concatenate((np.full(analysis.taps // 2, data.i[0]), data.i, np.full(analysis.taps // 2, data.i[-1])))
+    reference = np.convolve(padded, kernel / np.sum(kernel), 'valid')[::decimate][:analysis.i.size]
+    assert np.allclose(analysis.i, reference, rtol = 0, atol = 1e-12 * np.amax(np.abs(reference)))
+
+
+@pytest.mark.parametrize('order', [1, 2, 3, 4])
+def test_iir_filter_matches_difference_equation(order):
+    x = np.random.default_rng(order).normal(0, 1e-6, 3000) + 2e-6
+    shape, data = capture(np.full(10 ** 6, 0.0))
+    data.i = x
+    analysis = op.Operations(shape, data, LP = True, cutoff = 0.05, order = order, decimate = 1, chunk = 700)
+    b, a = butterworth(0.05, order)
+    held = np.concatenate((np.full(20000, x[0]), x))        # the filter starts in the steady state of the first point
+    y = np.zeros(held.size)
+    for n in range(held.size):
+        y[n] = sum(b[k] * held[n - k] for k in range(b.size) if n >= k) - sum(a[k] * y[n - k] for k in range(1, a.size) if n >= k)
+    assert np.allclose(analysis.i, y[20000:][:analysis.i.size], rtol = 0, atol = 1e-10 * np.amax(np.abs(y)))
+
+
+@pytest.mark.parametrize('filter', ['iir', 'fft'])
+def test_scans_and_session(filter):
+    shape, data = capture(None)
+    session = op.Session(shape, data)
+    analysis = session.LowPass(filter = filter, decimate = 100)
+    assert session.LowPass(filter = filter, decimate = 100) is analysis and session.hits == 1
+    E, i = analysis.Scans()
+    assert E.shape == i.shape and E.shape[0] == shape.ns
@@ -0,0 +1,42 @@
+'''
+Tests for saving analysed data with one current column for every sampling region (output and header
+in operations.py, Save in pipeline.py).
+'''
+
+import numpy as np
+import waveforms as wf
+import simulations as sim
+import operations as op
+import pipeline as pl
+
+
+def capture(path, shape):
+    '''Writes a simulated capture to an oscilloscope .csv file, returning its location'''
+
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    with open(path, 'w') as file:
+        file.write('Model,Test,\nSecond,Volt,\n')
+        np.savetxt(file, np.column_stack((np.arange(data.i.size) * 5e-6, data.i / 1.2e-5)), fmt = '%.9e', delimiter = ',')
+    return str(path)
+
+
+def test_single_region_has_no_header():
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.01, sr = 0.5, ns = 1, osf = 20000)
+    analysis = op.Operations(shape, sim.Capacitance(shape, Cd = 0.00005, Ru = 500), CS = True)
+    assert analysis.header() is None
+    assert all(len(row) == 3 for row in analysis.output())
+
+
+def test_pipeline_saves_every_region(tmp_path):
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.01, sr = 0.5, ns = 1, osf = 20000)
+    files = [capture(tmp_path / f'capture {ix}.csv', shape) for ix in range(2)]
+    pipeline = pl.Pipeline(files, shape, 1.2e-5, directory = str(tmp_path / 'analysis'), analysis = {'CS': True, 'center': [0.3, 0.5], 'range': [0.2, 0.2]}).Run()
+
+    assert pipeline.failures == {}
+    assert len(pipeline.results) == 2
+    for path in pipeline.results.values():
+        with open(path) as file:
+            lines = file.read().splitlines()
+        assert lines[0] == 'index,E,i (center 0.3, range 0.2),i (center 0.5, range 0.2)'
+        rows = np.array([line.split(',') for line in lines[1:]], dtype = float)
+        assert rows.shape == ((2 * shape.dp) // shape.interval, 4)
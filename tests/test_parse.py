@@ -0,0 +1,59 @@
+'''
+Tests that every parser of the current column (Parse in fileopener.py) gives the same current as the
+original whole dataframe parse in baseline.py, in either datatype.
+'''
+
+import numpy as np
+import pytest
+import baseline
+import fileopener as fo
+
+
+ENGINES = ['pyarrow', 'pandas', 'numpy']
+
+
+@pytest.fixture(scope = 'module')
+def file(tmp_path_factory):
+    '''Oscilloscope .csv file written in the same format as the benchmark in fileopener.py, with a trailing comma on the header rows'''
+
+    path = tmp_path_factory.mktemp('parse') / 'capture.csv'
+    t = np.arange(20000) * 5e-7
+    values = 0.01 * np.sin(t * 1000) + np.random.default_rng(0).normal(0, 1e-3, t.size)
+    with open(path, 'w') as csv:
+        csv.write('Model,Benchmark,\nSecond,Volt,\n')
+        np.savetxt(csv, np.column_stack((t, values)), fmt = '%.6e', delimiter = ',')
+    return str(path)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_float64_matches_baseline(file, engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    i = fo.Oscilloscope(file, 1.2e-5, engine = engine).i
+    expected = baseline.Parse(file, 1.2e-5)
+    assert i.dtype == np.float64
+    assert np.array_equal(i, expected)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_float32_matches_baseline(file, engine):
+    if engine == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    i = fo.Oscilloscope(file, 1.2e-5, engine = engine, dtype = np.float32).i
+    expected = baseline.Parse(file, 1.2e-5)
+    assert i.dtype == np.float32
+    assert np.allclose(i, expected, rtol = 2 * np.finfo(np.float32).eps, atol = 0)      # parsed straight into float32, then multiplied by the conversion factor in float32
+
+
+def test_engines_match_each_other(file):
+    pytest.importorskip('pyarrow')
+    for dtype in (np.float64, np.float32):
+        columns = [fo.Oscilloscope(file, 1.2e-5, engine = engine, dtype = dtype).i for engine in ENGINES]
+        assert all(np.array_equal(columns[0], ix) for ix in columns[1:])
+
+
+def test_auto_engine_falls_back_on_numpy(file, monkeypatch):
+    monkeypatch.setattr(fo, 'find_spec', lambda name: None)
+    data = fo.Oscilloscope(file, 1.2e-5)
+    assert data.engine == 'numpy'
+    assert np.array_equal(data.i, baseline.Parse(file, 1.2e-5))
@@ -0,0 +1,86 @@
+'''
+Tests that running a series of oscilloscope files through the pipeline (Pipeline in pipeline.py) saves
+the same analysis as opening, analysing, and saving each file in turn as reader.py does.
+'''
+
+import gc
+import os
+import weakref
+import numpy as np
+import pytest
+import waveforms as wf
+import simulations as sim
+import fileopener as fo
+import operations as op
+import pipeline as pl
+
+
+def capture(path, shape, Ru):
+    '''Writes a simulated capture to an oscilloscope .csv file, returning its location'''
+
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = Ru)
+    with open(path, 'w') as file:
+        file.write('Model,Test,\nSecond,Volt,\n')
+        np.savetxt(file, np.column_stack((np.arange(data.i.size) * 5e-6, data.i / 1.2e-5)), fmt = '%.9e', delimiter = ',')
+    return str(path)
+
+
+def serial(file, shape, analysis):
+    '''Opens, analyses, and saves a single file as reader.py does, returning the saved text'''
+
+    data = fo.Oscilloscope(file, cf = 1.2e-5)
+    analysed = op.Operations(shape, data, **analysis)
+    lines = [analysed.header()] if analysed.header() is not None else []
+    return ''.join(lines + [','.join(map(str, row)) + '\n' for row in analysed.output()])
+
+
+@pytest.fixture(scope = 'module')
+def files(tmp_path_factory):
+    '''Three captures with different resistances, along with a file which cannot be opened'''
+
+    folder = tmp_path_factory.mktemp('captures')
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.01, sr = 0.5, ns = 1, osf = 20000)
+    files = [capture(folder / f'capture {ix}.csv', shape, Ru) for ix, Ru in enumerate([200, 500, 800])]
+    (folder / 'capture 3.csv').write_text('Model,Test,\nSecond,Volt,\n0.0,broken\n')
+    return shape, files, str(folder / 'capture 3.csv')
+
+
+@pytest.mark.parametrize('analysis', [{}, {'MA': True, 'window': 400, 'step': 100}, {'CS': True}, {'CS': True, 'center': [0.3, 0.7], 'range': [0.2, 0.2]}])
+@pytest.mark.parametrize('depth', [1, 3])
+def test_pipeline_matches_serial_loop(tmp_path, files, analysis, depth):
+    shape, files, bad = files
+    pipeline = pl.Pipeline(files + [bad], shape, 1.2e-5, depth = depth, directory = str(tmp_path), analysis = analysis).Run()
+    assert list(pipeline.failures) == [bad]
+    assert sorted(pipeline.results) == files
+    for file in files:
+        with open(pipeline.results[file]) as saved:
+            assert saved.read() == serial(file, shape, analysis)
+
+
+def test_opened_files_are_released_before_saving(tmp_path, files, monkeypatch):
+    shape, files, bad = files
+    opened = {}
+
+    class Oscilloscope(fo.Oscilloscope):
+        '''Oscilloscope class which keeps a weak reference to every opened file'''
+
+        def __init__(self, file, *args, **kwargs):
+            super().__init__(file, *args, **kwargs)
+            opened[file] = weakref.ref(self)
+
+    monkeypatch.setattr(pl.fo, 'Oscilloscope', Oscilloscope)
+    pipeline = pl.Pipeline(files, shape, 1.2e-5, depth = 1, directory = str(tmp_path), analysis = {'CS': True})
+    put = pipeline.analysed.put
+    held = []
+
+    def check(item):
+        file, analysis = item
+        if file is not None:
+            gc.collect()
+            held.append(opened[file]() is not None)     # the opened file should only be held by the analysis, which has dropped it
+        put(item)
+
+    pipeline.analysed.put = check
+    pipeline.Run()
+    assert held == [False] * len(files)
+    assert len(pipeline.results) == len(files)
@@ -0,0 +1,60 @@
+'''
+Tests for splitting multi-scan captures into one row per scan (Scans in operations.py).
+'''
+
+import numpy as np
+import pytest
+import waveforms as wf
+import simulations as sim
+import operations as op
+
+
+def imported(ns, dE, roll):
+    '''Simulated capture of ns scans, marked as imported and rotated by roll points'''
+
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = dE, sr = 0.5, ns = ns, osf = 20000)
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    data.label = 'imported'
+    data.i = np.roll(data.i, roll)
+    return shape, data
+
+
+def aligned(E, shape):
+    '''Checks that every scan starts at the first step and that the potential of every step is the potential where the step starts, \n
+    where the steps start after the initial point of the waveform. The peak of the step after a vertex can fall before the step, so the \n
+    steps either side of a vertex are not checked'''
+
+    starts = np.asarray(shape.E)[1 : 2 * shape.dp : shape.interval]
+    turns = np.diff(np.sign(np.diff(starts))) != 0      # marks where the direction of the steps changes
+    vertex = np.concatenate(([False], turns, [False])) | np.concatenate((turns, [False, False]))      # marks the steps either side of each vertex
+    close = np.abs(E - starts) <= 1.001 * abs(shape.dE) / shape.interval        # within a point of the start of the step
+    return np.all(E[:, 0] == starts[0]) and np.all(close | vertex)
+
+
+@pytest.mark.parametrize('ns', [2, 3])
+@pytest.mark.parametrize('dE', [0.01, 0.002, -0.005])
+@pytest.mark.parametrize('vertex', ['threshold', 'correlation'])
+def test_unrotated_capture_gives_every_scan(ns, dE, vertex):
+    shape, data = imported(ns, dE, 0)
+    E, i = op.Operations(shape, data, CS = True, vertex = vertex).Scans()
+    steps = (2 * shape.dp) // shape.interval
+    assert E.shape == (ns, steps) and i.shape == (ns, steps)
+    assert aligned(E, shape)
+
+
+@pytest.mark.parametrize('roll', [5000, -123, 12345])
+def test_rotated_capture_gives_complete_scans(roll):
+    shape, data = imported(3, 0.01, roll)
+    threshold = op.Operations(shape, data, CS = True, vertex = 'threshold').Scans()
+    correlation = op.Operations(shape, data, CS = True, vertex = 'correlation', workers = 2).Scans()
+    assert threshold[0].shape == (2, (2 * shape.dp) // shape.interval)
+    assert aligned(threshold[0], shape)
+    assert np.array_equal(threshold[0], correlation[0])
+    assert np.array_equal(threshold[1], correlation[1], equal_nan = True)
+
+
+def test_simulated_scans_match_whole_capture():
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0, Eupp = 0.5, Elow = -0.5, dE = 0.002, sr = 0.5, ns = 3, osf = 20000)
+    analysis = op.Operations(shape, sim.Capacitance(shape, Cd = 0.00005, Ru = 500), CS = True)
+    E, i = analysis.Scans()
+    assert np.array_equal(np.reshape(i, -1), np.asarray(analysis.i)[:i.size], equal_nan = True)
@@ -0,0 +1,83 @@
+'''
+Tests for running many analyses of the same data against a single alignment (Session in operations.py).
+'''
+
+import numpy as np
+import pytest
+import waveforms as wf
+import simulations as sim
+import operations as op
+
+
+def capture(roll = 5000):
+    '''Simulated staircase capture, marked as imported and rotated by roll points'''
+
+    shape = wf.CyclicStaircaseVoltammetry(Eini = 0.0, Eupp = 0.5, Elow = -0.5, dE = 0.005, sr = 0.5, ns = 2, osf = 20000)
+    data = sim.Capacitance(shape, Cd = 0.00005, Ru = 500)
+    data.i = np.roll(data.i, roll)
+    data.label = 'imported'
+    return shape, data
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    '''Counts how many times the peaks are found'''
+
+    calls = []
+    peaks = op.Operations.Peaks
+
+    def count(self):
+        calls.append(self)
+        return peaks(self)
+
+    monkeypatch.setattr(op.Operations, 'Peaks', count)
+    return calls
+
+
+def test_peaks_are_found_once(counted):
+    shape, data = capture()
+    session = op.Session(shape, data)
+    assert len(counted) == 1
+    analyses = [session.MovingAverage(), session.MovingAverage(window = 500, step = 50), session.CurrentSampling(), session.CurrentSampling(center = [0.3, 0.7], range = [0.2, 0.2]), session.LowPass(), session.Raw()]
+    assert len(counted) == 1
+    assert session.misses == 5 and session.hits == 0
+    for analysis in analyses:
+        assert analysis.peaks is session.alignment.peaks
+
+
+@pytest.mark.parametrize('options', [dict(MA = True, window = 500, step = 50), dict(CS = True, center = 0.4, range = 0.5), dict(CS = True, center = [0.3, 0.7], range = [0.2, 0.2])])
+def test_results_match_a_fresh_analysis(options):
+    shape, data = capture()
+    session = op.Session(shape, data)
+    if options.get('MA'):
+        analysis = session.MovingAverage(window = options['window'], step = options['step'])
+    else:
+        analysis = session.CurrentSampling(center = options['center'], range = options['range'])
+    fresh = op.Operations(shape, data, **options)
+    assert np.array_equal(np.asarray(analysis.E), np.asarray(fresh.E))
+    assert np.array_equal(analysis.i, fresh.i, equal_nan = True)
+
+
+def test_repeated_keys_return_the_kept_result(counted):
+    shape, data = capture()
+    session = op.Session(shape, data)
+    first = session.CurrentSampling(center = [0.3, 0.7], range = [0.2, 0.2])
+    assert session.CurrentSampling(center = (0.3, 0.7), range = np.array([0.2, 0.2])) is first     # lists, tuples, and arrays of regions are the same key
+    assert session.MovingAverage(window = 500, step = 50) is session.MovingAverage(window = 500, step = 50)
+    assert session.MovingAverage(window = 500, step = 50) is not session.MovingAverage(window = 500, step = 25)
+    assert session.hits == 3 and session.misses == 3
+    assert len(counted) == 1
+
+
+def test_least_recently_used_results_are_forgotten():
+    shape, data = capture()
+    session = op.Session(shape, data, size = 2)
+    a = session.MovingAverage(window = 500, step = 100)
+    b = session.MovingAverage(window = 500, step = 200)
+    assert session.MovingAverage(window = 500, step = 100) is a        # a is now the most recently used
+    session.MovingAverage(window = 500, step = 300)
+    assert len(session.results) == 2
+    assert list(session.results) == [('MA', 500, 100), ('MA', 500, 300)]      # b was the least recently used, so it was forgotten
+    assert session.MovingAverage(window = 500, step = 100) is a
+    assert session.MovingAverage(window = 500, step = 200) is not b     # which is run again
+    assert session.hits == 2 and session.misses == 4
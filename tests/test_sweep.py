@@ -0,0 +1,52 @@
+'''
+Tests that a sweep over many sets of parameters (Sweep in simulations.py) gives the same currents as
+simulating each set of parameters on its own, in this process or in a process pool.
+'''
+
+import functools
+import multiprocessing
+import pickle
+import numpy as np
+import pytest
+import waveforms as wf
+import simulations as sim
+from concurrent.futures import ProcessPoolExecutor
+
+
+Cd = np.array([0.00002, 0.00005, 0.0001])
+Ru = np.array([100.0, 500.0])
+
+
+def shapes(lazy):
+    '''Linear and staircase waveforms, starting from a vertex and in between the vertices'''
+
+    return [wf.CyclicStaircaseVoltammetry(Eini = 0.0, Eupp = 0.5, Elow = -0.5, dE = 0.01, sr = 0.5, ns = 2, osf = 5000, lazy = lazy),
+            wf.CyclicStaircaseVoltammetry(Eini = -0.5, Eupp = 0.5, Elow = -0.5, dE = 0.01, sr = 0.5, ns = 1, osf = 5000, lazy = lazy),
+            wf.CyclicLinearVoltammetry(Eini = 0.2, Eupp = 0.5, Elow = -0.5, dE = -0.01, sr = 0.5, ns = 1, osf = 5000, lazy = lazy)]
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('kind', [0, 1, 2])
+def test_rows_match_single_simulations(lazy, kind):
+    shape = shapes(lazy)[kind]
+    sweep = sim.Sweep(shape, Cd[:, None], Ru[None, :], memory = 4 * 32 * shape.t.size)     # a few sets of parameters per chunk, so that chunks are joined
+    assert sweep.i.shape == (Cd.size * Ru.size, np.asarray(shape.E).size)
+    for row, (ix, iy) in enumerate(zip(sweep.Cd, sweep.Ru)):
+        single = sim.Capacitance(shape, Cd = float(ix), Ru = float(iy)).i
+        assert np.allclose(sweep.i[row], single, rtol = 1e-12, atol = 1e-18), row
+
+
+def test_pool_matches_serial():
+    shape = shapes(True)[0]
+    serial = sim.Sweep(shape, Cd[:, None], Ru[None, :], memory = 32 * shape.t.size)
+    pooled = sim.Sweep(shape, Cd[:, None], Ru[None, :], memory = 32 * shape.t.size, workers = 2)
+    assert np.array_equal(pooled.i, serial.i)
+
+
+def test_pool_started_by_spawn_matches_serial(monkeypatch):
+    shape = shapes(True)[0]      # a lazy waveform, whose arrays hold functions which cannot be pickled
+    pickle.dumps(sim.Sweep(shape, Cd, Ru[0]).Parameters())      # only the parameters are sent to each process
+    serial = sim.Sweep(shape, Cd, Ru[0], memory = 32 * shape.t.size)
+    monkeypatch.setattr(sim, 'ProcessPoolExecutor', functools.partial(ProcessPoolExecutor, mp_context = multiprocessing.get_context('spawn')))
+    pooled = sim.Sweep(shape, Cd, Ru[0], memory = 32 * shape.t.size, workers = 2)
+    assert np.array_equal(pooled.i, serial.i)